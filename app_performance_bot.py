@@ -7,7 +7,6 @@ AI Agent for systematic app performance analysis and optimization
 import json
 import re
 import time
-import sqlite3
 import os
 import subprocess
 from datetime import datetime, timedelta
@@ -15,6 +14,7 @@ from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 from pathlib import Path
+from performance_dashboard import PerformanceDashboard
 
 class PerformanceCategory(Enum):
     STARTUP_TIME = "startup_time"
@@ -980,59 +980,16 @@ class ThirdPartyIntegrationOptimizer:
 class PerformanceMonitoring:
     """Performance monitoring and analytics system"""
     
-    def __init__(self, db_path: str = "performance_metrics.db"):
+    def __init__(self, db_path: str = "performance_metrics.db", columnar_dir: Optional[str] = None):
         self.db_path = db_path
-        self.init_database()
-    
-    def init_database(self):
-        """Initialize SQLite database for performance metrics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create performance_metrics table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS performance_metrics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp REAL NOT NULL,
-                startup_time REAL NOT NULL,
-                memory_usage REAL NOT NULL,
-                battery_drain REAL NOT NULL,
-                ui_fps REAL NOT NULL,
-                network_latency REAL NOT NULL,
-                image_load_time REAL NOT NULL,
-                database_query_time REAL NOT NULL,
-                crash_rate REAL NOT NULL,
-                user_satisfaction REAL NOT NULL
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        # Writes go through the dashboard so alerts, trends and the columnar store see them
+        self.dashboard = PerformanceDashboard(db_path, columnar_dir=columnar_dir)
     
     def record_performance_metric(self, metric: PerformanceMetrics):
         """Record a performance metric"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO performance_metrics 
-            (timestamp, startup_time, memory_usage, battery_drain, ui_fps, network_latency, image_load_time, database_query_time, crash_rate, user_satisfaction)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            metric.timestamp,
-            metric.startup_time,
-            metric.memory_usage,
-            metric.battery_drain,
-            metric.ui_fps,
-            metric.network_latency,
-            metric.image_load_time,
-            metric.database_query_time,
-            metric.crash_rate,
-            metric.user_satisfaction
-        ))
-        
-        conn.commit()
-        conn.close()
+        metrics = asdict(metric)
+        timestamp = metrics.pop("timestamp")
+        self.dashboard.record_performance_metrics_batch([(timestamp, metrics)])
     
     def generate_performance_health_report(self) -> Dict[str, Any]:
         """Generate performance health report"""
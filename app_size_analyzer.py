@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+App Size Analyzer
+Compressed and uncompressed size breakdown of .ipa, .apk and .aab archives
+"""
+
+import os
+import re
+import heapq
+import zipfile
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+CATEGORY_ENGINE = "engine"                # Flutter.framework, libflutter.so
+CATEGORY_APP_CODE = "app_code"            # App.framework binary, libapp.so (AOT Dart)
+CATEGORY_ASSETS = "assets"                # flutter_assets except fonts
+CATEGORY_FONTS = "fonts"
+CATEGORY_PLUGINS = "plugins"              # plugin and pod frameworks, other .so libraries
+CATEGORY_LOCALIZATIONS = "localizations"  # iOS .lproj directories
+CATEGORY_NATIVE = "native"                # Runner executable, classes.dex
+CATEGORY_RESOURCES = "resources"          # Assets.car, res/, resource bundles
+CATEGORY_EXTENSIONS = "extensions"        # iOS app extensions (PlugIns/)
+CATEGORY_OTHER = "other"                  # signatures, manifests, metadata
+
+CATEGORIES = (CATEGORY_ENGINE, CATEGORY_APP_CODE, CATEGORY_ASSETS, CATEGORY_FONTS, CATEGORY_PLUGINS,
+              CATEGORY_LOCALIZATIONS, CATEGORY_NATIVE, CATEGORY_RESOURCES, CATEGORY_EXTENSIONS, CATEGORY_OTHER)
+
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc", ".woff", ".woff2")
+DEFAULT_ABI = "arm64-v8a"
+LARGEST_FILES = 20
+
+IOS_APP_PREFIX = re.compile(r"^Payload/[^/]+\.app/")
+ANDROID_LIB = re.compile(r"^lib/(?P<abi>[^/]+)/(?P<name>[^/]+)$")
+AAB_MODULE = re.compile(r"^(?P<module>[^/]+)/(?P<rest>.+)$")
+AAB_METADATA = ("BUNDLE-METADATA/", "BundleConfig.pb", "META-INF/")
+
+@dataclass
+class SizeEntry:
+    """Bytes attributed to one component (a framework, library, asset directory, ...)"""
+    category: str
+    component: str
+    compressed: int = 0
+    uncompressed: int = 0
+    files: int = 0
+
+@dataclass
+class SizeBreakdown:
+    """Size of one build archive by category and component"""
+    path: str
+    format: str                          # "ipa", "apk" or "aab"
+    platform: str                        # "ios" or "android"
+    components: Dict[str, SizeEntry] = field(default_factory=dict)
+    abis: Dict[str, Tuple[int, int]] = field(default_factory=dict)   # abi -> (compressed, uncompressed)
+    largest_files: List[Tuple[int, int, str]] = field(default_factory=list)
+
+    @property
+    def compressed(self) -> int:
+        return sum(entry.compressed for entry in self.components.values())
+
+    @property
+    def uncompressed(self) -> int:
+        return sum(entry.uncompressed for entry in self.components.values())
+
+    def categories(self) -> Dict[str, SizeEntry]:
+        totals: Dict[str, SizeEntry] = {}
+        for entry in self.components.values():
+            total = totals.setdefault(entry.category, SizeEntry(entry.category, entry.category))
+            total.compressed += entry.compressed
+            total.uncompressed += entry.uncompressed
+            total.files += entry.files
+        return dict(sorted(totals.items(), key=lambda item: item[1].compressed, reverse=True))
+
+    def estimated_download(self, abi: str = DEFAULT_ABI) -> int:
+        """Compressed bytes a device downloads; Android splits ship one ABI only.
+
+        For iOS this is an upper bound on the App Store's figure before
+        app thinning, and a lower bound after FairPlay encryption of the
+        executable, which stops it compressing.
+        """
+        other_abis = sum(compressed for name, (compressed, _) in self.abis.items() if name != abi)
+        return self.compressed - other_abis
+
+
+def component_key(category: str, component: str) -> str:
+    return f"{category}:{component}"
+
+
+def _flutter_asset(path: str) -> Tuple[str, str]:
+    """Category and component for a path below flutter_assets/"""
+    if path.lower().endswith(FONT_EXTENSIONS):
+        return CATEGORY_FONTS, os.path.basename(path)
+    parts = path.split("/")
+    return CATEGORY_ASSETS, "/".join(parts[:2]) if len(parts) > 2 else parts[0]
+
+
+def classify_ios(name: str) -> Tuple[str, str]:
+    """Category and component of an .ipa member"""
+    match = IOS_APP_PREFIX.match(name)
+    if not match:
+        # SwiftSupport/, Symbols/, iTunesMetadata.plist: outside the installed app
+        return CATEGORY_OTHER, name.split("/")[0]
+    path = name[match.end():]
+    parts = path.split("/")
+
+    if parts[0] == "Frameworks" and len(parts) > 1:
+        framework = parts[1]
+        if framework == "Flutter.framework":
+            return CATEGORY_ENGINE, "Flutter.framework"
+        if framework == "App.framework":
+            if len(parts) > 3 and parts[2] == "flutter_assets":
+                return _flutter_asset("/".join(parts[3:]))
+            return CATEGORY_APP_CODE, "App.framework"
+        if framework.endswith(".framework"):
+            return CATEGORY_PLUGINS, framework[:-len(".framework")]
+        return CATEGORY_OTHER, "Frameworks"          # libswift*.dylib on old deployment targets
+    if parts[0] == "PlugIns" and len(parts) > 1:
+        return CATEGORY_EXTENSIONS, parts[1]
+    for part in parts[:-1]:
+        if part.endswith(".lproj"):
+            return CATEGORY_LOCALIZATIONS, part[:-len(".lproj")]
+        if part.endswith(".bundle"):
+            return CATEGORY_RESOURCES, part
+    if len(parts) == 1:
+        if path.endswith((".car", ".nib", ".png", ".json")):
+            return CATEGORY_RESOURCES, path
+        if "." in path or path == "PkgInfo":
+            return CATEGORY_OTHER, path
+        return CATEGORY_NATIVE, "executable"
+    if parts[0] == "_CodeSignature":
+        return CATEGORY_OTHER, "_CodeSignature"
+    return CATEGORY_RESOURCES, parts[0]
+
+
+def classify_android(path: str) -> Tuple[str, str, Optional[str]]:
+    """Category, component and ABI of an .apk member (or an .aab member below its module)"""
+    lib = ANDROID_LIB.match(path)
+    if lib:
+        name = lib.group("name")
+        if name == "libflutter.so":
+            return CATEGORY_ENGINE, name, lib.group("abi")
+        if name == "libapp.so":
+            return CATEGORY_APP_CODE, name, lib.group("abi")
+        return CATEGORY_PLUGINS, name, lib.group("abi")
+    if path.startswith("assets/flutter_assets/"):
+        category, component = _flutter_asset(path[len("assets/flutter_assets/"):])
+        return category, component, None
+    if path.startswith("dex/") or (path.startswith("classes") and path.endswith(".dex")):
+        return CATEGORY_NATIVE, "dex", None
+    if path.startswith("res/"):
+        parts = path.split("/")
+        # Strings are compiled into resources.arsc / resources.pb, so Android
+        # localizations cannot be separated from the resource table
+        return CATEGORY_RESOURCES, parts[1] if len(parts) > 2 else "res", None
+    if path in ("resources.arsc", "resources.pb"):
+        return CATEGORY_RESOURCES, path, None
+    if path.startswith("assets/"):
+        return CATEGORY_ASSETS, "assets", None
+    if path.startswith("root/"):
+        return CATEGORY_OTHER, path.split("/")[1], None
+    return CATEGORY_OTHER, path.split("/")[0], None
+
+
+class AppSizeAnalyzer:
+    """Attributes archive bytes to Flutter build components.
+
+    Only the zip central directory is read, so no member is decompressed
+    or extracted: sizes come from each entry's compressed and original
+    lengths.
+    """
+
+    def __init__(self, largest_files: int = LARGEST_FILES):
+        self.largest_files = largest_files
+
+    def analyze(self, path: str) -> SizeBreakdown:
+        extension = os.path.splitext(path)[1].lower().lstrip(".")
+        if extension not in ("ipa", "apk", "aab"):
+            raise ValueError(f"Unsupported archive type: {path} (expected .ipa, .apk or .aab)")
+        breakdown = SizeBreakdown(path=path, format=extension, platform="ios" if extension == "ipa" else "android")
+        largest: List[Tuple[int, int, str]] = []
+
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                abi = None
+                if extension == "ipa":
+                    category, component = classify_ios(info.filename)
+                elif extension == "apk":
+                    category, component, abi = classify_android(info.filename)
+                else:
+                    category, component, abi = self._classify_aab(info.filename)
+
+                entry = breakdown.components.get(component_key(category, component))
+                if entry is None:
+                    entry = breakdown.components[component_key(category, component)] = SizeEntry(category, component)
+                entry.compressed += info.compress_size
+                entry.uncompressed += info.file_size
+                entry.files += 1
+                if abi:
+                    compressed, uncompressed = breakdown.abis.get(abi, (0, 0))
+                    breakdown.abis[abi] = (compressed + info.compress_size, uncompressed + info.file_size)
+
+                item = (info.compress_size, info.file_size, info.filename)
+                if len(largest) < self.largest_files:
+                    heapq.heappush(largest, item)
+                elif item > largest[0]:
+                    heapq.heapreplace(largest, item)
+
+        breakdown.largest_files = sorted(largest, reverse=True)
+        return breakdown
+
+    def _classify_aab(self, name: str) -> Tuple[str, str, Optional[str]]:
+        if name.startswith(AAB_METADATA):
+            return CATEGORY_OTHER, name.split("/")[0], None
+        match = AAB_MODULE.match(name)
+        if not match:
+            return CATEGORY_OTHER, name, None
+        if match.group("rest").startswith("manifest/"):
+            return CATEGORY_OTHER, "manifest", None
+        category, component, abi = classify_android(match.group("rest"))
+        if match.group("module") != "base":
+            component = f"{match.group('module')}/{component}"
+        return category, component, abi
+
+
+def diff_breakdowns(old: SizeBreakdown, new: SizeBreakdown, by: str = "component") -> List[Dict[str, object]]:
+    """Size changes between two builds per component (or per category), largest first"""
+    if by == "category":
+        old_entries, new_entries = old.categories(), new.categories()
+    elif by == "component":
+        old_entries, new_entries = old.components, new.components
+    else:
+        raise ValueError(f"Unsupported diff grouping: {by}")
+
+    changes = []
+    for key in set(old_entries) | set(new_entries):
+        before = old_entries.get(key)
+        after = new_entries.get(key)
+        entry = after or before
+        delta = (after.compressed if after else 0) - (before.compressed if before else 0)
+        uncompressed_delta = (after.uncompressed if after else 0) - (before.uncompressed if before else 0)
+        if delta == 0 and uncompressed_delta == 0:
+            continue
+        changes.append({
+            "category": entry.category,
+            "component": entry.component,
+            "old_compressed": before.compressed if before else 0,
+            "new_compressed": after.compressed if after else 0,
+            "delta_compressed": delta,
+            "delta_uncompressed": uncompressed_delta,
+            "status": "added" if before is None else "removed" if after is None else "changed"
+        })
+    changes.sort(key=lambda change: abs(change["delta_compressed"]), reverse=True)
+    return changes
+
+
+def _mb(size: int) -> str:
+    return f"{size / (1024 * 1024):.2f} MB"
+
+
+def format_breakdown(breakdown: SizeBreakdown, components: int = 15) -> str:
+    lines = [f"📦 {os.path.basename(breakdown.path)} ({breakdown.format}): "
+             f"{_mb(breakdown.compressed)} compressed, {_mb(breakdown.uncompressed)} uncompressed"]
+    if breakdown.platform == "android" and breakdown.abis:
+        lines.append(f"   estimated {DEFAULT_ABI} download: {_mb(breakdown.estimated_download())}")
+    lines.append("")
+    for category, entry in breakdown.categories().items():
+        share = entry.compressed / breakdown.compressed if breakdown.compressed else 0.0
+        lines.append(f"   {category:14s} {_mb(entry.compressed):>11s} {_mb(entry.uncompressed):>11s} "
+                     f"{share:6.1%}  {entry.files:5d} file(s)")
+    if breakdown.abis:
+        lines.append("\n🧩 Native libraries per ABI:")
+        for abi, (compressed, uncompressed) in sorted(breakdown.abis.items()):
+            lines.append(f"   {abi:14s} {_mb(compressed):>11s} {_mb(uncompressed):>11s}")
+    lines.append("\n🔝 Largest components:")
+    for entry in sorted(breakdown.components.values(), key=lambda e: e.compressed, reverse=True)[:components]:
+        lines.append(f"   {_mb(entry.compressed):>11s} {_mb(entry.uncompressed):>11s}  {entry.category}: {entry.component}")
+    return "\n".join(lines)
+
+
+def format_diff(old: SizeBreakdown, new: SizeBreakdown, changes: List[Dict[str, object]], limit: int = 20) -> str:
+    delta = new.compressed - old.compressed
+    lines = [f"📊 {_mb(old.compressed)} -> {_mb(new.compressed)} compressed ({delta / (1024 * 1024):+.2f} MB)"]
+    for change in changes[:limit]:
+        lines.append(f"   {change['delta_compressed'] / 1024:+10.1f} KB  {change['status']:8s} "
+                     f"{change['category']}: {change['component']}")
+    return "\n".join(lines)
+
+
+def main():
+    """Break down a build archive, diff two builds, and record sizes"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Size breakdown of .ipa / .apk / .aab build archives")
+    parser.add_argument("path", help="Archive to analyze")
+    parser.add_argument("--compare", help="Older archive to diff against")
+    parser.add_argument("--build-id", help="Record the breakdown for this build in the deployment metrics database")
+    parser.add_argument("--db", default="deployment_metrics.db", help="Deployment metrics database")
+    parser.add_argument("--by", choices=("component", "category"), default="component", help="Diff grouping")
+    args = parser.parse_args()
+
+    analyzer = AppSizeAnalyzer()
+    try:
+        breakdown = analyzer.analyze(args.path)
+        previous = analyzer.analyze(args.compare) if args.compare else None
+    except (OSError, ValueError, zipfile.BadZipFile) as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+    print(format_breakdown(breakdown))
+    if previous is not None:
+        print()
+        print(format_diff(previous, breakdown, diff_breakdowns(previous, breakdown, args.by)))
+
+    if args.build_id:
+        from deployment_monitor import DeploymentMonitor
+        monitor = DeploymentMonitor(args.db)
+        monitor.record_app_size(args.build_id, breakdown)
+        print(f"\n💾 Recorded {len(breakdown.components)} size components for {args.build_id}")
+        if previous is None:
+            comparison = monitor.compare_app_size(args.build_id)
+            if comparison:
+                print(format_diff(comparison["previous"], breakdown, comparison["changes"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,40 +5,126 @@ Automated fixing system for iOS deployment issues
 """
 
 import os
-import subprocess
 import shutil
 import json
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 import time
 
+from toolchain_probe import shared_probe
+from command_runner import CommandResult, shared_runner, format_timings
+from fix_planner import FixPlan, FixPlanner, fixer_steps
+from pods_cache import PodsCache, PodsCacheError, cache_key as pods_cache_key
+
+# Seconds before a step is terminated; network-bound steps get the most room
+COMMAND_TIMEOUTS = {
+    "pod cache clean": 300,
+    "pod repo update": 1200,
+    "pod install": 1800,
+    "flutter clean": 300,
+    "flutter pub get": 600,
+    "flutter doctor": 300,
+    "security find-identity": 60,
+    "sw_vers": 30
+}
+
 class AutomatedFixer:
     """Automated fixing system for iOS deployment issues"""
     
-    def __init__(self, project_path: str):
+    def __init__(self, project_path: str, history_db: str = "deployment_metrics.db"):
         self.project_path = Path(project_path)
+        self.history_db = history_db
         self.ios_path = self.project_path / "ios"
         self.flutter_path = self.project_path
         self.fix_history = []
+        self.toolchain = shared_probe()
+        self.pods_cache = PodsCache()
+        self.runner = shared_runner()
+        self._planner: Optional[FixPlanner] = None
+    
+    @property
+    def planner(self) -> FixPlanner:
+        """Fixers as a dependency graph; created on first use so the history DB is only opened when needed"""
+        if self._planner is None:
+            self._planner = FixPlanner(str(self.project_path), fixer_steps(self), db_path=self.history_db)
+        return self._planner
+    
+    def plan_fixes(self, only: Optional[List[str]] = None, force: bool = False) -> FixPlan:
+        """What run_fixes would run or skip, with estimates from earlier runs"""
+        return self.planner.plan(only, force=force)
+    
+    def run_fixes(self, only: Optional[List[str]] = None, force: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Run fixers in dependency order, overlapping independent ones and skipping unchanged ones"""
+        return self.planner.execute(only, force=force)
+    
+    def _run(self, commands: List[Dict[str, Any]], label: str, command: List[str],
+             cwd: Optional[Path] = None) -> CommandResult:
+        """Run one fixer step through the shared runner and log its timing"""
+        result = self.runner.run(command, cwd=str(cwd) if cwd else None,
+                                 timeout=COMMAND_TIMEOUTS.get(label), label=label)
+        commands.append(result.timing())
+        if result.wall_time >= 30:
+            print(f"   ⏱️  {label} took {result.wall_time:.0f}s")
+        return result
     
-    def fix_cocoapods_issues(self) -> Dict[str, Any]:
-        """Automatically fix CocoaPods issues"""
+    @staticmethod
+    def _failure(result: CommandResult) -> str:
+        return result.error or result.stderr.strip()
+    
+    def _pods_cache_key(self) -> Optional[str]:
+        """Snapshot key for the current Podfile/Podfile.lock, or None if they can't be hashed"""
+        try:
+            return pods_cache_key(self.ios_path, self.toolchain.cocoapods_version())
+        except OSError:
+            return None
+    
+    def fix_cocoapods_issues(self, use_cache: bool = True) -> Dict[str, Any]:
+        """Automatically fix CocoaPods issues.
+        
+        With ``use_cache``, Pods/ is first restored from a local snapshot of
+        the same Podfile, Podfile.lock and CocoaPods version; the full reset
+        (cache clean, repo update, pod install) only runs when no snapshot
+        matches or the restored tree fails verification.
+        """
         print("🔧 Fixing CocoaPods issues...")
         
         fixes_applied = []
         errors = []
+        commands = []
+        started = time.perf_counter()
+        
+        cache_key = self._pods_cache_key() if use_cache else None
+        if cache_key and self.pods_cache.has(cache_key):
+            print(f"   📦 Restoring Pods from cache ({cache_key[:12]})...")
+            try:
+                restored = self.pods_cache.restore(self.ios_path, cache_key)
+                fixes_applied.append(
+                    f"Restored Pods from cache ({restored.files} files in {restored.duration:.1f}s)"
+                )
+                result = {
+                    "fixer_type": "CocoaPodsFixer",
+                    "fixes_applied": fixes_applied,
+                    "errors": errors,
+                    "success": True,
+                    "cache": "hit",
+                    "commands": commands,
+                    "duration": time.perf_counter() - started,
+                    "timestamp": time.time()
+                }
+                self.fix_history.append(result)
+                return result
+            except PodsCacheError as e:
+                print(f"   ⚠️  Cached Pods rejected ({e}); falling back to a full reset")
         
         try:
             # Step 1: Clean CocoaPods cache
             print("   🧹 Cleaning CocoaPods cache...")
-            result = subprocess.run([
-                "pod", "cache", "clean", "--all"
-            ], capture_output=True, text=True, cwd=str(self.ios_path))
+            result = self._run(commands, "pod cache clean", ["pod", "cache", "clean", "--all"], self.ios_path)
             
-            if result.returncode == 0:
+            if result.ok:
                 fixes_applied.append("Cleaned CocoaPods cache")
             else:
-                errors.append(f"Failed to clean cache: {result.stderr}")
+                errors.append(f"Failed to clean cache: {self._failure(result)}")
             
             # Step 2: Remove Podfile.lock and Pods directory
             print("   🗑️  Removing old Podfile.lock and Pods directory...")
@@ -55,25 +141,21 @@ class AutomatedFixer:
             
             # Step 3: Update CocoaPods repository
             print("   📦 Updating CocoaPods repository...")
-            result = subprocess.run([
-                "pod", "repo", "update"
-            ], capture_output=True, text=True, cwd=str(self.ios_path))
+            result = self._run(commands, "pod repo update", ["pod", "repo", "update"], self.ios_path)
             
-            if result.returncode == 0:
+            if result.ok:
                 fixes_applied.append("Updated CocoaPods repository")
             else:
-                errors.append(f"Failed to update repo: {result.stderr}")
+                errors.append(f"Failed to update repo: {self._failure(result)}")
             
             # Step 4: Install pods with repo update
             print("   ⚙️  Installing pods with --repo-update...")
-            result = subprocess.run([
-                "pod", "install", "--repo-update"
-            ], capture_output=True, text=True, cwd=str(self.ios_path))
+            result = self._run(commands, "pod install", ["pod", "install", "--repo-update"], self.ios_path)
             
-            if result.returncode == 0:
+            if result.ok:
                 fixes_applied.append("Installed pods with --repo-update")
             else:
-                errors.append(f"Failed to install pods: {result.stderr}")
+                errors.append(f"Failed to install pods: {self._failure(result)}")
             
             # Step 5: Verify installation
             print("   ✅ Verifying pod installation...")
@@ -82,6 +164,17 @@ class AutomatedFixer:
             else:
                 errors.append("Podfile.lock not created after installation")
             
+            # Step 6: Snapshot the fresh install so the next run can skip all of the above
+            if use_cache and not errors:
+                new_key = self._pods_cache_key()
+                if new_key:
+                    try:
+                        self.pods_cache.snapshot(self.ios_path, new_key)
+                        self.pods_cache.prune()
+                        fixes_applied.append(f"Cached Pods snapshot ({new_key[:12]})")
+                    except (OSError, PodsCacheError) as e:
+                        print(f"   ⚠️  Could not cache Pods: {e}")
+            
         except Exception as e:
             errors.append(f"Exception during CocoaPods fix: {str(e)}")
         
@@ -90,6 +183,9 @@ class AutomatedFixer:
             "fixes_applied": fixes_applied,
             "errors": errors,
             "success": len(errors) == 0,
+            "cache": "miss" if use_cache else "disabled",
+            "commands": commands,
+            "duration": time.perf_counter() - started,
             "timestamp": time.time()
         }
         
@@ -102,29 +198,27 @@ class AutomatedFixer:
         
         fixes_applied = []
         errors = []
+        commands = []
+        started = time.perf_counter()
         
         try:
             # Step 1: Clean Flutter build cache
             print("   🧹 Cleaning Flutter build cache...")
-            result = subprocess.run([
-                "flutter", "clean"
-            ], capture_output=True, text=True, cwd=str(self.flutter_path))
+            result = self._run(commands, "flutter clean", ["flutter", "clean"], self.flutter_path)
             
-            if result.returncode == 0:
+            if result.ok:
                 fixes_applied.append("Cleaned Flutter build cache")
             else:
-                errors.append(f"Failed to clean Flutter: {result.stderr}")
+                errors.append(f"Failed to clean Flutter: {self._failure(result)}")
             
             # Step 2: Get dependencies
             print("   📦 Getting Flutter dependencies...")
-            result = subprocess.run([
-                "flutter", "pub", "get"
-            ], capture_output=True, text=True, cwd=str(self.flutter_path))
+            result = self._run(commands, "flutter pub get", ["flutter", "pub", "get"], self.flutter_path)
             
-            if result.returncode == 0:
+            if result.ok:
                 fixes_applied.append("Got Flutter dependencies")
             else:
-                errors.append(f"Failed to get dependencies: {result.stderr}")
+                errors.append(f"Failed to get dependencies: {self._failure(result)}")
             
             # Step 3: Check for problematic dependencies in pubspec.yaml
             print("   🔍 Checking for problematic dependencies...")
@@ -142,14 +236,12 @@ class AutomatedFixer:
             
             # Step 4: Test Flutter doctor
             print("   🏥 Running Flutter doctor...")
-            result = subprocess.run([
-                "flutter", "doctor"
-            ], capture_output=True, text=True, cwd=str(self.flutter_path))
+            result = self._run(commands, "flutter doctor", ["flutter", "doctor"], self.flutter_path)
             
-            if result.returncode == 0:
+            if result.ok:
                 fixes_applied.append("Flutter doctor passed")
             else:
-                errors.append(f"Flutter doctor issues: {result.stderr}")
+                errors.append(f"Flutter doctor issues: {self._failure(result)}")
             
         except Exception as e:
             errors.append(f"Exception during Flutter fix: {str(e)}")
@@ -159,6 +251,8 @@ class AutomatedFixer:
             "fixes_applied": fixes_applied,
             "errors": errors,
             "success": len(errors) == 0,
+            "commands": commands,
+            "duration": time.perf_counter() - started,
             "timestamp": time.time()
         }
         
@@ -171,6 +265,8 @@ class AutomatedFixer:
         
         fixes_applied = []
         errors = []
+        commands = []
+        started = time.perf_counter()
         
         try:
             # Step 1: Check current code signing configuration
@@ -195,11 +291,10 @@ class AutomatedFixer:
             
             # Step 2: Verify certificates in keychain
             print("   🔐 Checking certificates in keychain...")
-            result = subprocess.run([
-                "security", "find-identity", "-v", "-p", "codesigning"
-            ], capture_output=True, text=True)
+            result = self._run(commands, "security find-identity",
+                               ["security", "find-identity", "-v", "-p", "codesigning"])
             
-            if result.returncode == 0:
+            if result.ok:
                 if "Apple Distribution" in result.stdout or "iPhone Distribution" in result.stdout:
                     fixes_applied.append("Distribution certificate found in keychain")
                 else:
@@ -220,6 +315,8 @@ class AutomatedFixer:
             "fixes_applied": fixes_applied,
             "errors": errors,
             "success": len(errors) == 0,
+            "commands": commands,
+            "duration": time.perf_counter() - started,
             "timestamp": time.time()
         }
         
@@ -232,13 +329,13 @@ class AutomatedFixer:
         
         fixes_applied = []
         errors = []
+        commands = []
+        started = time.perf_counter()
         
         try:
             # Step 1: Check Xcode version
             print("   🔍 Checking Xcode version...")
-            result = subprocess.run([
-                "xcodebuild", "-version"
-            ], capture_output=True, text=True)
+            result = self.toolchain.run(["xcodebuild", "-version"])
             
             if result.returncode == 0:
                 xcode_version = result.stdout.strip()
@@ -248,11 +345,9 @@ class AutomatedFixer:
             
             # Step 2: Check macOS version
             print("   🖥️  Checking macOS version...")
-            result = subprocess.run([
-                "sw_vers", "-productVersion"
-            ], capture_output=True, text=True)
+            result = self._run(commands, "sw_vers", ["sw_vers", "-productVersion"])
             
-            if result.returncode == 0:
+            if result.ok:
                 macos_version = result.stdout.strip()
                 fixes_applied.append(f"macOS version: {macos_version}")
             else:
@@ -260,9 +355,7 @@ class AutomatedFixer:
             
             # Step 3: Check Flutter SDK
             print("   📱 Checking Flutter SDK...")
-            result = subprocess.run([
-                "flutter", "--version"
-            ], capture_output=True, text=True)
+            result = self.toolchain.run(["flutter", "--version"])
             
             if result.returncode == 0:
                 flutter_version = result.stdout.strip().split('\n')[0]
@@ -272,9 +365,7 @@ class AutomatedFixer:
             
             # Step 4: Check CocoaPods
             print("   📦 Checking CocoaPods...")
-            result = subprocess.run([
-                "pod", "--version"
-            ], capture_output=True, text=True)
+            result = self.toolchain.run(["pod", "--version"])
             
             if result.returncode == 0:
                 pod_version = result.stdout.strip()
@@ -290,6 +381,8 @@ class AutomatedFixer:
             "fixes_applied": fixes_applied,
             "errors": errors,
             "success": len(errors) == 0,
+            "commands": commands,
+            "duration": time.perf_counter() - started,
             "timestamp": time.time()
         }
         
@@ -399,19 +492,19 @@ class AutomatedFixer:
         self.fix_history.append(result)
         return result
     
-    def run_comprehensive_fix(self) -> Dict[str, Any]:
-        """Run comprehensive fix for all known issues"""
-        print("🚀 Running comprehensive fix for all issues...")
+    def run_comprehensive_fix(self, force: bool = False) -> Dict[str, Any]:
+        """Run comprehensive fix for all known issues.
         
-        fix_results = {}
+        Fixers run through the fix planner: Flutter before CocoaPods, the
+        read-only checks alongside them, and any fixer whose inputs are
+        unchanged since its last successful run is skipped unless ``force``.
+        """
+        print("🚀 Running comprehensive fix for all issues...")
+        started = time.perf_counter()
         
-        # Run all fixers
-        fix_results["cocoapods"] = self.fix_cocoapods_issues()
-        fix_results["flutter"] = self.fix_flutter_issues()
-        fix_results["code_signing"] = self.fix_code_signing_issues()
-        fix_results["build_environment"] = self.fix_build_environment_issues()
-        fix_results["xcode_cloud"] = self.fix_xcode_cloud_issues()
-        fix_results["app_store"] = self.fix_app_store_connect_issues()
+        fix_results = self.run_fixes(force=force)
+        ran = {name: result for name, result in fix_results.items() if not result.get("skipped")}
+        commands = [command for result in ran.values() for command in result.get("commands", [])]
         
         # Calculate overall success
         total_fixes = len(fix_results)
@@ -422,6 +515,10 @@ class AutomatedFixer:
             "successful_fixes": successful_fixes,
             "success_rate": successful_fixes / total_fixes if total_fixes > 0 else 0,
             "fix_results": fix_results,
+            "skipped_fixes": [name for name in fix_results if name not in ran],
+            "duration": time.perf_counter() - started,
+            "fixer_durations": {name: result.get("duration") for name, result in ran.items()},
+            "slowest_commands": sorted(commands, key=lambda c: c["wall_time"], reverse=True)[:5],
             "timestamp": time.time()
         }
         
@@ -442,10 +539,13 @@ Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}
 
 """
         
+        commands = [command for result in fix_results['fix_results'].values() if not result.get('skipped')
+                    for command in result.get('commands', [])]
+        
         for fixer_type, result in fix_results['fix_results'].items():
             report += f"""
 ### {fixer_type.replace('_', ' ').title()} Fixer
-- **Status**: {'✅ Success' if result['success'] else '❌ Failed'}
+- **Status**: {'✅ Success' if result['success'] else '❌ Failed'}{f" (skipped: {result['skip_reason']})" if result.get('skipped') else ''}
 - **Fixes Applied**: {len(result['fixes_applied'])}
 - **Errors**: {len(result['errors'])}
 
@@ -459,6 +559,16 @@ Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}
                 for error in result['errors']:
                     report += f"- ❌ {error}\n"
         
+        if commands:
+            report += f"""
+## ⏱️ Slowest Steps
+Total: {fix_results.get('duration', 0):.1f}s wall clock
+
+```
+{format_timings(commands)}
+```
+"""
+        
         report += """
 ## 🎯 Next Steps
 1. Review fix results and address any remaining errors
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Build Log Analyzer
+Streaming, constant-memory pattern scanner for large xcodebuild / Xcode Cloud logs
+"""
+
+import io
+import re
+import sys
+import gzip
+import time
+import heapq
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Iterable, Optional, TextIO
+
+DEFAULT_CONTEXT_LINES = 2
+DEFAULT_MAX_MATCHES_PER_PATTERN = 100
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+MAX_STORED_LINE_LENGTH = 1000
+
+REGEX_METACHARACTERS = re.compile(r"[\\.^$*+?{}\[\]|()]")
+
+@dataclass
+class LogMatch:
+    """One line matching a knowledge-base pattern"""
+    pattern: str
+    line_number: int
+    line: str
+    context_before: List[str] = field(default_factory=list)
+    context_after: List[str] = field(default_factory=list)
+
+@dataclass
+class LogAnalysis:
+    """Per-pattern occurrence counts and the first matches of each pattern"""
+    source: str
+    counts: Dict[str, int]
+    matches: Dict[str, List[LogMatch]]
+    lines_scanned: int = 0
+    chars_scanned: int = 0
+    elapsed_seconds: float = 0.0
+
+    def matched_patterns(self) -> List[str]:
+        return [pattern for pattern, count in self.counts.items() if count]
+
+
+def _clip(line: str) -> str:
+    line = line.rstrip("\r")
+    return line if len(line) <= MAX_STORED_LINE_LENGTH else line[:MAX_STORED_LINE_LENGTH] + "…"
+
+
+class LogScanner:
+    """Incremental scanner; feed it text in arbitrary chunks.
+
+    Complete lines are searched with the analyzer's combined matchers, so
+    the regex engine skips non-matching text without a Python-level loop
+    per line. Only candidate lines are re-checked against the individual
+    patterns. Matches are returned as soon as their
+    line is complete; their ``context_after`` fills in as later text
+    arrives.
+    """
+
+    def __init__(self, analyzer: "BuildLogAnalyzer", source: str):
+        self.analyzer = analyzer
+        self.analysis = LogAnalysis(
+            source=source,
+            counts={pattern: 0 for pattern in analyzer.patterns},
+            matches={pattern: [] for pattern in analyzer.patterns}
+        )
+        self._started = time.perf_counter()
+        self._carry = ""
+        self._recent: deque = deque(maxlen=analyzer.context_lines)
+        self._awaiting: List[LogMatch] = []
+
+    def feed(self, text: str) -> List[LogMatch]:
+        """Scan any lines completed by ``text``; returns the new matches"""
+        self.analysis.chars_scanned += len(text)
+        text = self._carry + text
+        cut = text.rfind("\n") + 1
+        self._carry = text[cut:]
+        return self._scan(text[:cut]) if cut else []
+
+    def flush(self) -> List[LogMatch]:
+        """Scan a trailing unterminated line, e.g. at end of input"""
+        if not self._carry:
+            return []
+        body, self._carry = self._carry + "\n", ""
+        return self._scan(body)
+
+    def finish(self) -> LogAnalysis:
+        """Flush a trailing unterminated line and return the analysis"""
+        self.flush()
+        self._awaiting = []
+        self.analysis.elapsed_seconds = time.perf_counter() - self._started
+        return self.analysis
+
+    def _scan(self, body: str) -> List[LogMatch]:
+        """Scan a block of complete lines (``body`` ends with a newline)"""
+        context = self.analyzer.context_lines
+        line_count = body.count("\n")
+
+        if self._awaiting:
+            head = [_clip(line) for line in body.split("\n", context)[:min(context, line_count)]]
+            for match in self._awaiting:
+                match.context_after.extend(head[:context - len(match.context_after)])
+            self._awaiting = [match for match in self._awaiting if len(match.context_after) < context]
+
+        found = []
+        line_number = self.analysis.lines_scanned
+        counted_to = 0
+        next_line = 0
+        for position in self._candidates(body):
+            if position < next_line:
+                continue
+
+            start = body.rfind("\n", 0, position) + 1
+            end = body.find("\n", position)
+            next_line = end + 1
+            line_number += body.count("\n", counted_to, start)
+            counted_to = start
+            line = body[start:end]
+
+            patterns = [pattern for pattern, regex in self.analyzer.compiled if regex.search(line)]
+            if not patterns:
+                continue
+
+            before = self._lines_before(body, start)
+            after = self._lines_after(body, end)
+            for pattern in patterns:
+                match = LogMatch(pattern, line_number + 1, _clip(line), list(before), list(after))
+                self.analysis.counts[pattern] += 1
+                stored = self.analysis.matches[pattern]
+                if len(stored) < self.analyzer.max_matches_per_pattern:
+                    stored.append(match)
+                if len(after) < context:
+                    self._awaiting.append(match)
+                found.append(match)
+
+        if context:
+            self._recent.extend(_clip(line) for line in body[:-1].rsplit("\n", context)[-context:])
+        self.analysis.lines_scanned += line_count
+        return found
+
+    def _candidates(self, body: str) -> Iterable[int]:
+        """Ascending offsets in ``body`` where some pattern may match"""
+        analyzer = self.analyzer
+        if analyzer.literal_matcher is None or not body.isascii():
+            return (hit.start() for hit in analyzer.combined.finditer(body))
+
+        # Case-folding ASCII keeps offsets, and a case-sensitive literal
+        # alternation is several times faster than an IGNORECASE one
+        text = body.lower() if analyzer.ignore_case else body
+        streams = [(hit.start() for hit in analyzer.literal_matcher.finditer(text))]
+        if analyzer.regex_matcher is not None:
+            streams.append(hit.start() for hit in analyzer.regex_matcher.finditer(body))
+        return heapq.merge(*streams)
+
+    def _lines_before(self, body: str, start: int) -> List[str]:
+        context = self.analyzer.context_lines
+        lines = []
+        index = start
+        while len(lines) < context and index > 0:
+            previous = body.rfind("\n", 0, index - 1) + 1
+            lines.append(_clip(body[previous:index - 1]))
+            index = previous
+        missing = context - len(lines)
+        if missing and self._recent:
+            lines.extend(reversed(list(self._recent)[-missing:]))
+        lines.reverse()
+        return lines
+
+    def _lines_after(self, body: str, end: int) -> List[str]:
+        lines = []
+        index = end + 1
+        while len(lines) < self.analyzer.context_lines and index < len(body):
+            following = body.find("\n", index)
+            lines.append(_clip(body[index:following]))
+            index = following + 1
+        return lines
+
+
+class BuildLogAnalyzer:
+    """Finds every occurrence of a set of regex patterns in build logs"""
+
+    def __init__(self, patterns: Iterable[str], context_lines: int = DEFAULT_CONTEXT_LINES,
+                 max_matches_per_pattern: int = DEFAULT_MAX_MATCHES_PER_PATTERN,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, flags: int = re.IGNORECASE):
+        self.patterns = list(patterns)
+        self.context_lines = context_lines
+        self.max_matches_per_pattern = max_matches_per_pattern
+        self.chunk_size = chunk_size
+        self.compiled = [(pattern, re.compile(pattern, flags)) for pattern in self.patterns]
+        self.ignore_case = bool(flags & re.IGNORECASE)
+
+        # Candidate lines for every pattern are found in one regex pass.
+        # Plain-text patterns (all of the knowledge base today) get their own
+        # literal matcher; see LogScanner._candidates.
+        literals = [pattern for pattern in self.patterns if not REGEX_METACHARACTERS.search(pattern)]
+        regexes = [pattern for pattern in self.patterns if pattern not in literals]
+        self.combined = self._alternation(self.patterns, flags)
+        self.literal_matcher = None
+        self.regex_matcher = None
+        if literals:
+            folded = [literal.lower() if self.ignore_case else literal for literal in literals]
+            self.literal_matcher = re.compile("|".join(re.escape(literal) for literal in folded))
+            self.regex_matcher = self._alternation(regexes, flags) if regexes else None
+
+    @staticmethod
+    def _alternation(patterns: List[str], flags: int):
+        return re.compile("|".join(f"(?:{pattern})" for pattern in patterns) or "(?!)", flags)
+
+    def scanner(self, source: str = "<stream>") -> LogScanner:
+        return LogScanner(self, source)
+
+    def analyze_stream(self, stream: TextIO, source: str = "<stream>") -> LogAnalysis:
+        """Read ``stream`` in chunks of chunk_size characters"""
+        scanner = self.scanner(source)
+        while True:
+            chunk = stream.read(self.chunk_size)
+            if not chunk:
+                break
+            scanner.feed(chunk)
+        return scanner.finish()
+
+    def analyze_text(self, text: str, source: str = "<string>") -> LogAnalysis:
+        return self.analyze_stream(io.StringIO(text), source)
+
+    def analyze_file(self, path: str) -> LogAnalysis:
+        """Analyze a log file, a gzip-compressed log (.gz) or stdin ("-")"""
+        if path == "-":
+            return self.analyze_stream(sys.stdin, "<stdin>")
+        with open_log(path, self.chunk_size) as f:
+            return self.analyze_stream(f, path)
+
+
+def open_log(path: str, buffering: int = DEFAULT_CHUNK_SIZE) -> TextIO:
+    """Open a build log as text, transparently decompressing .gz files"""
+    if path.endswith(".gz"):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace', buffering=buffering)
+
+
+def format_analysis(analysis: LogAnalysis, descriptions: Optional[Dict[str, str]] = None) -> str:
+    """Human-readable occurrence listing"""
+    descriptions = descriptions or {}
+    lines = [
+        f"📄 {analysis.source}: {analysis.lines_scanned:,} lines scanned in {analysis.elapsed_seconds:.2f}s"
+    ]
+    for pattern in analysis.matched_patterns():
+        lines.append(f"\n⚠️  {descriptions.get(pattern, pattern)} — {analysis.counts[pattern]} occurrence(s)")
+        for match in analysis.matches[pattern]:
+            lines.append(f"  line {match.line_number}:")
+            lines.extend(f"      {line}" for line in match.context_before)
+            lines.append(f"    > {match.line}")
+            lines.extend(f"      {line}" for line in match.context_after)
+        hidden = analysis.counts[pattern] - len(analysis.matches[pattern])
+        if hidden > 0:
+            lines.append(f"  … {hidden} more")
+    if not analysis.matched_patterns():
+        lines.append("✅ No known issues found")
+    return "\n".join(lines)
+
+
+def main():
+    """Analyze build logs against the XCodeDeployBot knowledge base"""
+    import argparse
+    from xcode_deploy_bot import XCodeDeployBot
+
+    parser = argparse.ArgumentParser(description="Stream-analyze xcodebuild / Xcode Cloud logs")
+    parser.add_argument("paths", nargs="+", help="Log files (.gz supported), or - for stdin")
+    parser.add_argument("--context", type=int, default=DEFAULT_CONTEXT_LINES, help="Context lines around matches")
+    parser.add_argument("--max-matches", type=int, default=DEFAULT_MAX_MATCHES_PER_PATTERN,
+                        help="Occurrences kept per pattern (all are counted)")
+    args = parser.parse_args()
+
+    error_patterns = XCodeDeployBot().knowledge_base["error_patterns"]
+    analyzer = BuildLogAnalyzer(error_patterns, context_lines=args.context, max_matches_per_pattern=args.max_matches)
+    descriptions = {pattern: info["description"] for pattern, info in error_patterns.items()}
+
+    for path in args.paths:
+        print(format_analysis(analyzer.analyze_file(path), descriptions))
+
+
+if __name__ == "__main__":
+    main()
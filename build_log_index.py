@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Build Log Index
+Deduplicated, full-text searchable (SQLite FTS5) archive of historical build logs
+"""
+
+import os
+import sys
+import glob
+import time
+import zlib
+import sqlite3
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from build_log_analyzer import open_log
+from build_phase_profiler import parse_timestamp
+from metrics_storage import initialize_database, BUILD_LOG_SCHEMA, DEPLOYMENT_SCHEMA
+
+# Content-defined chunking: a line whose hash has the low bits clear ends a
+# chunk, so an inserted line only changes the chunk around it and the rest
+# of a log still deduplicates against earlier builds
+CHUNK_BOUNDARY_MASK = 0x3F   # ~64 lines per chunk on average
+MIN_CHUNK_LINES = 16
+MAX_CHUNK_LINES = 512
+SNIPPET_TOKENS = 16
+
+@dataclass
+class LogSearchHit:
+    """A matching chunk of an indexed build log, with the build's outcome"""
+    build_id: str
+    path: Optional[str]
+    line_number: int
+    snippet: str
+    status: Optional[str] = None
+    error_type: Optional[str] = None
+    fixer_applied: Optional[str] = None
+    fix_success: Optional[bool] = None
+    build_timestamp: Optional[float] = None
+
+
+def fts_phrase(text: str) -> str:
+    """Quote arbitrary text (e.g. 'CODE_SIGN_IDENTITY=-') as one FTS5 phrase"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def check_fts5():
+    """Raise ValueError if this Python's SQLite lacks FTS5"""
+    conn = sqlite3.connect(":memory:")
+    try:
+        conn.execute("CREATE VIRTUAL TABLE fts5_probe USING fts5(content)")
+    except sqlite3.OperationalError:
+        raise ValueError("Build log search requires SQLite compiled with FTS5")
+    finally:
+        conn.close()
+
+
+class BuildLogIndex:
+    """Ingests build logs as hashed chunks and answers full-text queries.
+
+    Lives in the deployment metrics database by default so hits can be
+    joined with build_metrics (status, error type, fixer applied).
+    """
+
+    def __init__(self, db_path: str = "deployment_metrics.db", strip_timestamps: bool = True):
+        check_fts5()
+        self.db_path = db_path
+        # CI timestamps differ on every run and would defeat chunk dedup
+        self.strip_timestamps = strip_timestamps
+        # Hits are joined with build_metrics, so make sure it exists too
+        initialize_database(self.db_path, DEPLOYMENT_SCHEMA)
+        initialize_database(self.db_path, BUILD_LOG_SCHEMA)
+
+    def _chunks(self, lines: Iterable[str]) -> Iterable[Tuple[int, int, str]]:
+        """Yield (first_line, line_count, content) chunks"""
+        chunk: List[str] = []
+        first_line = 1
+        line_number = 0
+        for raw in lines:
+            line_number += 1
+            line = raw.rstrip("\r\n")
+            if self.strip_timestamps:
+                line = parse_timestamp(line)[1]
+            chunk.append(line)
+            boundary = (zlib.crc32(line.encode("utf-8", "replace")) & CHUNK_BOUNDARY_MASK) == 0
+            if len(chunk) >= MAX_CHUNK_LINES or (boundary and len(chunk) >= MIN_CHUNK_LINES):
+                yield first_line, len(chunk), "\n".join(chunk)
+                first_line = line_number + 1
+                chunk = []
+        if chunk:
+            yield first_line, len(chunk), "\n".join(chunk)
+
+    def ingest_lines(self, lines: Iterable[str], build_id: str, path: Optional[str] = None) -> Dict[str, Any]:
+        """Index one log; a byte-identical log already in the index is skipped.
+
+        Everything runs in one transaction, so a failed ingest leaves no
+        partial log behind.
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO build_logs (build_id, path, ingested_at) VALUES (?, ?, ?)",
+                    (build_id, path, time.time())
+                )
+                log_id = cursor.lastrowid
+                log_hash = hashlib.blake2b(digest_size=16)
+                line_count = chunk_count = new_chunks = 0
+
+                for seq, (first_line, count, content) in enumerate(self._chunks(lines)):
+                    encoded = content.encode("utf-8", "replace")
+                    log_hash.update(encoded + b"\n")
+                    chunk_hash = hashlib.blake2b(encoded, digest_size=16).hexdigest()
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO log_chunks (hash, content, line_count) VALUES (?, ?, ?)",
+                        (chunk_hash, content, count)
+                    )
+                    if cursor.rowcount:
+                        chunk_id = cursor.lastrowid
+                        conn.execute("INSERT INTO log_chunks_fts (rowid, content) VALUES (?, ?)", (chunk_id, content))
+                        new_chunks += 1
+                    else:
+                        chunk_id = conn.execute("SELECT id FROM log_chunks WHERE hash = ?", (chunk_hash,)).fetchone()[0]
+                    conn.execute(
+                        "INSERT INTO log_chunk_refs (log_id, seq, chunk_id, first_line) VALUES (?, ?, ?, ?)",
+                        (log_id, seq, chunk_id, first_line)
+                    )
+                    line_count += count
+                    chunk_count += 1
+
+                content_hash = log_hash.hexdigest()
+                duplicate = conn.execute(
+                    "SELECT id FROM build_logs WHERE content_hash = ? AND build_id = ?", (content_hash, build_id)
+                ).fetchone()
+                if duplicate:
+                    conn.rollback()
+                    return {"log_id": duplicate[0], "build_id": build_id, "duplicate": True,
+                            "lines": line_count, "chunks": chunk_count, "new_chunks": 0}
+
+                conn.execute('''
+                    UPDATE build_logs SET content_hash = ?, line_count = ?, chunk_count = ?, new_chunk_count = ?
+                    WHERE id = ?
+                ''', (content_hash, line_count, chunk_count, new_chunks, log_id))
+        finally:
+            conn.close()
+
+        return {"log_id": log_id, "build_id": build_id, "duplicate": False,
+                "lines": line_count, "chunks": chunk_count, "new_chunks": new_chunks}
+
+    def ingest_log(self, path: str, build_id: str) -> Dict[str, Any]:
+        """Index a log file (.gz supported) or stdin ("-")"""
+        if path == "-":
+            return self.ingest_lines(sys.stdin, build_id)
+        with open_log(path) as f:
+            return self.ingest_lines(f, build_id, os.path.abspath(path))
+
+    def ingest_directory(self, directory: str, pattern: str = "*.log*") -> List[Dict[str, Any]]:
+        """Index every matching log, using the file name (minus extensions) as build_id"""
+        results = []
+        for path in sorted(glob.glob(os.path.join(directory, "**", pattern), recursive=True)):
+            build_id = os.path.basename(path).split(".")[0]
+            results.append(self.ingest_log(path, build_id))
+        return results
+
+    def search(self, query: str, limit: int = 20, build_id: Optional[str] = None,
+               raw: bool = False) -> List[LogSearchHit]:
+        """Newest builds whose logs match ``query``.
+
+        ``query`` is treated as a literal phrase unless ``raw`` is set, in
+        which case it is passed through as FTS5 query syntax
+        (e.g. 'xcfilelist AND "exit-code: 65"').
+        """
+        match = query if raw else fts_phrase(query)
+        build_filter, params = ("AND l.build_id = ?", [match, build_id, limit]) if build_id else ("", [match, limit])
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute(f'''
+                WITH hits AS (
+                    SELECT rowid AS chunk_id FROM log_chunks_fts WHERE log_chunks_fts MATCH ?
+                )
+                SELECT l.build_id, l.path, MIN(r.first_line), h.chunk_id,
+                       bm.status, bm.error_type, bm.fixer_applied, bm.fix_success, bm.timestamp
+                FROM hits h
+                JOIN log_chunk_refs r ON r.chunk_id = h.chunk_id
+                JOIN build_logs l ON l.id = r.log_id
+                LEFT JOIN build_metrics bm ON bm.id = (
+                    SELECT MAX(id) FROM build_metrics WHERE build_id = l.build_id
+                )
+                WHERE 1 {build_filter}
+                GROUP BY l.id
+                ORDER BY l.ingested_at DESC
+                LIMIT ?
+            ''', params).fetchall()
+
+            hits = []
+            for build, path, first_line, chunk_id, status, error_type, fixer, fix_success, built_at in rows:
+                # Snippets only for the rows returned, not for every matching chunk
+                snippet = conn.execute(f'''
+                    SELECT snippet(log_chunks_fts, 0, '[', ']', '…', {SNIPPET_TOKENS})
+                    FROM log_chunks_fts
+                    WHERE log_chunks_fts MATCH ? AND rowid = ?
+                ''', (match, chunk_id)).fetchone()[0]
+                offset = 0 if raw else self._line_offset(conn, chunk_id, query)
+                hits.append(LogSearchHit(
+                    build_id=build, path=path, line_number=first_line + offset, snippet=snippet,
+                    status=status, error_type=error_type, fixer_applied=fixer,
+                    fix_success=None if fix_success is None else bool(fix_success), build_timestamp=built_at
+                ))
+        finally:
+            conn.close()
+        return hits
+
+    def _line_offset(self, conn: sqlite3.Connection, chunk_id: int, text: str) -> int:
+        """Line of the first literal match within a chunk, for precise line numbers"""
+        content = conn.execute("SELECT content FROM log_chunks WHERE id = ?", (chunk_id,)).fetchone()[0]
+        position = content.lower().find(text.lower())
+        return content.count("\n", 0, position) if position >= 0 else 0
+
+    def builds_with_signature(self, signature: str, limit: int = 50) -> List[LogSearchHit]:
+        """Past builds whose logs contain an error signature, newest first"""
+        return self.search(signature, limit=limit)
+
+    def fixers_for_signature(self, signature: str) -> List[Dict[str, Any]]:
+        """Fixers applied to builds containing ``signature``, best success rate first"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute('''
+                WITH matched AS (
+                    SELECT DISTINCT l.build_id
+                    FROM log_chunks_fts f
+                    JOIN log_chunk_refs r ON r.chunk_id = f.rowid
+                    JOIN build_logs l ON l.id = r.log_id
+                    WHERE log_chunks_fts MATCH ?
+                )
+                SELECT bm.fixer_applied, COUNT(DISTINCT bm.build_id),
+                       AVG(CASE WHEN bm.fix_success THEN 1.0 ELSE 0.0 END), MAX(bm.timestamp)
+                FROM matched m
+                JOIN build_metrics bm ON bm.build_id = m.build_id
+                WHERE bm.fixer_applied IS NOT NULL AND bm.fixer_applied != ''
+                GROUP BY bm.fixer_applied
+            ''', (fts_phrase(signature),)).fetchall()
+        finally:
+            conn.close()
+
+        fixers = [
+            {"fixer": fixer, "builds": builds, "success_rate": success_rate, "last_applied": last_applied}
+            for fixer, builds, success_rate, last_applied in rows
+        ]
+        fixers.sort(key=lambda entry: (entry["success_rate"], entry["builds"]), reverse=True)
+        return fixers
+
+    def stats(self) -> Dict[str, Any]:
+        """Index size and how much chunk dedup saves"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            logs, lines = conn.execute("SELECT COUNT(*), IFNULL(SUM(line_count), 0) FROM build_logs").fetchone()
+            chunks, stored_lines = conn.execute(
+                "SELECT COUNT(*), IFNULL(SUM(line_count), 0) FROM log_chunks"
+            ).fetchone()
+            refs = conn.execute("SELECT COUNT(*) FROM log_chunk_refs").fetchone()[0]
+        finally:
+            conn.close()
+        return {
+            "logs": logs,
+            "lines": lines,
+            "chunks": refs,
+            "unique_chunks": chunks,
+            "stored_lines": stored_lines,
+            "dedup_ratio": 1 - stored_lines / lines if lines else 0.0
+        }
+
+
+def main():
+    """Ingest and search historical build logs"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Full-text index of historical build logs")
+    parser.add_argument("--db", default="deployment_metrics.db", help="Deployment metrics database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Index log files or directories")
+    ingest.add_argument("paths", nargs="+", help="Log files (.gz supported) or directories")
+    ingest.add_argument("--build-id", help="Build id for a single log (default: file name)")
+
+    search = commands.add_parser("search", help="Find builds whose logs contain a signature")
+    search.add_argument("query")
+    search.add_argument("--raw", action="store_true", help="Use FTS5 query syntax instead of a literal phrase")
+    search.add_argument("--limit", type=int, default=20)
+
+    commands.add_parser("stats", help="Show index size and dedup ratio")
+    args = parser.parse_args()
+
+    index = BuildLogIndex(args.db)
+
+    if args.command == "ingest":
+        for path in args.paths:
+            if os.path.isdir(path):
+                results = index.ingest_directory(path)
+            else:
+                results = [index.ingest_log(path, args.build_id or os.path.basename(path).split(".")[0])]
+            for result in results:
+                state = "already indexed" if result["duplicate"] else f"{result['new_chunks']}/{result['chunks']} new chunks"
+                print(f"📥 {result['build_id']}: {result['lines']:,} lines, {state}")
+
+    elif args.command == "search":
+        started = time.perf_counter()
+        hits = index.search(args.query, limit=args.limit, raw=args.raw)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"🔎 {len(hits)} build(s) in {elapsed:.1f} ms")
+        for hit in hits:
+            outcome = hit.status or "unknown"
+            fixer = f", fixed by {hit.fixer_applied} ({'✅' if hit.fix_success else '❌'})" if hit.fixer_applied else ""
+            print(f"   {hit.build_id} line {hit.line_number} [{outcome}{fixer}]: {' ⏎ '.join(hit.snippet.splitlines())}")
+        if not args.raw:
+            for fixer in index.fixers_for_signature(args.query):
+                print(f"   🔧 {fixer['fixer']}: {fixer['success_rate']:.0%} success over {fixer['builds']} build(s)")
+
+    else:
+        stats = index.stats()
+        print(f"📚 {stats['logs']} logs, {stats['lines']:,} lines, {stats['unique_chunks']}/{stats['chunks']} "
+              f"unique chunks, dedup saves {stats['dedup_ratio']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Build Phase Profiler
+Per-phase and per-target build timings from xcodebuild, Xcode Cloud and flutter logs
+"""
+
+import re
+import sys
+import calendar
+from dataclasses import dataclass, field
+from typing import Dict, List, Iterable, Optional, Tuple
+
+from build_log_analyzer import open_log
+
+# Where a timing came from; rankings never mix sources
+SOURCE_TIMESTAMPS = "timestamps"   # gaps between timestamped task lines
+SOURCE_SUMMARY = "summary"         # xcodebuild -showBuildTimingSummary
+SOURCE_FLUTTER = "flutter"         # flutter tool status lines
+SOURCE_TASKS = "tasks"             # untimestamped logs: task counts only
+
+# "CompileSwift normal arm64 /path/File.swift (in target 'Runner' from project 'Runner')"
+TASK_LINE = re.compile(
+    r"^(?P<phase>[A-Z][A-Za-z]+)\s+(?P<args>.*?)\s*\(in target '(?P<target>[^']*)' from project '(?P<project>[^']*)'\)\s*$"
+)
+# "CompileC (120 tasks) | 60.123 seconds"
+SUMMARY_LINE = re.compile(r"^(?P<phase>[A-Z][A-Za-z]+) \((?P<tasks>\d+) tasks?\) \| (?P<seconds>[\d.]+) seconds\s*$")
+# "Running pod install...                                  12.3s", "Xcode build done.    95.2s"
+FLUTTER_LINE = re.compile(
+    r"^(?P<label>(?:Running|Building|Xcode|Compiling|Resolving|Archiving|Upgrading)\b.*?)\.*\s{2,}"
+    r"(?P<value>\d[\d,]*(?:\.\d+)?)(?P<unit>ms|s)\s*$"
+)
+# "2024-05-01T12:34:56.1234567Z ", "[2024-05-01 12:34:56] ", "12:34:56.789 "
+ISO_TIMESTAMP = re.compile(
+    r"^\[?(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})(?:[.,](\d+))?(Z|[+-]\d{2}:?\d{2})?\]?\s+"
+)
+TIME_OF_DAY = re.compile(r"^\[?(\d{2}):(\d{2}):(\d{2})(?:[.,](\d+))?\]?\s+")
+
+# Xcode 14+ renamed some tasks; keep one name per phase across Xcode versions
+PHASE_ALIASES = {"SwiftCompile": "CompileSwift"}
+
+@dataclass
+class PhaseTiming:
+    """Time spent in one phase, optionally for one target"""
+    phase: str
+    duration: float
+    task_count: int = 1
+    target: str = ""
+    project: str = ""
+    detail: str = ""   # script name for PhaseScriptExecution
+    source: str = SOURCE_TIMESTAMPS
+    outcome: str = ""  # Gradle task outcome (EXECUTED, UP-TO-DATE, ...)
+
+@dataclass
+class BuildProfile:
+    """All phase timings parsed from one build log"""
+    build_id: str
+    timings: List[PhaseTiming] = field(default_factory=list)
+    total_duration: Optional[float] = None
+    lines_scanned: int = 0
+
+    def sources(self) -> List[str]:
+        return sorted({timing.source for timing in self.timings})
+
+    def ranked(self, source: str) -> List[PhaseTiming]:
+        return sorted((t for t in self.timings if t.source == source), key=lambda t: t.duration, reverse=True)
+
+
+def _fraction(digits: Optional[str]) -> float:
+    return float(f"0.{digits}") if digits else 0.0
+
+
+def parse_timestamp(line: str) -> Tuple[Optional[float], str]:
+    """Split a leading CI timestamp off a log line; returns (seconds, rest).
+
+    Time-of-day stamps are seconds since midnight; callers handle the wrap.
+    """
+    match = ISO_TIMESTAMP.match(line)
+    if match:
+        year, month, day, hour, minute, second = (int(g) for g in match.groups()[:6])
+        seconds = calendar.timegm((year, month, day, hour, minute, second)) + _fraction(match.group(7))
+        zone = match.group(8)
+        if zone and zone != "Z":
+            sign = 1 if zone[0] == "+" else -1
+            zone = zone[1:].replace(":", "")
+            seconds -= sign * (int(zone[:2]) * 3600 + int(zone[2:]) * 60)
+        return seconds, line[match.end():]
+
+    match = TIME_OF_DAY.match(line)
+    if match:
+        hour, minute, second = (int(g) for g in match.groups()[:3])
+        return hour * 3600 + minute * 60 + second + _fraction(match.group(4)), line[match.end():]
+
+    return None, line
+
+
+def _script_name(args: str) -> str:
+    """'Run\\ Script /path/Script-1.sh' -> 'Run Script'"""
+    match = re.match(r"(?:\\ |[^ ])+", args)
+    return match.group(0).replace("\\ ", " ") if match else ""
+
+
+class BuildPhaseProfiler:
+    """Streams a build log once and accumulates phase timings.
+
+    xcodebuild prints each task's block when the task finishes, so with
+    timestamped logs the wall-clock gap before a task line is charged to
+    that task. Parallel tasks overlap, so these timings show where the
+    build waited rather than total CPU time. When the build ran with
+    ``-showBuildTimingSummary`` the summary's per-phase totals are kept as
+    well, under their own source.
+    """
+
+    def parse_file(self, path: str, build_id: str) -> BuildProfile:
+        if path == "-":
+            return self.parse_lines(sys.stdin, build_id)
+        with open_log(path) as f:
+            return self.parse_lines(f, build_id)
+
+    def parse_lines(self, lines: Iterable[str], build_id: str) -> BuildProfile:
+        profile = BuildProfile(build_id=build_id)
+        timed: Dict[Tuple[str, str, str, str], PhaseTiming] = {}
+        first_ts = last_ts = previous_ts = None
+        day_offset = 0.0
+        flutter_build_time = None
+
+        for raw in lines:
+            profile.lines_scanned += 1
+            ts, line = parse_timestamp(raw.rstrip("\r\n"))
+            if ts is not None:
+                ts += day_offset
+                if previous_ts is not None and ts < previous_ts - 12 * 3600:
+                    # Time-of-day stamps wrapped past midnight
+                    day_offset += 86400
+                    ts += 86400
+                previous_ts = ts
+                if first_ts is None:
+                    first_ts = last_ts = ts
+
+            task = TASK_LINE.match(line)
+            if task:
+                phase = PHASE_ALIASES.get(task.group("phase"), task.group("phase"))
+                detail = _script_name(task.group("args")) if phase == "PhaseScriptExecution" else ""
+                key = (phase, task.group("target"), task.group("project"), detail)
+                elapsed = max(0.0, ts - last_ts) if ts is not None and last_ts is not None else 0.0
+                timing = timed.get(key)
+                if timing is None:
+                    timed[key] = PhaseTiming(phase, elapsed, 1, key[1], key[2], detail, SOURCE_TIMESTAMPS)
+                else:
+                    timing.duration += elapsed
+                    timing.task_count += 1
+                if ts is not None:
+                    last_ts = ts
+                continue
+
+            summary = SUMMARY_LINE.match(line)
+            if summary:
+                profile.timings.append(PhaseTiming(
+                    phase=PHASE_ALIASES.get(summary.group("phase"), summary.group("phase")),
+                    duration=float(summary.group("seconds")),
+                    task_count=int(summary.group("tasks")),
+                    source=SOURCE_SUMMARY
+                ))
+                continue
+
+            status = FLUTTER_LINE.match(line)
+            if status:
+                label = re.sub(r"^Running |\s+done$", "", status.group("label").rstrip(". "))
+                value = float(status.group("value").replace(",", ""))
+                seconds = value / 1000 if status.group("unit") == "ms" else value
+                profile.timings.append(PhaseTiming(phase=label, duration=seconds, source=SOURCE_FLUTTER))
+                if label.startswith("Xcode "):
+                    flutter_build_time = seconds
+                # The flutter step's time must not be charged to the next task
+                if ts is not None:
+                    last_ts = ts
+
+        if first_ts is None:
+            # No timestamps: keep task counts so targets still show up
+            for timing in timed.values():
+                timing.source = SOURCE_TASKS
+        profile.timings.extend(timed.values())
+
+        if first_ts is not None and previous_ts is not None and previous_ts > first_ts:
+            profile.total_duration = previous_ts - first_ts
+        else:
+            profile.total_duration = flutter_build_time
+
+        return profile
+
+
+def format_profile(profile: BuildProfile, limit: int = 15) -> str:
+    """Ranked table of the slowest phases per source"""
+    total = f"{profile.total_duration:.1f}s" if profile.total_duration is not None else "unknown"
+    lines = [f"⏱️  Build {profile.build_id}: {profile.lines_scanned:,} lines, total {total}"]
+    for source in profile.sources():
+        timings = profile.ranked(source)
+        source_total = sum(t.duration for t in timings) or 1.0
+        lines.append(f"\n📊 {source}")
+        for timing in timings[:limit]:
+            name = " / ".join(part for part in (timing.phase, timing.detail, timing.target) if part)
+            lines.append(f"   {timing.duration:9.1f}s  {timing.duration / source_total:6.1%}  "
+                         f"{timing.task_count:5d} task(s)  {name}")
+    return "\n".join(lines)
+
+
+def main():
+    """Profile build logs and compare them with previous builds"""
+    import argparse
+    from deployment_monitor import DeploymentMonitor
+
+    parser = argparse.ArgumentParser(description="Per-phase timing profile of xcodebuild / flutter build logs")
+    parser.add_argument("path", help="Build log (.gz supported), or - for stdin")
+    parser.add_argument("--build-id", required=True, help="Build identifier, as recorded in build_metrics")
+    parser.add_argument("--db", default="deployment_metrics.db", help="Deployment metrics database")
+    parser.add_argument("--no-record", action="store_true", help="Only print the profile")
+    args = parser.parse_args()
+
+    profile = BuildPhaseProfiler().parse_file(args.path, args.build_id)
+    print(format_profile(profile))
+    if args.no_record:
+        return
+
+    monitor = DeploymentMonitor(args.db)
+    monitor.record_build_profile(profile)
+    print(f"\n💾 Recorded {len(profile.timings)} phase timings for {args.build_id}")
+
+    regressions = [r for r in monitor.detect_phase_regressions(args.build_id) if r["regressed"]]
+    if regressions:
+        print("\n🐢 Regressed phases vs previous builds:")
+        for regression in regressions:
+            print(f"   {regression['key']} ({regression['source']}): {regression['baseline']:.1f}s -> "
+                  f"{regression['current']:.1f}s (+{regression['delta']:.1f}s, {regression['change']:+.0%})")
+    else:
+        print("\n✅ No phase regressions vs previous builds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Columnar Metric Store
+Append-only memory-mapped column files for vectorized analysis of performance metrics
+"""
+
+import os
+import json
+import fcntl
+import sqlite3
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Iterable, Tuple
+import numpy as np
+
+METRIC_COLUMNS = (
+    "startup_time",
+    "memory_usage",
+    "battery_drain",
+    "ui_fps",
+    "network_latency",
+    "image_load_time",
+    "database_query_time",
+    "crash_rate",
+    "user_satisfaction"
+)
+
+TIMESTAMP_COLUMN = "timestamp"
+COLUMN_DTYPE = np.float64
+DEFAULT_BLOCK_ROWS = 4096
+INITIAL_CAPACITY = 65536
+
+
+class ColumnarMetricStore:
+    """Append-only columnar backend for performance_metrics.
+
+    Each column lives in its own ``<name>.f8`` file that is memory-mapped and
+    grown by doubling. Rows must be appended in non-decreasing timestamp
+    order, which lets a sparse block index (the first timestamp of every
+    ``block_rows`` rows) narrow any time range to a contiguous slice. Range
+    queries therefore return zero-copy views into the mapped files.
+
+    Several processes may open the same store. Writers serialize on an
+    exclusive lock on ``write.lock``, and every read or write first re-reads
+    meta.json, so rows appended elsewhere become visible without reopening.
+    """
+
+    def __init__(self, root_dir: str = "performance_columns", columns: Iterable[str] = METRIC_COLUMNS,
+                 block_rows: int = DEFAULT_BLOCK_ROWS):
+        self.root_dir = root_dir
+        self.meta_path = os.path.join(root_dir, "meta.json")
+        self.lock_path = os.path.join(root_dir, "write.lock")
+        os.makedirs(root_dir, exist_ok=True)
+
+        meta = self._load_meta()
+        if meta:
+            self.columns = tuple(meta["columns"])
+            self.block_rows = meta["block_rows"]
+            self.count = meta["count"]
+            self.capacity = meta["capacity"]
+            self.source_rowid = meta.get("source_rowid", 0)
+        else:
+            self.columns = tuple(columns)
+            self.block_rows = block_rows
+            self.count = 0
+            self.capacity = INITIAL_CAPACITY
+            self.source_rowid = 0
+
+        self._maps: Dict[str, np.memmap] = {}
+        self._open_maps()
+        self.block_index = self._build_block_index()
+
+        if not meta:
+            self._save_meta()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.root_dir, f"{name}.f8")
+
+    def _load_meta(self) -> Optional[Dict[str, Any]]:
+        """Load store metadata, if the store already exists"""
+        try:
+            with open(self.meta_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_meta(self):
+        """Atomically persist row count and layout"""
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                "columns": list(self.columns),
+                "block_rows": self.block_rows,
+                "count": self.count,
+                "capacity": self.capacity,
+                "source_rowid": self.source_rowid
+            }, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def refresh(self):
+        """Pick up rows another process appended (or rewrote) since the last look"""
+        meta = self._load_meta()
+        if not meta:
+            return
+        if meta["capacity"] != self.capacity:
+            self.capacity = meta["capacity"]
+            self._maps = {}
+            self._open_maps()
+        if meta["count"] != self.count or meta.get("source_rowid", 0) != self.source_rowid:
+            self.count = meta["count"]
+            self.source_rowid = meta.get("source_rowid", 0)
+            self.block_index = self._build_block_index()
+
+    @contextmanager
+    def _writing(self):
+        """Hold the store's writer lock, with metadata current"""
+        with open(self.lock_path, 'a') as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            self.refresh()
+            yield
+
+    def _open_maps(self):
+        """Map every column file at the current capacity"""
+        nbytes = self.capacity * np.dtype(COLUMN_DTYPE).itemsize
+        for name in (TIMESTAMP_COLUMN,) + self.columns:
+            path = self._column_path(name)
+            with open(path, 'ab') as f:
+                if f.tell() < nbytes:
+                    f.truncate(nbytes)
+            self._maps[name] = np.memmap(path, dtype=COLUMN_DTYPE, mode='r+', shape=(self.capacity,))
+
+    def _grow(self, required: int):
+        """Double capacity until ``required`` rows fit, then remap"""
+        for column_map in self._maps.values():
+            column_map.flush()
+
+        while self.capacity < required:
+            self.capacity *= 2
+        self._maps = {}
+        self._open_maps()
+
+    def _build_block_index(self) -> np.ndarray:
+        """First timestamp of each block of rows"""
+        timestamps = self._maps[TIMESTAMP_COLUMN]
+        return np.array(timestamps[0:self.count:self.block_rows], dtype=COLUMN_DTYPE)
+
+    def append(self, timestamps: np.ndarray, columns: Dict[str, np.ndarray]):
+        """Append a batch of rows.
+
+        ``timestamps`` must be sorted and not earlier than the last stored
+        row. Columns missing from ``columns`` are stored as NaN.
+        """
+        with self._writing():
+            self._append(timestamps, columns)
+
+    def _append(self, timestamps: np.ndarray, columns: Dict[str, np.ndarray]):
+        timestamps = np.asarray(timestamps, dtype=COLUMN_DTYPE)
+        rows = len(timestamps)
+        if rows == 0:
+            return
+
+        if np.any(np.diff(timestamps) < 0):
+            raise ValueError("Timestamps within a batch must be non-decreasing")
+        if self.count and timestamps[0] < self._maps[TIMESTAMP_COLUMN][self.count - 1]:
+            raise ValueError("Appended rows must not be older than the last stored row")
+
+        start, end = self.count, self.count + rows
+        if end > self.capacity:
+            self._grow(end)
+
+        self._maps[TIMESTAMP_COLUMN][start:end] = timestamps
+        for name in self.columns:
+            values = columns.get(name)
+            self._maps[name][start:end] = np.nan if values is None else np.asarray(values, dtype=COLUMN_DTYPE)
+
+        for column_map in self._maps.values():
+            column_map.flush()
+
+        self.count = end
+        first_new_block = -(-start // self.block_rows)
+        new_block_starts = self._maps[TIMESTAMP_COLUMN][first_new_block * self.block_rows:end:self.block_rows]
+        if len(new_block_starts):
+            self.block_index = np.concatenate([self.block_index, new_block_starts])
+        self._save_meta()
+
+    def append_sample(self, timestamp: float, metrics: Dict[str, float]):
+        """Append a single row"""
+        self.append(
+            np.array([timestamp], dtype=COLUMN_DTYPE),
+            {name: np.array([metrics[name]], dtype=COLUMN_DTYPE) for name in self.columns if name in metrics}
+        )
+
+    def _row_range(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        """Resolve a [start, end) time range to row offsets via the block index"""
+        self.refresh()
+        timestamps = self._maps[TIMESTAMP_COLUMN]
+        lo, hi = 0, self.count
+
+        if start is not None:
+            block = max(int(np.searchsorted(self.block_index, start, side='left')) - 1, 0)
+            block_lo = block * self.block_rows
+            block_hi = min(block_lo + 2 * self.block_rows, self.count)
+            lo = block_lo + int(np.searchsorted(timestamps[block_lo:block_hi], start, side='left'))
+
+        if end is not None:
+            block = max(int(np.searchsorted(self.block_index, end, side='left')) - 1, 0)
+            block_lo = block * self.block_rows
+            block_hi = min(block_lo + 2 * self.block_rows, self.count)
+            hi = block_lo + int(np.searchsorted(timestamps[block_lo:block_hi], end, side='left'))
+
+        return lo, max(lo, hi)
+
+    def range(self, start: Optional[float] = None, end: Optional[float] = None,
+              columns: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """Zero-copy views of the rows with start <= timestamp < end"""
+        lo, hi = self._row_range(start, end)
+        names = (TIMESTAMP_COLUMN,) + tuple(columns if columns is not None else self.columns)
+        return {name: self._maps[name][lo:hi] for name in names}
+
+    def aggregate(self, metric_name: str, start: Optional[float] = None,
+                  end: Optional[float] = None) -> Dict[str, float]:
+        """Vectorized summary statistics for one metric over a time range"""
+        values = self.range(start, end, columns=[metric_name])[metric_name]
+        values = values[~np.isnan(values)]
+
+        if len(values) == 0:
+            return {"count": 0}
+
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {
+            "count": int(len(values)),
+            "mean": float(values.mean()),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "std": float(values.std()),
+            "p50": float(p50),
+            "p95": float(p95),
+            "p99": float(p99)
+        }
+
+    def correlation(self, metric_a: str, metric_b: str, start: Optional[float] = None,
+                    end: Optional[float] = None) -> Optional[float]:
+        """Pearson correlation between two metrics over a time range"""
+        data = self.range(start, end, columns=[metric_a, metric_b])
+        a, b = data[metric_a], data[metric_b]
+        mask = ~(np.isnan(a) | np.isnan(b))
+
+        if mask.sum() < 2:
+            return None
+
+        return float(np.corrcoef(a[mask], b[mask])[0, 1])
+
+    def import_from_sqlite(self, db_path: str, batch_size: int = 100000) -> int:
+        """Mirror performance_metrics rows the store has not seen yet.
+
+        New rows are found by rowid, so rows that arrive with an older
+        timestamp than the stored tail are not lost: the tail from the
+        earliest new timestamp onwards is dropped and re-read from SQLite
+        in timestamp order. Returns the number of rows written.
+        """
+        with self._writing():
+            return self._import(db_path, batch_size)
+
+    def append_mirrored(self, db_path: str, last_rowid: int, timestamps: np.ndarray,
+                        columns: Dict[str, np.ndarray]) -> int:
+        """Mirror rows just committed to performance_metrics as the ids ending at ``last_rowid``.
+
+        Rows that directly follow the mirrored ones and are not older than
+        the stored tail, the usual case, are appended as given without
+        querying SQLite; anything else catches up through import_from_sqlite.
+        """
+        timestamps = np.asarray(timestamps, dtype=COLUMN_DTYPE)
+        if len(timestamps) == 0:
+            return 0
+        with self._writing():
+            follows = self.source_rowid == last_rowid - len(timestamps)
+            in_order = not np.any(np.diff(timestamps) < 0) and (
+                not self.count or timestamps[0] >= self._maps[TIMESTAMP_COLUMN][self.count - 1]
+            )
+            if not (follows and in_order):
+                return self._import(db_path)
+            self.source_rowid = last_rowid
+            self._append(timestamps, columns)
+            return len(timestamps)
+
+    def _import(self, db_path: str, batch_size: int = 100000) -> int:
+        conn = sqlite3.connect(db_path)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT MIN(timestamp), MAX(id) FROM performance_metrics WHERE id > ?", (self.source_rowid,)
+            )
+            cutoff, last_id = cursor.fetchone()
+            if last_id is None:
+                return 0
+
+            stored = self._maps[TIMESTAMP_COLUMN][:self.count]
+            self.count = int(np.searchsorted(stored, cutoff, side='left'))
+            self.block_index = self._build_block_index()
+
+            cursor.execute(f'''
+                SELECT timestamp, {", ".join(self.columns)}
+                FROM performance_metrics
+                WHERE timestamp >= ? AND id <= ?
+                ORDER BY timestamp, id
+            ''', (cutoff, last_id))
+
+            imported = 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                data = np.array(rows, dtype=COLUMN_DTYPE)
+                self._append(data[:, 0], {name: data[:, i + 1] for i, name in enumerate(self.columns)})
+                imported += len(rows)
+
+            self.source_rowid = last_id
+            self._save_meta()
+            return imported
+        finally:
+            conn.close()
+
+
+def main():
+    """Test the columnar metric store"""
+    import time
+    import tempfile
+
+    store = ColumnarMetricStore(tempfile.mkdtemp(prefix="performance_columns_"))
+    rows = 2_000_000
+    now = time.time()
+    timestamps = np.linspace(now - 30 * 86400, now, rows)
+    memory = np.random.normal(140, 20, rows)
+    fps = 75 - memory * 0.1 + np.random.normal(0, 2, rows)
+    store.append(timestamps, {"memory_usage": memory, "ui_fps": fps})
+
+    start = time.perf_counter()
+    summary = store.aggregate("memory_usage", now - 7 * 86400, now)
+    correlation = store.correlation("memory_usage", "ui_fps", now - 7 * 86400, now)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"📊 Rows stored: {len(store):,}")
+    print(f"📈 Memory usage (7d): {summary}")
+    print(f"🔗 Memory/FPS correlation (7d): {correlation:.3f}")
+    print(f"⚡ Query time: {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Command Runner
+Streaming, time-limited, resource-accounted subprocess execution shared by the fixers
+"""
+
+import os
+import sys
+import time
+import signal
+import asyncio
+import threading
+import subprocess
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+READ_SIZE = 64 * 1024
+DEFAULT_TAIL_BYTES = 64 * 1024
+DEFAULT_MAX_CONCURRENCY = 4
+KILL_TIMEOUT = 10.0
+
+
+@dataclass
+class CommandResult:
+    """Outcome of one command; args/returncode/stdout/stderr mirror CompletedProcess.
+
+    ``stdout`` and ``stderr`` hold only the last ``tail_bytes`` of each
+    stream; the ``*_bytes`` fields count everything the command wrote.
+    """
+    args: List[str]
+    label: str
+    returncode: Optional[int]
+    stdout: str
+    stderr: str
+    started_at: float
+    wall_time: float
+    user_time: Optional[float] = None
+    system_time: Optional[float] = None
+    max_rss_kb: Optional[int] = None
+    stdout_bytes: int = 0
+    stderr_bytes: int = 0
+    timeout: Optional[float] = None
+    timed_out: bool = False
+    killed: bool = False
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+
+    @property
+    def cpu_time(self) -> Optional[float]:
+        if self.user_time is None:
+            return None
+        return self.user_time + (self.system_time or 0.0)
+
+    def timing(self) -> Dict:
+        """Structured entry for fix_history"""
+        return {
+            "label": self.label,
+            "command": " ".join(self.args),
+            "returncode": self.returncode,
+            "started_at": self.started_at,
+            "wall_time": round(self.wall_time, 3),
+            "cpu_time": round(self.cpu_time, 3) if self.cpu_time is not None else None,
+            "max_rss_kb": self.max_rss_kb,
+            "output_bytes": self.stdout_bytes + self.stderr_bytes,
+            "timed_out": self.timed_out,
+            "killed": self.killed,
+            "error": self.error
+        }
+
+
+class _Tail:
+    """Keeps the last ``limit`` bytes of a stream and counts the rest"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.buffer = bytearray()
+        self.total = 0
+
+    def feed(self, data: bytes):
+        self.total += len(data)
+        self.buffer += data
+        if len(self.buffer) > self.limit:
+            del self.buffer[:len(self.buffer) - self.limit]
+
+    def text(self) -> str:
+        text = self.buffer.decode("utf-8", errors="replace")
+        if self.total > len(self.buffer):
+            # Drop the partial first line left by trimming
+            newline = text.find("\n")
+            text = f"[... {self.total - len(self.buffer) + newline + 1:,} bytes truncated ...]\n" + text[newline + 1:]
+        return text
+
+
+def _exit_code(status: int) -> int:
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+class CommandRunner:
+    """Runs commands with streamed output, timeouts and resource accounting.
+
+    Output is read as it is produced into bounded tail buffers (optionally
+    echoed or handed to ``on_output``), so a chatty `pod install` costs at
+    most ``tail_bytes`` per stream. A command that outlives its timeout has
+    its whole process group sent SIGTERM, then SIGKILL after
+    ``kill_timeout``. At most ``max_concurrency`` commands run at once
+    across all threads sharing the runner. On POSIX the child is reaped
+    with wait4, which yields its user/system CPU time and peak RSS.
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, default_timeout: Optional[float] = None,
+                 tail_bytes: int = DEFAULT_TAIL_BYTES, kill_timeout: float = KILL_TIMEOUT, echo: bool = False):
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        self.tail_bytes = tail_bytes
+        self.kill_timeout = kill_timeout
+        self.echo = echo
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._log_lock = threading.Lock()
+        self.log: List[CommandResult] = []
+
+    def run(self, command: Sequence[str], cwd: Optional[str] = None, timeout: Optional[float] = None,
+            label: Optional[str] = None, env: Optional[Dict[str, str]] = None,
+            on_output: Optional[Callable[[str, bytes], None]] = None) -> CommandResult:
+        """Run ``command`` to completion (or timeout) and return its result.
+
+        Never raises for a failing command: a missing executable or a
+        timeout is reported through ``error`` / ``timed_out``.
+        """
+        command = [str(part) for part in command]
+        timeout = timeout if timeout is not None else self.default_timeout
+        with self._slots:
+            result = self._run(command, cwd, timeout, label or os.path.basename(command[0]), env, on_output)
+        with self._log_lock:
+            self.log.append(result)
+        return result
+
+    def run_many(self, commands: Sequence[Tuple[str, Sequence[str]]], cwd: Optional[str] = None,
+                 timeout: Optional[float] = None) -> Dict[str, CommandResult]:
+        """Run independent ``(label, command)`` pairs concurrently, within the runner's limit"""
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(commands)))) as pool:
+            futures = {label: pool.submit(self.run, command, cwd, timeout, label) for label, command in commands}
+            return {label: future.result() for label, future in futures.items()}
+
+    async def run_async(self, command: Sequence[str], **kwargs) -> CommandResult:
+        """``run`` for asyncio callers; the wait happens on a worker thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: self.run(command, **kwargs))
+
+    def timings(self, since: int = 0) -> List[Dict]:
+        with self._log_lock:
+            return [result.timing() for result in self.log[since:]]
+
+    def _run(self, command: List[str], cwd: Optional[str], timeout: Optional[float], label: str,
+             env: Optional[Dict[str, str]], on_output: Optional[Callable[[str, bytes], None]]) -> CommandResult:
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            # Own process group, so a kill also reaches xcodebuild/ruby children
+            process = subprocess.Popen(
+                command, cwd=cwd, env={**os.environ, **env} if env else None,
+                stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                start_new_session=(os.name == "posix")
+            )
+        except OSError as e:
+            return CommandResult(args=command, label=label, returncode=None, stdout="", stderr=str(e),
+                                 started_at=started_at, wall_time=time.perf_counter() - started,
+                                 timeout=timeout, error=f"{type(e).__name__}: {e}")
+
+        tails = {"stdout": _Tail(self.tail_bytes), "stderr": _Tail(self.tail_bytes)}
+        readers = [
+            threading.Thread(target=self._pump, args=(stream, name, tails[name], on_output), daemon=True)
+            for name, stream in (("stdout", process.stdout), ("stderr", process.stderr))
+        ]
+        for reader in readers:
+            reader.start()
+
+        usage = {}
+        waiter = threading.Thread(target=self._reap, args=(process, usage), daemon=True)
+        waiter.start()
+        waiter.join(timeout)
+
+        timed_out = killed = False
+        if waiter.is_alive():
+            timed_out = True
+            killed = self._terminate(process, waiter)
+        for reader in readers:
+            reader.join(self.kill_timeout)
+
+        rusage = usage.get("rusage")
+        if rusage is not None:
+            # ru_maxrss is KiB on Linux, bytes on macOS
+            max_rss = rusage.ru_maxrss // 1024 if sys.platform == "darwin" else rusage.ru_maxrss
+        return CommandResult(
+            args=command, label=label, returncode=process.returncode,
+            stdout=tails["stdout"].text(), stderr=tails["stderr"].text(),
+            started_at=started_at, wall_time=time.perf_counter() - started,
+            user_time=rusage.ru_utime if rusage is not None else None,
+            system_time=rusage.ru_stime if rusage is not None else None,
+            max_rss_kb=max_rss if rusage is not None else None,
+            stdout_bytes=tails["stdout"].total, stderr_bytes=tails["stderr"].total,
+            timeout=timeout, timed_out=timed_out, killed=killed,
+            error=f"Timed out after {timeout:g}s" if timed_out else None
+        )
+
+    def _pump(self, stream, name: str, tail: _Tail, on_output: Optional[Callable[[str, bytes], None]]):
+        with stream:
+            for data in iter(lambda: stream.read1(READ_SIZE), b""):
+                tail.feed(data)
+                if self.echo:
+                    target = sys.stdout if name == "stdout" else sys.stderr
+                    target.write(data.decode("utf-8", errors="replace"))
+                    target.flush()
+                if on_output:
+                    on_output(name, data)
+
+    @staticmethod
+    def _reap(process: subprocess.Popen, usage: Dict):
+        if hasattr(os, "wait4"):
+            try:
+                _, status, usage["rusage"] = os.wait4(process.pid, 0)
+                process.returncode = _exit_code(status)
+                return
+            except ChildProcessError:
+                pass
+        process.wait()
+
+    def _terminate(self, process: subprocess.Popen, waiter: threading.Thread) -> bool:
+        """SIGTERM the process group, then SIGKILL it if it lingers; True if SIGKILL was needed"""
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                if os.name == "posix":
+                    os.killpg(process.pid, sig)
+                elif sig == signal.SIGTERM:
+                    process.terminate()
+                else:
+                    process.kill()
+            except (ProcessLookupError, PermissionError):
+                break
+            waiter.join(self.kill_timeout)
+            if not waiter.is_alive():
+                return sig == signal.SIGKILL
+        waiter.join()
+        return True
+
+
+_shared_runner: Optional[CommandRunner] = None
+_shared_lock = threading.Lock()
+
+
+def shared_runner() -> CommandRunner:
+    """Process-wide runner, so concurrent fixers share one concurrency limit"""
+    global _shared_runner
+    with _shared_lock:
+        if _shared_runner is None:
+            _shared_runner = CommandRunner()
+        return _shared_runner
+
+
+def format_timings(timings: List[Dict], limit: int = 10) -> str:
+    """Slowest commands first"""
+    lines = []
+    for entry in sorted(timings, key=lambda t: t["wall_time"], reverse=True)[:limit]:
+        cpu = f"{entry['cpu_time']:.1f}s cpu" if entry["cpu_time"] is not None else "cpu n/a"
+        if entry["timed_out"]:
+            status = "⏰ timeout"
+        elif entry["returncode"] is None:
+            status = "❌ no run"
+        else:
+            status = "✅" if entry["returncode"] == 0 else f"❌ {entry['returncode']}"
+        lines.append(f"{entry['wall_time']:8.1f}s  {cpu:>12s}  {status:10s} {entry['label']}: {entry['command']}")
+    return "\n".join(lines)
+
+
+def main():
+    """Run a command through the runner and print its timing"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a command with streaming output, timeout and CPU accounting")
+    parser.add_argument("--timeout", type=float, help="Seconds before the command is terminated")
+    parser.add_argument("--quiet", action="store_true", help="Do not echo the command's output")
+    parser.add_argument("command", nargs=argparse.REMAINDER, help="Command to run (after --)")
+    args = parser.parse_args()
+
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+    if not command:
+        parser.error("no command given")
+    result = CommandRunner(echo=not args.quiet).run(command, timeout=args.timeout)
+    print(f"\n⏱️  {format_timings([result.timing()])}")
+    raise SystemExit(result.returncode if result.returncode is not None and not result.timed_out else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Dart Size Analyzer
+Ingests `flutter build --analyze-size` reports and tracks Dart AOT code size per package
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from metrics_storage import initialize_database, PERFORMANCE_SCHEMA
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Node of the Dart snapshot inside the report: "libapp.so (Dart AOT)", "App (Dart AOT)"
+DART_AOT_SUFFIX = "(Dart AOT)"
+NAME_KEYS = ("n", "name")
+SIZE_KEYS = ("value", "size")
+
+@dataclass
+class DartSizeReport:
+    """Dart AOT code size of one build, by package and library"""
+    source: str
+    report_type: str = ""                 # "apk", "aab", "ios", ... as written by flutter
+    total_size: int = 0                   # every leaf in the report, native and assets included
+    aot_size: int = 0                     # leaves below the Dart AOT node
+    packages: Dict[str, int] = field(default_factory=dict)
+    libraries: Dict[str, int] = field(default_factory=dict)
+
+    def ranked(self, by: str = "package") -> List[Tuple[str, int]]:
+        sizes = self.packages if by == "package" else self.libraries
+        return sorted(sizes.items(), key=lambda item: item[1], reverse=True)
+
+
+def _package_name(segment: str) -> str:
+    """'package:openai_dart' -> 'openai_dart'; 'dart:core' and '@stubs' stay as they are"""
+    return segment[len("package:"):] if segment.startswith("package:") else segment
+
+
+def _library_name(path: List[str]) -> str:
+    """Library URI from the path below the AOT node, e.g. package:openai_dart/src/client.dart"""
+    for index, segment in enumerate(path):
+        if segment.endswith(".dart"):
+            return "/".join(path[:index + 1])
+    return path[0]
+
+
+def _walk(node: Dict[str, Any], path: List[str]) -> Iterator[Tuple[List[str], int]]:
+    name = next((node[key] for key in NAME_KEYS if key in node), "?")
+    children = node.get("children")
+    if children:
+        path.append(name)
+        for child in children:
+            yield from _walk(child, path)
+        path.pop()
+    else:
+        yield path + [name], int(next((node[key] for key in SIZE_KEYS if key in node), 0) or 0)
+
+
+def _stream_leaves(f, report: DartSizeReport) -> Iterator[Tuple[List[str], int]]:
+    """Leaf nodes of the size tree as (path, bytes), without loading the document.
+
+    Relies on flutter writing a node's name before its children, which it
+    does; a node whose name comes later shows up as '?' in its children's
+    paths.
+    """
+    # Per open JSON object: [name, size, has_children, current_key]
+    stack: List[list] = []
+    for prefix, event, value in ijson.parse(f):
+        if event == "start_map":
+            stack.append([None, 0, False, None])
+        elif event == "map_key":
+            stack[-1][3] = value
+        elif event == "end_map":
+            name, size, has_children, _ = stack.pop()
+            if stack and not has_children:
+                yield [frame[0] or "?" for frame in stack[1:]] + [name or "?"], size
+        elif event == "start_array":
+            if stack and stack[-1][3] == "children":
+                stack[-1][2] = True
+        elif stack and len(stack) == 1 and stack[0][3] == "type" and event == "string":
+            report.report_type = value
+        elif stack:
+            key = stack[-1][3]
+            if key in NAME_KEYS and event == "string":
+                stack[-1][0] = value
+            elif key in SIZE_KEYS and event == "number":
+                stack[-1][1] = int(value)
+
+
+class DartSizeAnalyzer:
+    """Aggregates an --analyze-size JSON report by package and library.
+
+    Reports for large apps run to tens of megabytes; with ijson installed
+    they are parsed as a stream and only the per-package and per-library
+    totals are kept in memory. Without it the document is loaded with json.
+    """
+
+    def analyze(self, path: str) -> DartSizeReport:
+        report = DartSizeReport(source=path)
+        with open(path, 'rb') as f:
+            if ijson is not None:
+                self._aggregate(report, _stream_leaves(f, report))
+            else:
+                document = json.load(f)
+                report.report_type = document.get("type", "")
+                self._aggregate(report, _walk(document, []))
+        return report
+
+    def _aggregate(self, report: DartSizeReport, leaves: Iterator[Tuple[List[str], int]]):
+        for path, size in leaves:
+            report.total_size += size
+            aot = next((i for i, segment in enumerate(path) if segment.endswith(DART_AOT_SUFFIX)), None)
+            if aot is None or aot == len(path) - 1:
+                continue
+            below = path[aot + 1:]
+            report.aot_size += size
+            package = _package_name(below[0])
+            report.packages[package] = report.packages.get(package, 0) + size
+            library = _library_name(below)
+            report.libraries[library] = report.libraries.get(library, 0) + size
+
+
+def diff_reports(old: DartSizeReport, new: DartSizeReport, by: str = "package") -> List[Dict[str, Any]]:
+    """Per-package (or per-library) size changes, biggest growth first"""
+    if by not in ("package", "library"):
+        raise ValueError(f"Unsupported diff grouping: {by}")
+    old_sizes = old.packages if by == "package" else old.libraries
+    new_sizes = new.packages if by == "package" else new.libraries
+    changes = []
+    for name in set(old_sizes) | set(new_sizes):
+        before, after = old_sizes.get(name, 0), new_sizes.get(name, 0)
+        if before == after:
+            continue
+        changes.append({
+            "name": name,
+            "old": before,
+            "new": after,
+            "delta": after - before,
+            "change": (after - before) / before if before else None,
+            "status": "added" if not before else "removed" if not after else "changed"
+        })
+    changes.sort(key=lambda change: change["delta"], reverse=True)
+    return changes
+
+
+def pubspec_version(project_path: str = ".") -> Optional[str]:
+    """App version (with build number) from pubspec.yaml"""
+    try:
+        with open(os.path.join(project_path, "pubspec.yaml"), 'r') as f:
+            match = re.search(r'^version:\s*(\S+)', f.read(), re.M)
+        return match.group(1) if match else None
+    except OSError:
+        return None
+
+
+class DartSizeStore:
+    """Per-version Dart code size history in the performance database"""
+
+    def __init__(self, db_path: str = "performance_metrics.db"):
+        self.db_path = db_path
+        initialize_database(self.db_path, PERFORMANCE_SCHEMA)
+
+    def record(self, report: DartSizeReport, app_version: str, timestamp: Optional[float] = None) -> int:
+        """Store a report's package totals; replaces an earlier report for the same version and type"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.execute('''
+                    DELETE FROM dart_size_packages WHERE report_id IN
+                        (SELECT id FROM dart_size_reports WHERE app_version = ? AND report_type = ?)
+                ''', (app_version, report.report_type))
+                conn.execute("DELETE FROM dart_size_reports WHERE app_version = ? AND report_type = ?",
+                             (app_version, report.report_type))
+                report_id = conn.execute('''
+                    INSERT INTO dart_size_reports (timestamp, app_version, report_type, total_size, aot_size, source)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (timestamp or time.time(), app_version, report.report_type, report.total_size,
+                      report.aot_size, report.source)).lastrowid
+                conn.executemany("INSERT INTO dart_size_packages (report_id, package, size) VALUES (?, ?, ?)",
+                                 [(report_id, package, size) for package, size in report.packages.items()])
+            return report_id
+        finally:
+            conn.close()
+
+    def get(self, app_version: str, report_type: Optional[str] = None) -> Optional[DartSizeReport]:
+        """Stored report for a version (package totals only; libraries are not persisted)"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute('''
+                SELECT id, report_type, total_size, aot_size, source FROM dart_size_reports
+                WHERE app_version = ? AND (? IS NULL OR report_type = ?)
+                ORDER BY timestamp DESC LIMIT 1
+            ''', (app_version, report_type, report_type)).fetchone()
+            if row is None:
+                return None
+            packages = dict(conn.execute("SELECT package, size FROM dart_size_packages WHERE report_id = ?",
+                                         (row[0],)).fetchall())
+        finally:
+            conn.close()
+        return DartSizeReport(source=row[4], report_type=row[1], total_size=row[2], aot_size=row[3],
+                              packages=packages)
+
+    def previous_version(self, app_version: str, report_type: Optional[str] = None) -> Optional[str]:
+        """Most recent version recorded before ``app_version``"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute('''
+                SELECT app_version FROM dart_size_reports
+                WHERE (? IS NULL OR report_type = ?) AND app_version != ?
+                  AND timestamp < (SELECT MAX(timestamp) FROM dart_size_reports WHERE app_version = ?)
+                ORDER BY timestamp DESC LIMIT 1
+            ''', (report_type, report_type, app_version, app_version)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def trend(self, package: Optional[str] = None, report_type: Optional[str] = None,
+              limit: int = 20) -> List[Dict[str, Any]]:
+        """Code size per version, oldest first: the whole snapshot, or one package"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            if package is None:
+                rows = conn.execute('''
+                    SELECT app_version, report_type, timestamp, aot_size FROM dart_size_reports
+                    WHERE (? IS NULL OR report_type = ?)
+                    ORDER BY timestamp DESC LIMIT ?
+                ''', (report_type, report_type, limit)).fetchall()
+            else:
+                rows = conn.execute('''
+                    SELECT r.app_version, r.report_type, r.timestamp, COALESCE(p.size, 0)
+                    FROM dart_size_reports r
+                    LEFT JOIN dart_size_packages p ON p.report_id = r.id AND p.package = ?
+                    WHERE (? IS NULL OR r.report_type = ?)
+                    ORDER BY r.timestamp DESC LIMIT ?
+                ''', (package, report_type, report_type, limit)).fetchall()
+        finally:
+            conn.close()
+        return [
+            {"app_version": version, "report_type": kind, "timestamp": timestamp, "size": size}
+            for version, kind, timestamp, size in reversed(rows)
+        ]
+
+
+def _kb(size: int) -> str:
+    return f"{size / 1024:,.1f} KB"
+
+
+def format_report(report: DartSizeReport, by: str = "package", limit: int = 25) -> str:
+    lines = [f"🎯 {report.source} ({report.report_type or 'unknown'}): Dart AOT {_kb(report.aot_size)} "
+             f"of {_kb(report.total_size)}, {len(report.packages)} packages, {len(report.libraries)} libraries"]
+    for name, size in report.ranked(by)[:limit]:
+        share = size / report.aot_size if report.aot_size else 0.0
+        lines.append(f"   {_kb(size):>12s} {share:6.1%}  {name}")
+    return "\n".join(lines)
+
+
+def format_diff(old: DartSizeReport, new: DartSizeReport, changes: List[Dict[str, Any]], limit: int = 25) -> str:
+    lines = [f"📊 Dart AOT {_kb(old.aot_size)} -> {_kb(new.aot_size)} ({(new.aot_size - old.aot_size) / 1024:+,.1f} KB)"]
+    for change in changes[:limit]:
+        relative = f"{change['change']:+.0%}" if change["change"] is not None else "new"
+        lines.append(f"   {change['delta'] / 1024:+10.1f} KB {relative:>6s}  {change['status']:8s} {change['name']}")
+    return "\n".join(lines)
+
+
+def main():
+    """Ingest, diff and trend --analyze-size reports"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Dart AOT size analysis from flutter build --analyze-size")
+    parser.add_argument("--db", default="performance_metrics.db", help="Performance metrics database")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Summarize a report and record it for an app version")
+    ingest_parser.add_argument("path", help="*-code-size-analysis_*.json")
+    ingest_parser.add_argument("--app-version", help="App version (default: pubspec.yaml version)")
+    ingest_parser.add_argument("--by", choices=("package", "library"), default="package")
+    ingest_parser.add_argument("--no-record", action="store_true", help="Only print the summary")
+
+    diff_parser = subparsers.add_parser("diff", help="Compare two reports (files or recorded app versions)")
+    diff_parser.add_argument("old")
+    diff_parser.add_argument("new")
+    diff_parser.add_argument("--by", choices=("package", "library"), default="package",
+                             help="library only works for report files")
+
+    trend_parser = subparsers.add_parser("trend", help="Code size per recorded app version")
+    trend_parser.add_argument("package", nargs="?", help="Package to follow (default: whole snapshot)")
+    trend_parser.add_argument("--type", help="Report type, e.g. apk or ios")
+    args = parser.parse_args()
+
+    analyzer = DartSizeAnalyzer()
+    store = DartSizeStore(args.db)
+
+    if args.command == "ingest":
+        report = analyzer.analyze(args.path)
+        print(format_report(report, args.by))
+        if args.no_record:
+            return
+        version = args.app_version or pubspec_version() or "unknown"
+        store.record(report, version)
+        print(f"\n💾 Recorded {len(report.packages)} package sizes for {version}")
+        previous = store.previous_version(version, report.report_type)
+        if previous:
+            old = store.get(previous, report.report_type)
+            print(f"\nSince {previous}:")
+            print(format_diff(old, report, diff_reports(old, report), limit=10))
+
+    elif args.command == "diff":
+        reports = []
+        for ref in (args.old, args.new):
+            report = analyzer.analyze(ref) if os.path.exists(ref) else store.get(ref)
+            if report is None:
+                print(f"❌ {ref} is neither a report file nor a recorded app version")
+                raise SystemExit(1)
+            reports.append(report)
+        print(format_diff(reports[0], reports[1], diff_reports(reports[0], reports[1], args.by)))
+
+    else:
+        for point in store.trend(args.package, args.type):
+            print(f"   {point['app_version']:>14s} {point['report_type']:>5s} {_kb(point['size']):>12s}")
+
+
+if __name__ == "__main__":
+    main()
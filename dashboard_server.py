@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Live Performance Dashboard Server
+JSON endpoints and Server-Sent Events backed by a write-invalidated aggregate cache
+"""
+
+import time
+import sqlite3
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Dict, List, Any, Optional, Set, Tuple
+from urllib.parse import parse_qs
+
+from columnar_metric_store import METRIC_COLUMNS
+from performance_charts import lttb_downsample
+from performance_alerts import load_open_alerts
+from performance_dashboard import PerformanceDashboard
+from metrics_ingest_server import (
+    HTTPError, HTTPRequest, MetricsIngestServer, KEEP_ALIVE_TIMEOUT, MAX_HEADER_BYTES,
+    read_http_request, write_http_response, json_body
+)
+
+SSE_HEARTBEAT_SECONDS = 15.0
+DEFAULT_SERIES_HOURS = 24.0
+MAX_SERIES_HOURS = 90 * 24.0
+DEFAULT_SERIES_POINTS = 500
+MAX_SERIES_POINTS = 5000
+MAX_CACHED_SERIES = 64
+
+INDEX_HTML = b"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>ChatSY Performance</title>
+<style>body{font-family:sans-serif;margin:2em}pre{background:#f4f4f4;padding:1em}</style>
+</head>
+<body>
+<h1>ChatSY Performance <small id="health"></small></h1>
+<h2>Active Alerts</h2><pre id="alerts">loading...</pre>
+<h2>Latest Metrics</h2><pre id="metrics">loading...</pre>
+<h2>Trends (24h)</h2><pre id="trends">loading...</pre>
+<script>
+const events = new EventSource('/v1/events');
+events.addEventListener('snapshot', (event) => {
+  const snapshot = JSON.parse(event.data);
+  document.getElementById('health').textContent = snapshot.summary.overall_health;
+  document.getElementById('metrics').textContent = JSON.stringify(snapshot.summary.latest_metrics, null, 2);
+  document.getElementById('alerts').textContent = snapshot.alerts.length
+    ? snapshot.alerts.map((a) => `[${a.severity}] ${a.message} (${a.status})`).join('\\n')
+    : 'none';
+  document.getElementById('trends').textContent = JSON.stringify(snapshot.trends.latest, null, 2);
+});
+</script>
+</body>
+</html>
+"""
+
+
+class DashboardServer:
+    """Serves cached dashboard aggregates and pushes updates to SSE subscribers.
+
+    Aggregates are recomputed once per write (bursts are coalesced) rather
+    than once per request, and every viewer receives the same pre-encoded
+    payload. Writes made through ``dashboard`` in this process invalidate the
+    cache immediately; writes from other processes, such as a separately run
+    ingestion server, are picked up by polling SQLite's ``data_version``.
+    """
+
+    def __init__(self, dashboard: PerformanceDashboard, host: str = "0.0.0.0", port: int = 8080,
+                 poll_interval: float = 2.0, min_refresh_interval: float = 0.5,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.dashboard = dashboard
+        self.host = host
+        self.port = port
+        self.poll_interval = poll_interval
+        self.min_refresh_interval = min_refresh_interval
+        # Reads use the writer's dashboard object, so they must share the writer's thread
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="dashboard-reader")
+        self._owns_executor = executor is None
+
+        self.version = 0
+        self.refreshed_at = 0.0
+        self.refreshes = 0
+        self._bodies: Dict[str, bytes] = {}
+        self._event: bytes = b""
+        self._series_cache: Dict[Tuple[str, float, int], bytes] = {}
+        self._subscribers: Set[asyncio.Queue] = set()
+
+        self._dirty: Optional[asyncio.Event] = None
+        self._data_version: Optional[int] = None
+        self._version_conn: Optional[sqlite3.Connection] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def invalidate(self):
+        """Mark cached aggregates stale; the refresher recomputes them once"""
+        if self._dirty is not None:
+            self._dirty.set()
+
+    def _read_data_version(self) -> int:
+        """SQLite's data_version changes whenever another connection commits"""
+        if self._version_conn is None:
+            self._version_conn = sqlite3.connect(self.dashboard.db_path, check_same_thread=False)
+        return self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _compute_snapshot(self) -> Dict[str, Any]:
+        """Run every dashboard aggregate query once"""
+        data_version = self._read_data_version()
+        # A read path: leave buffered alert changes to the writer's own flushes
+        summary = self.dashboard.get_performance_summary(flush_alerts=False)
+        latest = summary["latest_metrics"]
+        summary["latest_metrics"] = dict(zip(("id", "timestamp") + METRIC_COLUMNS, latest)) if latest else None
+
+        conn = sqlite3.connect(self.dashboard.db_path)
+        cursor = conn.cursor()
+        # SQLite returns the bare columns from the row holding MAX(timestamp)
+        cursor.execute('''
+            SELECT metric_name, trend_direction, current_value, previous_value, change_percentage, MAX(timestamp)
+            FROM performance_trends
+            WHERE timestamp > ? - 86400
+            GROUP BY metric_name
+        ''', (time.time(),))
+        latest_trends = {
+            metric_name: {
+                "trend_direction": direction,
+                "current_value": current_value,
+                "previous_value": previous_value,
+                "change_percentage": change_percentage,
+                "timestamp": timestamp
+            }
+            for metric_name, direction, current_value, previous_value, change_percentage, timestamp in cursor.fetchall()
+        }
+        conn.close()
+
+        # From the table, not this process's engine, so alerts raised by a separate ingest server show up
+        alerts = sorted(load_open_alerts(self.dashboard.db_path), key=lambda alert: alert.timestamp, reverse=True)
+
+        self._data_version = data_version
+        return {
+            "summary": summary,
+            "trends": {"counts": summary["trend_summary"], "latest": latest_trends},
+            "alerts": [asdict(alert) for alert in alerts]
+        }
+
+    async def refresh(self):
+        """Recompute aggregates, re-encode them once and notify subscribers"""
+        loop = asyncio.get_running_loop()
+        snapshot = await loop.run_in_executor(self.executor, self._compute_snapshot)
+
+        self.version += 1
+        self.refreshed_at = time.time()
+        self.refreshes += 1
+        snapshot["version"] = self.version
+
+        self._bodies = {name: json_body(snapshot[name]) for name in ("summary", "trends", "alerts")}
+        self._series_cache.clear()
+        self._event = f"id: {self.version}\nevent: snapshot\ndata: ".encode("utf-8") + json_body(snapshot) + b"\n\n"
+
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()  # a newer snapshot supersedes an undelivered one
+            queue.put_nowait(self._event)
+
+    async def refresh_loop(self):
+        """Coalesce invalidations into at most one refresh per min_refresh_interval"""
+        while True:
+            await self._dirty.wait()
+            await asyncio.sleep(self.min_refresh_interval)
+            self._dirty.clear()
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"❌ Dashboard refresh failed: {e}")
+
+    async def poll_loop(self):
+        """Detect commits made by other processes"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            data_version = await loop.run_in_executor(self.executor, self._read_data_version)
+            if data_version != self._data_version:
+                self.invalidate()
+
+    def _series_body(self, metric_name: str, hours: float, points: int) -> bytes:
+        """Downsampled series for one metric, encoded as JSON"""
+        series = self.dashboard.get_metric_series([metric_name], hours)
+        timestamps, values = lttb_downsample(series["timestamp"], series[metric_name], points)
+        return json_body({
+            "metric_name": metric_name,
+            "hours": hours,
+            "total_points": int(len(series["timestamp"])),
+            "timestamps": timestamps.tolist(),
+            "values": values.tolist(),
+            "version": self.version
+        })
+
+    async def series(self, query: str) -> bytes:
+        """Serve a series from the per-version cache"""
+        params = parse_qs(query)
+        metric_name = params.get("metric", [""])[0]
+        if metric_name not in METRIC_COLUMNS:
+            raise HTTPError(400, f"Unknown metric: {metric_name or '(missing)'}")
+        try:
+            hours = min(max(float(params.get("hours", [DEFAULT_SERIES_HOURS])[0]), 0.0), MAX_SERIES_HOURS)
+            points = min(max(int(params.get("points", [DEFAULT_SERIES_POINTS])[0]), 3), MAX_SERIES_POINTS)
+        except ValueError:
+            raise HTTPError(400, "hours and points must be numeric")
+
+        key = (metric_name, hours, points)
+        body = self._series_cache.get(key)
+        if body is None:
+            version = self.version
+            loop = asyncio.get_running_loop()
+            body = await loop.run_in_executor(self.executor, self._series_body, metric_name, hours, points)
+            if version == self.version:
+                if len(self._series_cache) >= MAX_CACHED_SERIES:
+                    self._series_cache.pop(next(iter(self._series_cache)))
+                self._series_cache[key] = body
+        return body
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "version": self.version,
+            "refreshes": self.refreshes,
+            "refreshed_at": self.refreshed_at,
+            "subscribers": len(self._subscribers),
+            "cached_series": len(self._series_cache)
+        }
+
+    async def route(self, request: HTTPRequest) -> Tuple[int, bytes, str]:
+        """Dispatch a request to its endpoint"""
+        if request.method != "GET":
+            return 405, json_body({"error": "GET only"}), "application/json"
+
+        if request.path == "/":
+            return 200, INDEX_HTML, "text/html; charset=utf-8"
+        if request.path in ("/v1/summary", "/v1/trends", "/v1/alerts"):
+            return 200, self._bodies[request.path.rsplit("/", 1)[1]], "application/json"
+        if request.path == "/v1/series":
+            try:
+                return 200, await self.series(request.query), "application/json"
+            except HTTPError as e:
+                return e.status, json_body({"error": e.message}), "application/json"
+        if request.path == "/healthz":
+            return 200, json_body(self.health()), "application/json"
+
+        return 404, json_body({"error": "Not found"}), "application/json"
+
+    async def stream_events(self, request: HTTPRequest, writer: asyncio.StreamWriter):
+        """Hold an SSE connection open, sending each new snapshot as it is published"""
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: keep-alive\r\n\r\n"
+            b"retry: 5000\n\n"
+        )
+        if request.headers.get("last-event-id") != str(self.version):
+            writer.write(self._event)
+        await writer.drain()
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._subscribers.add(queue)
+        try:
+            while True:
+                try:
+                    payload = await asyncio.wait_for(queue.get(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    payload = b": keep-alive\n\n"
+                if payload is None:
+                    break
+                writer.write(payload)
+                await writer.drain()
+        finally:
+            self._subscribers.discard(queue)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one keep-alive connection"""
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_http_request(reader), KEEP_ALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                except HTTPError as e:
+                    write_http_response(writer, e.status, json_body({"error": e.message}), keep_alive=False)
+                    break
+
+                if request is None:
+                    break
+
+                if request.path == "/v1/events" and request.method == "GET":
+                    await self.stream_events(request, writer)
+                    break
+
+                status, body, content_type = await self.route(request)
+                write_http_response(writer, status, body, content_type=content_type,
+                                    keep_alive=request.keep_alive, extra_headers={"Cache-Control": "no-cache"})
+                await writer.drain()
+
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        """Compute the first snapshot, then start serving"""
+        loop = asyncio.get_running_loop()
+        self._dirty = asyncio.Event()
+        self.dashboard.add_write_listener(lambda: loop.call_soon_threadsafe(self.invalidate))
+
+        await self.refresh()
+        self._tasks = [asyncio.create_task(self.refresh_loop()), asyncio.create_task(self.poll_loop())]
+        self._server = await asyncio.start_server(
+            self.handle_connection, self.host, self.port, limit=MAX_HEADER_BYTES, backlog=4096
+        )
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+        # Release SSE connections so their handlers close cleanly
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)
+        await asyncio.sleep(0)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._version_conn is not None:
+            await asyncio.get_running_loop().run_in_executor(self.executor, self._version_conn.close)
+        if self._owns_executor:
+            self.executor.shutdown(wait=True)
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"📊 Live dashboard on http://{self.host}:{self.port}/")
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+
+async def run_servers(dashboard_server: DashboardServer, ingest_server: Optional[MetricsIngestServer]):
+    """Run the dashboard, optionally alongside an in-process ingestion server"""
+    if ingest_server is None:
+        await dashboard_server.serve_forever()
+        return
+
+    await ingest_server.start()
+    print(f"📡 Ingesting samples on http://{ingest_server.host}:{ingest_server.port}/v1/samples")
+    try:
+        await dashboard_server.serve_forever()
+    finally:
+        await ingest_server.stop()
+
+
+def main():
+    """Run the live dashboard server"""
+    parser = argparse.ArgumentParser(description="ChatSY live performance dashboard server")
+    parser.add_argument("--host", default="0.0.0.0", help="Address to bind")
+    parser.add_argument("--port", type=int, default=8080, help="Dashboard HTTP port")
+    parser.add_argument("--db-path", default="performance_metrics.db", help="Performance metrics database")
+    parser.add_argument("--config-path", default="performance_config.json", help="Performance config")
+    parser.add_argument("--columnar-dir", help="Optional columnar store directory")
+    parser.add_argument("--poll-interval", type=float, default=2.0,
+                        help="Seconds between checks for writes from other processes")
+    parser.add_argument("--ingest-port", type=int, help="Also run the ingestion server on this port")
+    parser.add_argument("--udp-port", type=int, help="statsd-style UDP port for the ingestion server")
+
+    args = parser.parse_args()
+
+    dashboard = PerformanceDashboard(args.db_path, args.config_path, columnar_dir=args.columnar_dir)
+    ingest_server = None
+    executor = None
+    if args.ingest_port is not None:
+        ingest_server = MetricsIngestServer(dashboard, host=args.host, port=args.ingest_port, udp_port=args.udp_port)
+        executor = ingest_server.writer
+
+    dashboard_server = DashboardServer(
+        dashboard,
+        host=args.host,
+        port=args.port,
+        poll_interval=args.poll_interval,
+        executor=executor
+    )
+
+    try:
+        asyncio.run(run_servers(dashboard_server, ingest_server))
+    except KeyboardInterrupt:
+        print("\n🛑 Dashboard server stopped.")
+
+
+if __name__ == "__main__":
+    main()
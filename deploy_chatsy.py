@@ -16,8 +16,19 @@ from typing import Dict, List, Any, Optional
 from xcode_deploy_bot import XCodeDeployBot, DeploymentIssue, IssueType, Severity
 from deployment_diagnostics import DeploymentDiagnostics
 from automated_fixer import AutomatedFixer
+from fix_planner import format_plan
 from deployment_monitor import DeploymentMonitor, BuildMetrics
 
+# Fix planner step that repairs each issue type
+ISSUE_FIX_STEPS = {
+    IssueType.COCOAPODS: "cocoapods",
+    IssueType.FLUTTER: "flutter",
+    IssueType.CODE_SIGNING: "code_signing",
+    IssueType.XCODE_CLOUD: "xcode_cloud",
+    IssueType.APP_STORE: "app_store",
+    IssueType.BUILD_ENVIRONMENT: "build_environment"
+}
+
 class ChatSYDeploymentManager:
     """Main deployment manager for ChatSY project"""
     
@@ -25,8 +36,8 @@ class ChatSYDeploymentManager:
         self.project_path = Path(project_path)
         self.agent = XCodeDeployBot()
         self.diagnostics = DeploymentDiagnostics(str(self.project_path))
-        self.fixer = AutomatedFixer(str(self.project_path))
         self.monitor = DeploymentMonitor()
+        self.fixer = AutomatedFixer(str(self.project_path), history_db=self.monitor.db_path)
         
         print("🚀 ChatSY Deployment Manager initialized!")
         print(f"📁 Project path: {self.project_path}")
@@ -68,16 +79,15 @@ class ChatSYDeploymentManager:
     
     def _run_diagnostics(self) -> Dict[str, Any]:
         """Run comprehensive diagnostics"""
-        diagnostics = {}
-        
-        # Project structure diagnostics
-        diagnostics["project_structure"] = self.diagnostics.diagnose_project_structure()
-        
-        # Code signing diagnostics
-        diagnostics["code_signing"] = self.diagnostics.diagnose_code_signing()
-        
-        # Generate diagnostic report
-        diagnostics["report"] = self.diagnostics.generate_diagnostic_report()
+        # One concurrent run feeds both the structured results and the report
+        result = self.diagnostics.run_diagnostics()
+        
+        diagnostics = {
+            "project_structure": result.project_structure,
+            "code_signing": result.code_signing,
+            "report": self.diagnostics.generate_diagnostic_report(result),
+            "elapsed": result.elapsed
+        }
         
         return diagnostics
     
@@ -152,34 +162,19 @@ class ChatSYDeploymentManager:
     
     def _apply_fixes(self, issues: List[DeploymentIssue]) -> Dict[str, Any]:
         """Apply fixes based on identified issues"""
-        fix_results = {}
-        
-        # Group issues by type
-        issue_groups = {}
+        # Fixer steps needed for the issue types found, in fix planner order
+        steps = []
         for issue in issues:
-            issue_type = issue.issue_type
-            if issue_type not in issue_groups:
-                issue_groups[issue_type] = []
-            issue_groups[issue_type].append(issue)
-        
-        # Apply fixes for each issue type
-        for issue_type, type_issues in issue_groups.items():
-            print(f"   🔧 Fixing {issue_type.value} issues...")
-            
-            if issue_type == IssueType.COCOAPODS:
-                fix_results["cocoapods"] = self.fixer.fix_cocoapods_issues()
-            elif issue_type == IssueType.FLUTTER:
-                fix_results["flutter"] = self.fixer.fix_flutter_issues()
-            elif issue_type == IssueType.CODE_SIGNING:
-                fix_results["code_signing"] = self.fixer.fix_code_signing_issues()
-            elif issue_type == IssueType.XCODE_CLOUD:
-                fix_results["xcode_cloud"] = self.fixer.fix_xcode_cloud_issues()
-            elif issue_type == IssueType.APP_STORE:
-                fix_results["app_store"] = self.fixer.fix_app_store_connect_issues()
-            elif issue_type == IssueType.BUILD_ENVIRONMENT:
-                fix_results["build_environment"] = self.fixer.fix_build_environment_issues()
-        
-        return fix_results
+            step = ISSUE_FIX_STEPS.get(issue.issue_type)
+            if step and step not in steps:
+                print(f"   🔧 Fixing {issue.issue_type.value} issues...")
+                steps.append(step)
+        
+        if not steps:
+            return {}
+        # These issues were just detected, so an unchanged-inputs skip would
+        # only replay a stale success; the planner still orders and overlaps them
+        return self.fixer.run_fixes(steps, force=True)
     
     def _generate_health_report(self) -> Dict[str, Any]:
         """Generate deployment health report"""
@@ -281,9 +276,10 @@ Project: {results['project_path']}
         """Run quick deployment check"""
         print("⚡ Running quick deployment check...")
         
-        # Run basic diagnostics
-        project_structure = self.diagnostics.diagnose_project_structure()
-        code_signing = self.diagnostics.diagnose_code_signing()
+        # Run basic diagnostics in one concurrent pass with a shared file cache
+        result = self.diagnostics.run_diagnostics()
+        project_structure = result.project_structure
+        code_signing = result.code_signing
         
         # Quick analysis
         issues = []
@@ -323,6 +319,10 @@ def main():
     parser.add_argument("--project-path", default="/Users/alexjego/Desktop/CHATSY",
                        help="Path to ChatSY project")
     parser.add_argument("--output", help="Output file for report")
+    parser.add_argument("--dry-run", action="store_true",
+                       help="With --mode fix: print the fix plan and estimated durations without running it")
+    parser.add_argument("--force", action="store_true",
+                       help="With --mode fix: run fixers even if their inputs are unchanged")
     
     args = parser.parse_args()
     
@@ -358,8 +358,11 @@ def main():
     
     elif args.mode == "fix":
         # Run fixes only
-        print("🔧 Running comprehensive fixes...")
-        fix_results = manager.fixer.run_comprehensive_fix()
+        print(format_plan(manager.fixer.plan_fixes(force=args.force)))
+        if args.dry_run:
+            return
+        print("\n🔧 Running comprehensive fixes...")
+        fix_results = manager.fixer.run_comprehensive_fix(force=args.force)
         report = manager.fixer.generate_fix_report(fix_results)
         print(report)
     
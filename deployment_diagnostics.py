@@ -4,35 +4,148 @@ Deployment Diagnostics Module
 Advanced diagnostic tools for iOS deployment issues
 """
 
-import os
 import re
+import time
 import subprocess
 import json
 import plistlib
-from typing import Dict, List, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Any, Optional
 from pathlib import Path
 
+from lockfile_analyzer import LockfileAnalyzer
+from pbxproj_parser import PBXProject, load_project
+from toolchain_probe import ToolchainProbe, shared_probe
+
+# Build settings reported per configuration by _check_build_settings
+BUILD_SETTING_NAMES = {
+    "deployment_target": "IPHONEOS_DEPLOYMENT_TARGET",
+    "code_sign_identity": "CODE_SIGN_IDENTITY",
+    "code_sign_style": "CODE_SIGN_STYLE",
+    "development_team": "DEVELOPMENT_TEAM",
+    "provisioning_profile": "PROVISIONING_PROFILE_SPECIFIER"
+}
+
+# Independent checks run by run_diagnostics: result key -> method name
+PROJECT_STRUCTURE_CHECKS = {
+    "flutter_config": "_check_flutter_config",
+    "ios_config": "_check_ios_config",
+    "dependencies": "_check_dependencies",
+    "permissions": "_check_permissions",
+    "build_settings": "_check_build_settings"
+}
+CODE_SIGNING_CHECKS = {
+    "certificates": "_check_certificates",
+    "provisioning_profiles": "_check_provisioning_profiles",
+    "team_id": "_check_team_id",
+    "bundle_id": "_check_bundle_id",
+    "xcode_cloud_config": "_check_xcode_cloud_config"
+}
+
+@dataclass
+class DiagnosticsResult:
+    """Everything one diagnostics run found, shared by callers and the report"""
+    project_structure: Dict[str, Any] = field(default_factory=dict)
+    code_signing: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    elapsed: float = 0.0
+    generated_at: str = ""
+
+
+class _RunCache:
+    """File reads and parses memoized for the duration of one run"""
+    
+    def __init__(self):
+        self._values: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+    
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # Checks asking for the same file at once wait for a single read
+        with key_lock:
+            with self._lock:
+                if key in self._values:
+                    return self._values[key]
+            value = loader()
+            with self._lock:
+                self._values[key] = value
+            return value
+
+
 class DeploymentDiagnostics:
     """Advanced diagnostic system for iOS deployment issues"""
     
-    def __init__(self, project_path: str):
+    def __init__(self, project_path: str, toolchain: Optional[ToolchainProbe] = None):
         self.project_path = Path(project_path)
+        self.toolchain = toolchain or shared_probe()
         self.ios_path = self.project_path / "ios"
         self.flutter_path = self.project_path
+        self._run_cache: Optional[_RunCache] = None
+    
+    def run_diagnostics(self, max_workers: Optional[int] = None) -> DiagnosticsResult:
+        """Run project structure and code signing checks concurrently.
+        
+        Every file is read and parsed at most once per run; the returned
+        result feeds both callers and generate_diagnostic_report.
+        """
+        print("🔍 Diagnosing project structure and code signing...")
+        return self._run_checks({"project_structure": PROJECT_STRUCTURE_CHECKS,
+                                 "code_signing": CODE_SIGNING_CHECKS}, max_workers)
+    
+    def _run_checks(self, groups: Dict[str, Dict[str, str]], max_workers: Optional[int] = None) -> DiagnosticsResult:
+        started = time.perf_counter()
+        result = DiagnosticsResult(generated_at=time.strftime("%a %b %d %H:%M:%S %Z %Y"))
+        checks = [(group, key, method) for group, group_checks in groups.items()
+                  for key, method in group_checks.items()]
         
+        self._run_cache = _RunCache()
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers or len(checks)) as executor:
+                futures = [(group, key, executor.submit(self._timed_check, method))
+                           for group, key, method in checks]
+                for group, key, future in futures:
+                    diagnosis, elapsed = future.result()
+                    getattr(result, group)[key] = diagnosis
+                    result.timings[f"{group}.{key}"] = elapsed
+        finally:
+            self._run_cache = None
+        
+        result.elapsed = time.perf_counter() - started
+        return result
+    
+    def _timed_check(self, method: str):
+        started = time.perf_counter()
+        try:
+            diagnosis = getattr(self, method)()
+        except Exception as e:
+            diagnosis = {"status": "error", "message": str(e)}
+        return diagnosis, time.perf_counter() - started
+    
+    def _cached(self, key: str, loader: Callable[[], Any]) -> Any:
+        return self._run_cache.get(key, loader) if self._run_cache is not None else loader()
+    
+    def _read_text(self, path: Path) -> str:
+        def load():
+            with open(path, 'r') as f:
+                return f.read()
+        return self._cached(f"text:{path}", load)
+    
+    def _read_plist(self, path: Path) -> Dict[str, Any]:
+        def load():
+            with open(path, 'rb') as f:
+                return plistlib.load(f)
+        return self._cached(f"plist:{path}", load)
+    
     def diagnose_project_structure(self) -> Dict[str, Any]:
         """Diagnose project structure and configuration"""
         print("🔍 Diagnosing project structure...")
-        
-        diagnosis = {
-            "flutter_config": self._check_flutter_config(),
-            "ios_config": self._check_ios_config(),
-            "dependencies": self._check_dependencies(),
-            "permissions": self._check_permissions(),
-            "build_settings": self._check_build_settings()
-        }
-        
-        return diagnosis
+        return self._run_checks({"project_structure": PROJECT_STRUCTURE_CHECKS}).project_structure
     
     def _check_flutter_config(self) -> Dict[str, Any]:
         """Check Flutter configuration"""
@@ -42,8 +155,7 @@ class DeploymentDiagnostics:
             return {"status": "error", "message": "pubspec.yaml not found"}
         
         try:
-            with open(pubspec_path, 'r') as f:
-                content = f.read()
+            content = self._read_text(pubspec_path)
             
             # Extract key information
             name_match = re.search(r'name:\s*(\w+)', content)
@@ -83,8 +195,7 @@ class DeploymentDiagnostics:
             return {"status": "error", "message": "Info.plist not found"}
         
         try:
-            with open(info_plist_path, 'rb') as f:
-                plist_data = plistlib.load(f)
+            plist_data = self._read_plist(info_plist_path)
             
             return {
                 "status": "success",
@@ -112,8 +223,7 @@ class DeploymentDiagnostics:
         
         if podfile_path.exists():
             try:
-                with open(podfile_path, 'r') as f:
-                    podfile_content = f.read()
+                podfile_content = self._read_text(podfile_path)
                 
                 # Check for problematic pods
                 problematic_pods = []
@@ -129,6 +239,18 @@ class DeploymentDiagnostics:
             except Exception as e:
                 diagnosis["error"] = str(e)
         
+        if (self.project_path / "pubspec.lock").exists():
+            try:
+                analyzer = LockfileAnalyzer(str(self.project_path))
+                footprints = analyzer.rank(analyzer.load())
+                diagnosis["heaviest_dependencies"] = [
+                    {"package": f.package, "pods": len(f.pods), "size_bytes": f.size_bytes,
+                     "exclusive_size_bytes": f.exclusive_size_bytes}
+                    for f in footprints[:5] if f.pods
+                ]
+            except Exception as e:
+                diagnosis["lockfile_error"] = str(e)
+        
         return diagnosis
     
     def _check_permissions(self) -> Dict[str, Any]:
@@ -139,8 +261,7 @@ class DeploymentDiagnostics:
             return {"status": "error", "message": "Info.plist not found"}
         
         try:
-            with open(info_plist_path, 'rb') as f:
-                plist_data = plistlib.load(f)
+            plist_data = self._read_plist(info_plist_path)
             
             permissions = {}
             usage_descriptions = {}
@@ -170,62 +291,46 @@ class DeploymentDiagnostics:
             return {"status": "error", "message": str(e)}
     
     def _check_build_settings(self) -> Dict[str, Any]:
-        """Check Xcode build settings"""
-        project_path = self.ios_path / "Runner.xcodeproj" / "project.pbxproj"
-        
-        if not project_path.exists():
+        """Check Xcode build settings of the app target, per configuration"""
+        if not self._project_file().exists():
             return {"status": "error", "message": "project.pbxproj not found"}
         
         try:
-            with open(project_path, 'r') as f:
-                content = f.read()
-            
-            # Extract key build settings
-            build_settings = {
-                "deployment_target": self._extract_build_setting(content, "IPHONEOS_DEPLOYMENT_TARGET"),
-                "code_sign_identity": self._extract_build_setting(content, "CODE_SIGN_IDENTITY"),
-                "code_sign_style": self._extract_build_setting(content, "CODE_SIGN_STYLE"),
-                "development_team": self._extract_build_setting(content, "DEVELOPMENT_TEAM"),
-                "provisioning_profile": self._extract_build_setting(content, "PROVISIONING_PROFILE_SPECIFIER")
+            project = self._load_project()
+            # Release is what gets archived; every configuration is reported too
+            build_settings = {key: self._extract_build_setting(name) for key, name in BUILD_SETTING_NAMES.items()}
+            configurations = {
+                configuration: {key: self._extract_build_setting(name, configuration)
+                                for key, name in BUILD_SETTING_NAMES.items()}
+                for configuration in project.settings_by_configuration(BUILD_SETTING_NAMES["deployment_target"])
             }
             
             return {
                 "status": "success",
-                "build_settings": build_settings
+                "build_settings": build_settings,
+                "configurations": configurations
             }
         except Exception as e:
             return {"status": "error", "message": str(e)}
     
-    def _get_flutter_version(self) -> str:
-        """Get Flutter version"""
+    def _get_flutter_version(self, refresh: bool = False) -> str:
+        """Get Flutter version (cached until the SDK changes)"""
         try:
-            result = subprocess.run(["flutter", "--version"], capture_output=True, text=True)
-            version_match = re.search(r'Flutter (\d+\.\d+\.\d+)', result.stdout)
-            return version_match.group(1) if version_match else "unknown"
+            return self.toolchain.flutter_version(refresh=refresh)
         except:
             return "unknown"
     
-    def _get_deployment_target(self) -> str:
-        """Get iOS deployment target from project"""
-        project_path = self.ios_path / "Runner.xcodeproj" / "project.pbxproj"
-        
-        if not project_path.exists():
-            return "unknown"
-        
+    def _get_deployment_target(self, configuration: str = "Release") -> str:
+        """Get the app target's iOS deployment target from project"""
         try:
-            with open(project_path, 'r') as f:
-                content = f.read()
-            
-            match = re.search(r'IPHONEOS_DEPLOYMENT_TARGET = ([^;]+);', content)
-            return match.group(1).strip() if match else "unknown"
+            return self._extract_build_setting("IPHONEOS_DEPLOYMENT_TARGET", configuration)
         except:
             return "unknown"
     
-    def _get_cocoapods_version(self) -> str:
-        """Get CocoaPods version"""
+    def _get_cocoapods_version(self, refresh: bool = False) -> str:
+        """Get CocoaPods version (cached until the pod binary changes)"""
         try:
-            result = subprocess.run(["pod", "--version"], capture_output=True, text=True)
-            return result.stdout.strip() if result.returncode == 0 else "unknown"
+            return self.toolchain.cocoapods_version(refresh=refresh)
         except:
             return "unknown"
     
@@ -266,25 +371,22 @@ class DeploymentDiagnostics:
         match = re.search(r'platform :ios, [\'"]([\d.]+)[\'"]', podfile_content)
         return match.group(1) if match else "unknown"
     
-    def _extract_build_setting(self, content: str, setting_name: str) -> str:
-        """Extract build setting value from project.pbxproj"""
-        pattern = rf'{setting_name} = ([^;]+);'
-        match = re.search(pattern, content)
-        return match.group(1).strip() if match else "unknown"
+    def _project_file(self) -> Path:
+        return self.ios_path / "Runner.xcodeproj" / "project.pbxproj"
+    
+    def _load_project(self) -> PBXProject:
+        """Parsed project.pbxproj; reparsed only when the file's content changes"""
+        return self._cached("pbxproj", lambda: load_project(str(self._project_file())))
+    
+    def _extract_build_setting(self, setting_name: str, configuration: str = "Release") -> str:
+        """Effective app-target build setting for one configuration"""
+        value = self._load_project().build_setting(setting_name, configuration)
+        return value if value is not None else "unknown"
     
     def diagnose_code_signing(self) -> Dict[str, Any]:
         """Diagnose code signing configuration"""
         print("🔐 Diagnosing code signing configuration...")
-        
-        diagnosis = {
-            "certificates": self._check_certificates(),
-            "provisioning_profiles": self._check_provisioning_profiles(),
-            "team_id": self._check_team_id(),
-            "bundle_id": self._check_bundle_id(),
-            "xcode_cloud_config": self._check_xcode_cloud_config()
-        }
-        
-        return diagnosis
+        return self._run_checks({"code_signing": CODE_SIGNING_CHECKS}).code_signing
     
     def _check_certificates(self) -> Dict[str, Any]:
         """Check certificate configuration"""
@@ -317,22 +419,18 @@ class DeploymentDiagnostics:
     
     def _check_team_id(self) -> Dict[str, Any]:
         """Check team ID configuration"""
-        project_path = self.ios_path / "Runner.xcodeproj" / "project.pbxproj"
-        
-        if not project_path.exists():
+        if not self._project_file().exists():
             return {"status": "error", "message": "project.pbxproj not found"}
         
         try:
-            with open(project_path, 'r') as f:
-                content = f.read()
-            
-            team_match = re.search(r'DEVELOPMENT_TEAM = ([^;]+);', content)
-            team_id = team_match.group(1).strip() if team_match else "unknown"
+            team_id = self._extract_build_setting("DEVELOPMENT_TEAM")
+            teams = self._load_project().settings_by_configuration("DEVELOPMENT_TEAM")
             
             return {
                 "status": "success",
                 "team_id": team_id,
-                "is_valid": len(team_id) == 10 and team_id.isalnum()
+                "is_valid": len(team_id) == 10 and team_id.isalnum(),
+                "by_configuration": {configuration: team or "unknown" for configuration, team in teams.items()}
             }
         except:
             return {"status": "error", "message": "Cannot check team ID"}
@@ -345,8 +443,7 @@ class DeploymentDiagnostics:
             return {"status": "error", "message": "Info.plist not found"}
         
         try:
-            with open(info_plist_path, 'rb') as f:
-                plist_data = plistlib.load(f)
+            plist_data = self._read_plist(info_plist_path)
             
             bundle_id = plist_data.get("CFBundleIdentifier", "unknown")
             
@@ -363,17 +460,18 @@ class DeploymentDiagnostics:
         # This would require API integration with Xcode Cloud
         return {"status": "placeholder", "message": "Xcode Cloud config check not implemented"}
     
-    def generate_diagnostic_report(self) -> str:
-        """Generate comprehensive diagnostic report"""
+    def generate_diagnostic_report(self, result: Optional[DiagnosticsResult] = None) -> str:
+        """Generate comprehensive diagnostic report, from ``result`` when given"""
         print("📊 Generating diagnostic report...")
         
-        # Run all diagnostics
-        project_diagnosis = self.diagnose_project_structure()
-        code_signing_diagnosis = self.diagnose_code_signing()
+        # Only run the diagnostics if the caller has not already
+        result = result or self.run_diagnostics()
+        project_diagnosis = result.project_structure
+        code_signing_diagnosis = result.code_signing
         
         report = f"""
 # 🔍 XCodeDeployBot Diagnostic Report
-Generated: {os.popen('date').read().strip()}
+Generated: {result.generated_at}
 
 ## 📁 Project Structure Analysis
 
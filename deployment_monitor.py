@@ -4,18 +4,61 @@ Deployment Monitor Module
 Monitoring and analytics dashboard for iOS deployment
 """
 
-import json
 import time
 import sqlite3
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Iterator
 from dataclasses import dataclass, asdict
 import matplotlib.pyplot as plt
-import pandas as pd
+import numpy as np
+from metrics_storage import initialize_database, DEPLOYMENT_SCHEMA
+from metrics_export import check_export_options, export_filename, write_rows
+from build_phase_profiler import BuildProfile, PhaseTiming
+from app_size_analyzer import SizeBreakdown, SizeEntry, component_key, diff_breakdowns
+
+# Exported build_metrics columns and their types
+EXPORT_COLUMNS = {
+    "timestamp": "float",
+    "build_id": "string",
+    "status": "string",
+    "duration": "float",
+    "error_type": "string",
+    "error_message": "string",
+    "fixer_applied": "string",
+    "fix_success": "bool"
+}
+EXPORT_CHUNK_SIZE = 5000
+QUERY_CHUNK_SIZE = 1000
+# calculate_deployment_health windows start on multiples of this, so memoized results age out
+HEALTH_MEMO_TTL_SECONDS = 60.0
+
+# Structured-array layout returned by DeploymentMonitor.build_metrics_array
+BUILD_METRICS_DTYPE = np.dtype([
+    ("timestamp", np.float64),
+    ("duration", np.float64),      # NaN when unknown
+    ("success", np.bool_),
+    ("fix_applied", np.bool_),
+    ("fix_success", np.int8)       # 1 / 0, -1 when unknown
+])
+
+# rank_build_phases / detect_phase_regressions grouping -> (SQL key, row filter)
+PHASE_GROUPS = {
+    "phase": ("phase", "1"),
+    "target": ("project || ':' || target", "target != ''"),
+    "project": ("project", "target != ''"),
+    "phase_target": ("phase || ' ' || project || ':' || target", "target != ''"),
+    "script": ("target || ': ' || detail", "detail != ''")
+}
 
 @dataclass
 class BuildMetrics:
     """Build metrics data structure"""
+    # No per-instance __dict__; large histories are several times smaller
+    __slots__ = (
+        "timestamp", "build_id", "status", "duration",
+        "error_type", "error_message", "fixer_applied", "fix_success"
+    )
+    
     timestamp: float
     build_id: str
     status: str  # success, failed, in_progress
@@ -39,43 +82,13 @@ class DeploymentMonitor:
     
     def __init__(self, db_path: str = "deployment_metrics.db"):
         self.db_path = db_path
+        # days -> (last build row id, window start, health) memo for calculate_deployment_health
+        self._health_cache: Dict[int, Tuple[Optional[int], float, DeploymentHealth]] = {}
         self.init_database()
     
     def init_database(self):
         """Initialize SQLite database for metrics storage"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create build_metrics table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS build_metrics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp REAL NOT NULL,
-                build_id TEXT NOT NULL,
-                status TEXT NOT NULL,
-                duration REAL,
-                error_type TEXT,
-                error_message TEXT,
-                fixer_applied TEXT,
-                fix_success BOOLEAN
-            )
-        ''')
-        
-        # Create deployment_health table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS deployment_health (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp REAL NOT NULL,
-                success_rate REAL NOT NULL,
-                average_build_time REAL NOT NULL,
-                common_errors TEXT,
-                fix_effectiveness TEXT,
-                trend_data TEXT
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        initialize_database(self.db_path, DEPLOYMENT_SCHEMA)
     
     def record_build_metric(self, metric: BuildMetrics):
         """Record a build metric"""
@@ -99,45 +112,128 @@ class DeploymentMonitor:
         
         conn.commit()
         conn.close()
+        
+        self._health_cache.clear()
+    
+    def _build_metrics_filter(self, since: Optional[float], until: Optional[float], status: Optional[str],
+                              error_type: Optional[str], fixer_applied: Optional[str]) -> Tuple[str, List[Any]]:
+        """WHERE clause and parameters shared by the build metric queries"""
+        conditions, params = [], []
+        for clause, value in (("timestamp > ?", since), ("timestamp <= ?", until), ("status = ?", status),
+                              ("error_type = ?", error_type), ("fixer_applied = ?", fixer_applied)):
+            if value is not None:
+                conditions.append(clause)
+                params.append(value)
+        return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params
+    
+    def iter_build_metrics(self, since: Optional[float] = None, until: Optional[float] = None,
+                           status: Optional[str] = None, error_type: Optional[str] = None,
+                           fixer_applied: Optional[str] = None, newest_first: bool = True,
+                           chunk_size: int = QUERY_CHUNK_SIZE) -> Iterator[BuildMetrics]:
+        """Lazily yield builds matching the filters, newest first by default
+        
+        Filtering happens in SQL and rows are fetched in chunks, so callers
+        can stop early without reading the rest of the history.
+        """
+        where, params = self._build_metrics_filter(since, until, status, error_type, fixer_applied)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.execute(f'''
+                SELECT timestamp, build_id, status, duration, error_type, error_message, fixer_applied, fix_success
+                FROM build_metrics
+                {where}
+                ORDER BY timestamp {"DESC" if newest_first else "ASC"}
+            ''', params)
+            
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield BuildMetrics(*row)
+        finally:
+            conn.close()
+    
+    def build_metrics_array(self, since: Optional[float] = None, until: Optional[float] = None,
+                            status: Optional[str] = None, error_type: Optional[str] = None,
+                            fixer_applied: Optional[str] = None) -> np.ndarray:
+        """Numeric columns of matching builds as a BUILD_METRICS_DTYPE array, oldest first"""
+        where, params = self._build_metrics_filter(since, until, status, error_type, fixer_applied)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            # NULLs are mapped in SQL so rows convert straight into the structured dtype
+            cursor = conn.execute(f'''
+                SELECT timestamp,
+                       IFNULL(duration, 0), duration IS NULL,
+                       status = 'success',
+                       IFNULL(fixer_applied, '') != '',
+                       IFNULL(fix_success, -1)
+                FROM build_metrics
+                {where}
+                ORDER BY timestamp
+            ''', params)
+            
+            chunks = []
+            while True:
+                rows = cursor.fetchmany(EXPORT_CHUNK_SIZE)
+                if not rows:
+                    break
+                raw = np.array(rows, dtype=np.float64).reshape(-1, 6)
+                chunk = np.empty(len(raw), dtype=BUILD_METRICS_DTYPE)
+                chunk["timestamp"] = raw[:, 0]
+                chunk["duration"] = np.where(raw[:, 2] == 1, np.nan, raw[:, 1])
+                chunk["success"] = raw[:, 3] == 1
+                chunk["fix_applied"] = raw[:, 4] == 1
+                chunk["fix_success"] = raw[:, 5]
+                chunks.append(chunk)
+        finally:
+            conn.close()
+        
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=BUILD_METRICS_DTYPE)
     
     def get_build_metrics(self, days: int = 30) -> List[BuildMetrics]:
         """Get build metrics for the last N days"""
+        cutoff_time = time.time() - (days * 24 * 60 * 60)
+        return list(self.iter_build_metrics(since=cutoff_time))
+    
+    def calculate_deployment_health(self, days: int = 30) -> DeploymentHealth:
+        """Calculate deployment health metrics
+        
+        Every aggregate is a single GROUP BY query over the indexed time
+        window. Results are memoized until the next record_build_metric,
+        until another process adds builds to the same database, or until the
+        window start moves on to the next HEALTH_MEMO_TTL_SECONDS boundary
+        and old builds drop out of it.
+        """
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
+        cursor.execute("SELECT MAX(id) FROM build_metrics")
+        last_id = cursor.fetchone()[0]
         cutoff_time = time.time() - (days * 24 * 60 * 60)
+        cutoff_time -= cutoff_time % HEALTH_MEMO_TTL_SECONDS
+        cached = self._health_cache.get(days)
+        if cached is not None and cached[:2] == (last_id, cutoff_time):
+            conn.close()
+            return cached[2]
         
-        cursor.execute('''
-            SELECT timestamp, build_id, status, duration, error_type, error_message, fixer_applied, fix_success
-            FROM build_metrics
-            WHERE timestamp > ?
-            ORDER BY timestamp DESC
-        ''', (cutoff_time,))
-        
-        rows = cursor.fetchall()
+        health = self._health_for(cursor, "timestamp > ?", [cutoff_time])
         conn.close()
         
-        metrics = []
-        for row in rows:
-            metric = BuildMetrics(
-                timestamp=row[0],
-                build_id=row[1],
-                status=row[2],
-                duration=row[3],
-                error_type=row[4],
-                error_message=row[5],
-                fixer_applied=row[6],
-                fix_success=row[7]
-            )
-            metrics.append(metric)
-        
-        return metrics
+        self._health_cache[days] = (last_id, cutoff_time, health)
+        return health
     
-    def calculate_deployment_health(self, days: int = 30) -> DeploymentHealth:
-        """Calculate deployment health metrics"""
-        metrics = self.get_build_metrics(days)
+    def _health_for(self, cursor: sqlite3.Cursor, condition: str, params: List[Any]) -> DeploymentHealth:
+        """Deployment health of the builds matching an SQL condition"""
+        # Success rate and average build time
+        cursor.execute(f'''
+            SELECT COUNT(*), SUM(status = 'success'), AVG(duration)
+            FROM build_metrics
+            WHERE {condition}
+        ''', params)
+        total_builds, successful_builds, average_build_time = cursor.fetchone()
         
-        if not metrics:
+        if not total_builds:
             return DeploymentHealth(
                 success_rate=0.0,
                 average_build_time=0.0,
@@ -146,79 +242,60 @@ class DeploymentMonitor:
                 trend_data=[]
             )
         
-        # Calculate success rate
-        total_builds = len(metrics)
-        successful_builds = len([m for m in metrics if m.status == "success"])
-        success_rate = successful_builds / total_builds if total_builds > 0 else 0.0
-        
-        # Calculate average build time
-        build_times = [m.duration for m in metrics if m.duration is not None]
-        average_build_time = sum(build_times) / len(build_times) if build_times else 0.0
-        
-        # Calculate common errors
-        common_errors = {}
-        for metric in metrics:
-            if metric.error_type:
-                common_errors[metric.error_type] = common_errors.get(metric.error_type, 0) + 1
-        
-        # Calculate fix effectiveness
-        fix_effectiveness = {}
-        for metric in metrics:
-            if metric.fixer_applied:
-                if metric.fixer_applied not in fix_effectiveness:
-                    fix_effectiveness[metric.fixer_applied] = {"success": 0, "total": 0}
-                
-                fix_effectiveness[metric.fixer_applied]["total"] += 1
-                if metric.fix_success:
-                    fix_effectiveness[metric.fixer_applied]["success"] += 1
-        
-        # Calculate effectiveness percentages
-        for fixer in fix_effectiveness:
-            total = fix_effectiveness[fixer]["total"]
-            success = fix_effectiveness[fixer]["success"]
-            fix_effectiveness[fixer] = success / total if total > 0 else 0.0
+        success_rate = successful_builds / total_builds
+        
+        # Common errors
+        cursor.execute(f'''
+            SELECT error_type, COUNT(*)
+            FROM build_metrics
+            WHERE {condition} AND error_type IS NOT NULL AND error_type != ''
+            GROUP BY error_type
+        ''', params)
+        common_errors = dict(cursor.fetchall())
+        
+        # Fix effectiveness
+        cursor.execute(f'''
+            SELECT fixer_applied, AVG(CASE WHEN fix_success THEN 1.0 ELSE 0.0 END)
+            FROM build_metrics
+            WHERE {condition} AND fixer_applied IS NOT NULL AND fixer_applied != ''
+            GROUP BY fixer_applied
+        ''', params)
+        fix_effectiveness = dict(cursor.fetchall())
         
         # Generate trend data
-        trend_data = self._generate_trend_data(metrics)
+        trend_data = self._generate_trend_data(cursor, condition, params)
         
         return DeploymentHealth(
             success_rate=success_rate,
-            average_build_time=average_build_time,
+            average_build_time=average_build_time or 0.0,
             common_errors=common_errors,
             fix_effectiveness=fix_effectiveness,
             trend_data=trend_data
         )
     
-    def _generate_trend_data(self, metrics: List[BuildMetrics]) -> List[Dict[str, Any]]:
-        """Generate trend data for visualization"""
-        # Group metrics by day
-        daily_metrics = {}
-        
-        for metric in metrics:
-            date = datetime.fromtimestamp(metric.timestamp).date()
-            if date not in daily_metrics:
-                daily_metrics[date] = {"total": 0, "success": 0, "duration": []}
-            
-            daily_metrics[date]["total"] += 1
-            if metric.status == "success":
-                daily_metrics[date]["success"] += 1
-            if metric.duration:
-                daily_metrics[date]["duration"].append(metric.duration)
-        
-        # Convert to trend data
-        trend_data = []
-        for date, data in sorted(daily_metrics.items()):
-            success_rate = data["success"] / data["total"] if data["total"] > 0 else 0.0
-            avg_duration = sum(data["duration"]) / len(data["duration"]) if data["duration"] else 0.0
-            
-            trend_data.append({
-                "date": date.isoformat(),
+    def _generate_trend_data(self, cursor: sqlite3.Cursor, condition: str, params: List[Any]) -> List[Dict[str, Any]]:
+        """Generate daily trend data for visualization"""
+        # Days are bucketed in local time, as datetime.fromtimestamp does
+        cursor.execute(f'''
+            SELECT date(timestamp, 'unixepoch', 'localtime') AS day,
+                   COUNT(*),
+                   AVG(status = 'success'),
+                   AVG(NULLIF(duration, 0))
+            FROM build_metrics
+            WHERE {condition}
+            GROUP BY day
+            ORDER BY day
+        ''', params)
+        
+        return [
+            {
+                "date": day,
                 "success_rate": success_rate,
-                "average_duration": avg_duration,
-                "total_builds": data["total"]
-            })
-        
-        return trend_data
+                "average_duration": average_duration or 0.0,
+                "total_builds": total_builds
+            }
+            for day, total_builds, success_rate, average_duration in cursor.fetchall()
+        ]
     
     def generate_health_dashboard(self, days: int = 30) -> str:
         """Generate health dashboard report"""
@@ -376,34 +453,387 @@ Period: Last {days} days
         
         print("📊 Health dashboard visualization saved as 'deployment_health_dashboard.png'")
     
-    def export_metrics(self, format: str = "json", days: int = 30) -> str:
-        """Export metrics in various formats"""
-        health = self.calculate_deployment_health(days)
-        metrics = self.get_build_metrics(days)
+    def export_metrics(self, format: str = "json", days: Optional[int] = 30, since: Optional[float] = None,
+                       until: Optional[float] = None, compression: Optional[str] = None,
+                       incremental: bool = False, cursor_name: str = "default",
+                       output_path: Optional[str] = None, chunk_size: int = EXPORT_CHUNK_SIZE) -> str:
+        """Export build metrics as json, ndjson, csv or parquet
+        
+        Rows are streamed from a cursor with fetchmany, so memory use does
+        not grow with history. ``since``/``until`` bound the export by
+        timestamp; otherwise the last ``days`` are exported (all history
+        when ``days`` is None). With ``incremental=True`` only builds recorded
+        after the previous export with the same ``cursor_name`` are written,
+        and the cursor advances once the file is complete; time bounds
+        cannot be combined with it, since the cursor would skip the rows
+        they left out. The json header's health covers exactly the
+        exported rows.
+        """
+        check_export_options(format, compression)
+        if incremental and (since is not None or until is not None):
+            raise ValueError("since/until cannot be combined with incremental exports")
+        
+        if since is None and days is not None and not incremental:
+            since = time.time() - (days * 24 * 60 * 60)
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
         
+        last_id = 0
+        if incremental:
+            cursor.execute("SELECT last_id FROM export_cursors WHERE name = ?", (cursor_name,))
+            row = cursor.fetchone()
+            last_id = row[0] if row else 0
+        
+        # Bounded by the current last id, so the header and the rows see the same builds
+        cursor.execute("SELECT IFNULL(MAX(id), 0) FROM build_metrics")
+        conditions, params = ["id > ?", "id <= ?"], [last_id, cursor.fetchone()[0]]
+        if since is not None:
+            conditions.append("timestamp > ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("timestamp <= ?")
+            params.append(until)
+        
+        header = None
         if format == "json":
-            export_data = {
-                "health": asdict(health),
-                "metrics": [asdict(m) for m in metrics],
-                "exported_at": datetime.now().isoformat()
+            health = self._health_for(cursor, " AND ".join(conditions), params)
+            header = {"health": asdict(health), "exported_at": datetime.now().isoformat()}
+        
+        # Insertion order reads the table sequentially, which is much cheaper than
+        # walking the timestamp index and looking each row up
+        cursor.execute(f'''
+            SELECT id, {", ".join(EXPORT_COLUMNS)}
+            FROM build_metrics
+            WHERE {" AND ".join(conditions)}
+            ORDER BY id
+        ''', params)
+        
+        max_id = last_id
+        
+        def chunks():
+            nonlocal max_id
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                max_id = rows[-1][0]
+                yield [row[1:] for row in rows]
+        
+        filename = output_path or export_filename(
+            "deployment_metrics", format, compression, datetime.now().strftime('%Y%m%d_%H%M%S')
+        )
+        
+        try:
+            exported = write_rows(filename, format, EXPORT_COLUMNS, chunks(), compression, header)
+            
+            if incremental:
+                cursor.execute('''
+                    INSERT OR REPLACE INTO export_cursors (name, last_id, exported_at, rows_exported)
+                    VALUES (?, ?, ?, ?)
+                ''', (cursor_name, max_id, time.time(), exported))
+                conn.commit()
+        finally:
+            conn.close()
+        
+        return filename
+
+    def record_build_profile(self, profile: BuildProfile, timestamp: Optional[float] = None):
+        """Store a build's phase timings next to its build_metrics row
+        
+        The timestamp defaults to the build's build_metrics timestamp, or now
+        if the build was not recorded. Re-recording a build replaces its
+        previous timings.
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            if timestamp is None:
+                row = conn.execute("SELECT MAX(timestamp) FROM build_metrics WHERE build_id = ?",
+                                   (profile.build_id,)).fetchone()
+                timestamp = row[0] if row[0] is not None else time.time()
+            
+            with conn:
+                conn.execute("DELETE FROM build_phase_timings WHERE build_id = ?", (profile.build_id,))
+                conn.executemany('''
+                    INSERT INTO build_phase_timings
+                    (build_id, timestamp, source, phase, target, project, detail, outcome, task_count, duration)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [
+                    (profile.build_id, timestamp, t.source, t.phase, t.target, t.project, t.detail, t.outcome,
+                     t.task_count, t.duration)
+                    for t in profile.timings
+                ])
+        finally:
+            conn.close()
+    
+    def get_build_profile(self, build_id: str) -> BuildProfile:
+        """Stored phase timings of one build"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute('''
+                SELECT phase, duration, task_count, target, project, detail, source, outcome
+                FROM build_phase_timings
+                WHERE build_id = ?
+                ORDER BY id
+            ''', (build_id,)).fetchall()
+        finally:
+            conn.close()
+        return BuildProfile(build_id=build_id, timings=[PhaseTiming(*row) for row in rows])
+    
+    def rank_build_phases(self, days: int = 30, group_by: str = "phase",
+                          source: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Where build time goes over the last N days, slowest first
+        
+        Shares and per-build averages are computed within each timing
+        source, since sources measure overlapping time.
+        """
+        if group_by not in PHASE_GROUPS:
+            raise ValueError(f"Unsupported phase grouping: {group_by}")
+        key_expr, group_filter = PHASE_GROUPS[group_by]
+        cutoff_time = time.time() - (days * 24 * 60 * 60)
+        source_filter, params = ("AND source = ?", [cutoff_time, source]) if source else ("", [cutoff_time])
+        
+        conn = sqlite3.connect(self.db_path)
+        try:
+            builds = dict(conn.execute(f'''
+                SELECT source, COUNT(DISTINCT build_id)
+                FROM build_phase_timings
+                WHERE timestamp > ? {source_filter}
+                GROUP BY source
+            ''', params).fetchall())
+            rows = conn.execute(f'''
+                SELECT source, {key_expr} AS key,
+                       COUNT(DISTINCT build_id), SUM(task_count), SUM(duration)
+                FROM build_phase_timings
+                WHERE timestamp > ? {source_filter} AND {group_filter}
+                GROUP BY source, key
+            ''', params).fetchall()
+        finally:
+            conn.close()
+        
+        source_totals: Dict[str, float] = {}
+        for row_source, _key, _builds, _tasks, total in rows:
+            source_totals[row_source] = source_totals.get(row_source, 0.0) + total
+        
+        ranking = [
+            {
+                "source": row_source,
+                "key": key,
+                "builds": build_count,
+                "tasks": tasks,
+                "total_seconds": total,
+                # Builds without the phase count as zero
+                "average_seconds": total / builds[row_source],
+                "share": total / source_totals[row_source] if source_totals[row_source] else 0.0
             }
+            for row_source, key, build_count, tasks, total in rows
+        ]
+        ranking.sort(key=lambda entry: entry["total_seconds"], reverse=True)
+        return ranking
+    
+    def detect_phase_regressions(self, build_id: Optional[str] = None, group_by: str = "phase",
+                                 baseline_builds: int = 10, threshold: float = 0.2,
+                                 min_delta: float = 5.0) -> List[Dict[str, Any]]:
+        """Compare a build's phases with the median of the builds before it
+        
+        Defaults to the most recently profiled build; the baseline only uses
+        builds profiled from the same kind of source (e.g. iOS vs Gradle
+        logs). A phase is flagged as
+        regressed when it is at least ``min_delta`` seconds and ``threshold``
+        (relative) slower than its baseline. Results are sorted by the
+        absolute slowdown.
+        """
+        if group_by not in PHASE_GROUPS:
+            raise ValueError(f"Unsupported phase grouping: {group_by}")
+        key_expr, group_filter = PHASE_GROUPS[group_by]
+        
+        conn = sqlite3.connect(self.db_path)
+        try:
+            if build_id is None:
+                row = conn.execute('''
+                    SELECT build_id FROM build_phase_timings ORDER BY timestamp DESC, id DESC LIMIT 1
+                ''').fetchone()
+                if row is None:
+                    return []
+                build_id = row[0]
             
-            filename = f"deployment_metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(filename, 'w') as f:
-                json.dump(export_data, f, indent=2)
+            row = conn.execute("SELECT MAX(timestamp) FROM build_phase_timings WHERE build_id = ?",
+                               (build_id,)).fetchone()
+            if row[0] is None:
+                return []
+            build_time = row[0]
             
-            return filename
+            current = {
+                (row_source, key): total
+                for row_source, key, total in conn.execute(f'''
+                    SELECT source, {key_expr} AS key, SUM(duration)
+                    FROM build_phase_timings
+                    WHERE build_id = ? AND {group_filter}
+                    GROUP BY source, key
+                ''', (build_id,))
+            }
+            baseline_ids = [
+                row[0] for row in conn.execute('''
+                    SELECT build_id, MAX(timestamp) AS built_at
+                    FROM build_phase_timings
+                    WHERE timestamp < ? AND build_id != ?
+                      AND source IN (SELECT source FROM build_phase_timings WHERE build_id = ?)
+                    GROUP BY build_id
+                    ORDER BY built_at DESC
+                    LIMIT ?
+                ''', (build_time, build_id, build_id, baseline_builds))
+            ]
+            placeholders = ", ".join("?" * len(baseline_ids))
+            baseline_rows = conn.execute(f'''
+                SELECT build_id, source, {key_expr} AS key, SUM(duration)
+                FROM build_phase_timings
+                WHERE build_id IN ({placeholders}) AND {group_filter}
+                GROUP BY build_id, source, key
+            ''', baseline_ids).fetchall() if baseline_ids else []
+        finally:
+            conn.close()
+        
+        # Per source, builds that have the source but lack a phase spent 0s in it
+        source_builds: Dict[str, set] = {}
+        per_build: Dict[Tuple[str, str], Dict[str, float]] = {}
+        for baseline_id, row_source, key, total in baseline_rows:
+            source_builds.setdefault(row_source, set()).add(baseline_id)
+            per_build.setdefault((row_source, key), {})[baseline_id] = total
+        
+        regressions = []
+        for row_source, key in set(current) | set(per_build):
+            sources_builds = source_builds.get(row_source)
+            if not sources_builds:
+                continue
+            totals = per_build.get((row_source, key), {})
+            baseline = float(np.median([totals.get(b, 0.0) for b in sources_builds]))
+            value = current.get((row_source, key), 0.0)
+            delta = value - baseline
+            change = delta / baseline if baseline else (1.0 if delta > 0 else 0.0)
+            regressions.append({
+                "source": row_source,
+                "key": key,
+                "current": value,
+                "baseline": baseline,
+                "delta": delta,
+                "change": change,
+                "regressed": delta >= min_delta and change >= threshold
+            })
         
-        elif format == "csv":
-            # Convert metrics to DataFrame
-            df = pd.DataFrame([asdict(m) for m in metrics])
-            filename = f"deployment_metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            df.to_csv(filename, index=False)
+        regressions.sort(key=lambda entry: entry["delta"], reverse=True)
+        return regressions
+    
+    def record_app_size(self, build_id: str, breakdown: SizeBreakdown, timestamp: Optional[float] = None):
+        """Store a build archive's size breakdown next to its build_metrics row
+        
+        Timestamps follow record_build_profile. Re-recording the same build
+        and archive format replaces the previous breakdown.
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            if timestamp is None:
+                row = conn.execute("SELECT MAX(timestamp) FROM build_metrics WHERE build_id = ?",
+                                   (build_id,)).fetchone()
+                timestamp = row[0] if row[0] is not None else time.time()
             
-            return filename
+            with conn:
+                conn.execute("DELETE FROM app_size_components WHERE build_id = ? AND format = ?",
+                             (build_id, breakdown.format))
+                conn.executemany('''
+                    INSERT INTO app_size_components
+                    (build_id, timestamp, platform, format, category, component, compressed, uncompressed, files)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [
+                    (build_id, timestamp, breakdown.platform, breakdown.format, e.category, e.component,
+                     e.compressed, e.uncompressed, e.files)
+                    for e in breakdown.components.values()
+                ])
+        finally:
+            conn.close()
+    
+    def get_app_size(self, build_id: str, format: str) -> Optional[SizeBreakdown]:
+        """Stored size breakdown of one build's .ipa / .apk / .aab"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute('''
+                SELECT platform, category, component, compressed, uncompressed, files
+                FROM app_size_components
+                WHERE build_id = ? AND format = ?
+            ''', (build_id, format)).fetchall()
+        finally:
+            conn.close()
+        
+        if not rows:
+            return None
+        breakdown = SizeBreakdown(path=build_id, format=format, platform=rows[0][0])
+        for _platform, category, component, compressed, uncompressed, files in rows:
+            breakdown.components[component_key(category, component)] = SizeEntry(
+                category, component, compressed, uncompressed, files
+            )
+        return breakdown
+    
+    def app_size_history(self, format: str, days: int = 90) -> List[Dict[str, Any]]:
+        """Per-build archive size over the last N days, oldest first"""
+        cutoff_time = time.time() - (days * 24 * 60 * 60)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute('''
+                SELECT build_id, MAX(timestamp) AS built_at, SUM(compressed), SUM(uncompressed)
+                FROM app_size_components
+                WHERE format = ? AND timestamp > ?
+                GROUP BY build_id
+                ORDER BY built_at
+            ''', (format, cutoff_time)).fetchall()
+        finally:
+            conn.close()
+        
+        return [
+            {"build_id": build_id, "timestamp": built_at, "compressed": compressed, "uncompressed": uncompressed}
+            for build_id, built_at, compressed, uncompressed in rows
+        ]
+    
+    def compare_app_size(self, build_id: str, format: Optional[str] = None,
+                         previous_build_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Diff a build's archive against the previous recorded build of the same format
         
-        else:
-            raise ValueError(f"Unsupported export format: {format}")
+        Returns None when there is nothing to compare with.
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute('''
+                SELECT format, MAX(timestamp) FROM app_size_components
+                WHERE build_id = ? AND (? IS NULL OR format = ?)
+                GROUP BY format ORDER BY MAX(timestamp) DESC LIMIT 1
+            ''', (build_id, format, format)).fetchone()
+            if row is None:
+                return None
+            format, built_at = row
+            if previous_build_id is None:
+                row = conn.execute('''
+                    SELECT build_id FROM app_size_components
+                    WHERE format = ? AND build_id != ? AND timestamp < ?
+                    ORDER BY timestamp DESC, id DESC LIMIT 1
+                ''', (format, build_id, built_at)).fetchone()
+                if row is None:
+                    return None
+                previous_build_id = row[0]
+        finally:
+            conn.close()
+        
+        current = self.get_app_size(build_id, format)
+        previous = self.get_app_size(previous_build_id, format)
+        if previous is None:
+            return None
+        return {
+            "build_id": build_id,
+            "previous_build_id": previous_build_id,
+            "format": format,
+            "previous": previous,
+            "current": current,
+            "delta_compressed": current.compressed - previous.compressed,
+            "delta_uncompressed": current.uncompressed - previous.uncompressed,
+            "changes": diff_breakdowns(previous, current)
+        }
 
 
 def main():
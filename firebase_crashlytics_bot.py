@@ -15,6 +15,7 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 import os
 import subprocess
+from metrics_storage import initialize_database, CRASH_SCHEMA
 
 class CrashSeverity(Enum):
     CRITICAL = "critical"      # Crashes affecting >50% of users
@@ -967,26 +968,7 @@ class CrashMonitoring:
     
     def init_database(self):
         """Initialize SQLite database for crash metrics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create crash_metrics table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS crash_metrics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp REAL NOT NULL,
-                total_crashes INTEGER NOT NULL,
-                unique_issues INTEGER NOT NULL,
-                crash_free_users REAL NOT NULL,
-                crash_free_sessions REAL NOT NULL,
-                top_crash_types TEXT,
-                affected_devices TEXT,
-                affected_versions TEXT
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        initialize_database(self.db_path, CRASH_SCHEMA)
     
     def record_crash_metric(self, metric: CrashMetrics):
         """Record a crash metric"""
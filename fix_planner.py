@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Fix Planner
+Dependency graph of repair steps with input hashing, concurrent execution and history-based estimates
+"""
+
+import glob
+import json
+import time
+import sqlite3
+import hashlib
+import statistics
+from fnmatch import fnmatch
+from pathlib import Path
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from metrics_storage import initialize_database, DEPLOYMENT_SCHEMA
+from toolchain_probe import shared_probe
+
+DEFAULT_MAX_WORKERS = 4
+ESTIMATE_SAMPLES = 5
+
+# "tool:<name>" inputs hash the binary fingerprint the probe cache already uses
+TOOL_COMMANDS = {
+    "flutter": ["flutter", "--version"],
+    "pod": ["pod", "--version"],
+    "xcodebuild": ["xcodebuild", "-version"]
+}
+
+
+@dataclass
+class FixStep:
+    """One repair step and the files it reads and writes.
+
+    ``inputs`` and ``outputs`` are project-relative globs, ``~/`` or
+    absolute paths, or ``tool:<name>``. A step whose input matches another
+    step's output runs after it. ``inputs=None`` means the step's state is
+    not captured by files, so it is never skipped.
+    """
+    name: str
+    action: Callable[[], Dict[str, Any]]
+    inputs: Optional[List[str]] = None
+    outputs: List[str] = field(default_factory=list)
+    after: List[str] = field(default_factory=list)
+    description: str = ""
+
+
+@dataclass
+class PlannedStep:
+    """A step's place in the plan and whether it is expected to run"""
+    name: str
+    description: str
+    depends_on: List[str]
+    wave: int
+    will_run: bool
+    reason: str
+    estimate: Optional[float] = None
+    changed_inputs: List[str] = field(default_factory=list)
+
+
+@dataclass
+class FixPlan:
+    """Steps in topological order, grouped into waves that can run together"""
+    steps: Dict[str, PlannedStep]
+    waves: List[List[str]]
+
+    def estimated_duration(self) -> float:
+        """Longest chain of estimated run times; skipped steps cost nothing"""
+        finish: Dict[str, float] = {}
+        for name, step in self.steps.items():
+            cost = (step.estimate or 0.0) if step.will_run else 0.0
+            finish[name] = max((finish[dep] for dep in step.depends_on), default=0.0) + cost
+        return max(finish.values(), default=0.0)
+
+    def serial_duration(self) -> float:
+        return sum(step.estimate or 0.0 for step in self.steps.values() if step.will_run)
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _patterns_overlap(a: str, b: str) -> bool:
+    return a == b or fnmatch(a, b) or fnmatch(b, a)
+
+
+class FixPlanner:
+    """Runs FixSteps as a DAG, skipping those whose inputs and outputs are unchanged.
+
+    A step is skipped when its last run succeeded and the digest of its
+    inputs and outputs equals the one recorded after that run; the stored result is returned
+    in its place, marked ``skipped``. Digests are taken when a step becomes
+    ready, after everything upstream has finished, so a step whose inputs
+    were rewritten by an upstream step is re-evaluated against the new
+    content. Run history lives in the deployment database and doubles as
+    the source of duration estimates for dry runs.
+    """
+
+    def __init__(self, project_path: str, steps: Sequence[FixStep], db_path: str = "deployment_metrics.db",
+                 max_workers: int = DEFAULT_MAX_WORKERS):
+        self.project_path = Path(project_path)
+        self.project_key = str(self.project_path.resolve())
+        self.steps = {step.name: step for step in steps}
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.dependencies = self._dependencies()
+        self.order = self._topological_order()
+        initialize_database(self.db_path, DEPLOYMENT_SCHEMA)
+
+    def _dependencies(self) -> Dict[str, List[str]]:
+        dependencies = {}
+        for name, step in self.steps.items():
+            unknown = [dep for dep in step.after if dep not in self.steps]
+            if unknown:
+                raise ValueError(f"Step {name} runs after unknown steps: {', '.join(unknown)}")
+            depends_on = list(step.after)
+            for other in self.steps.values():
+                if other.name == name or other.name in depends_on:
+                    continue
+                if any(_patterns_overlap(i, o) for i in step.inputs or () for o in other.outputs):
+                    depends_on.append(other.name)
+            dependencies[name] = depends_on
+        return dependencies
+
+    def _topological_order(self) -> List[str]:
+        order, state = [], {}
+
+        def visit(name: str, path: List[str]):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Fix steps form a cycle: {' -> '.join(path + [name])}")
+            state[name] = "visiting"
+            for dep in self.dependencies[name]:
+                visit(dep, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.steps:
+            visit(name, [])
+        return order
+
+    def _selection(self, only: Optional[Sequence[str]]) -> List[str]:
+        if only is None:
+            return list(self.order)
+        unknown = [name for name in only if name not in self.steps]
+        if unknown:
+            raise ValueError(f"Unknown fix steps: {', '.join(unknown)}")
+        return [name for name in self.order if name in only]
+
+    def state_digests(self, step: FixStep) -> Dict[str, str]:
+        """{input: digest} for every file or tool the step reads, plus ``output:<pattern>`` for what it writes.
+
+        Outputs are part of the state so a deleted or damaged result (an
+        emptied Pods/) makes the step run again even though nothing it
+        reads has changed.
+        """
+        digests = self._digests(step.inputs or ())
+        digests.update((f"output:{key}", digest) for key, digest in self._digests(step.outputs).items())
+        return digests
+
+    def _digests(self, patterns: Sequence[str]) -> Dict[str, str]:
+        digests = {}
+        for pattern in patterns:
+            if pattern.startswith("tool:"):
+                tool = pattern[5:]
+                try:
+                    digests[pattern] = shared_probe().cache_key(TOOL_COMMANDS.get(tool, [tool, "--version"]))
+                except FileNotFoundError:
+                    digests[pattern] = "missing"
+                continue
+            path = Path(pattern).expanduser()
+            path = path if path.is_absolute() else self.project_path / path
+            matches = sorted(glob.glob(str(path), recursive=True)) if glob.has_magic(pattern) else [str(path)]
+            if not matches:
+                digests[pattern] = "missing"
+            for match in matches:
+                key = f"{pattern}:{match}" if glob.has_magic(pattern) else pattern
+                try:
+                    digests[key] = _file_digest(match) if Path(match).is_file() else "missing"
+                except OSError:
+                    digests[key] = "unreadable"
+        return digests
+
+    @staticmethod
+    def _combined(digests: Dict[str, str]) -> str:
+        return hashlib.sha256(json.dumps(digests, sort_keys=True).encode()).hexdigest()
+
+    def last_run(self, name: str) -> Optional[Dict[str, Any]]:
+        """Most recent recorded run of a step in this project"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute('''
+                SELECT input_hash, inputs, success, result, started_at, duration FROM fix_step_runs
+                WHERE project = ? AND step = ?
+                ORDER BY started_at DESC LIMIT 1
+            ''', (self.project_key, name)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return {"input_hash": row[0], "inputs": json.loads(row[1]), "success": bool(row[2]),
+                "result": json.loads(row[3]), "started_at": row[4], "duration": row[5]}
+
+    def estimate(self, name: str) -> Optional[float]:
+        """Median of the step's recent run times, from successful runs when there are any"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute('''
+                SELECT duration, success FROM fix_step_runs
+                WHERE project = ? AND step = ?
+                ORDER BY started_at DESC LIMIT ?
+            ''', (self.project_key, name, ESTIMATE_SAMPLES * 4)).fetchall()
+        finally:
+            conn.close()
+        durations = [duration for duration, success in rows if success][:ESTIMATE_SAMPLES] \
+            or [duration for duration, _ in rows][:ESTIMATE_SAMPLES]
+        return statistics.median(durations) if durations else None
+
+    def _record(self, name: str, digests: Dict[str, str], success: bool,
+                started_at: float, duration: float, result: Dict[str, Any]):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.execute('''
+                    INSERT INTO fix_step_runs
+                        (project, step, input_hash, inputs, success, started_at, duration, result)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (self.project_key, name, self._combined(digests), json.dumps(digests, sort_keys=True),
+                      success, started_at, duration, json.dumps(result, default=str)))
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _unchanged_since(last: Dict[str, Any]) -> str:
+        return time.strftime("inputs and outputs unchanged since %Y-%m-%d %H:%M",
+                             time.localtime(last["started_at"]))
+
+    def _skippable(self, step: FixStep, digests: Dict[str, str], force: bool) -> Optional[Dict[str, Any]]:
+        """The last run, if it succeeded and left exactly this state; otherwise None"""
+        if force or step.inputs is None:
+            return None
+        last = self.last_run(step.name)
+        if last is None or not last["success"] or last["input_hash"] != self._combined(digests):
+            return None
+        return last
+
+    def plan(self, only: Optional[Sequence[str]] = None, force: bool = False) -> FixPlan:
+        """Predict what ``execute`` would do with the project as it is now.
+
+        A step downstream of one that will run is assumed to run too, since
+        its inputs may be rewritten before it starts.
+        """
+        selected = self._selection(only)
+        steps, waves = {}, []
+        for name in selected:
+            step = self.steps[name]
+            depends_on = [dep for dep in self.dependencies[name] if dep in selected]
+            wave = max((steps[dep].wave + 1 for dep in depends_on), default=0)
+            digests = self.state_digests(step)
+            last = self.last_run(name) if step.inputs is not None else None
+
+            changed = []
+            if last is not None:
+                changed = sorted(key for key in set(digests) | set(last["inputs"])
+                                 if digests.get(key) != last["inputs"].get(key))
+            upstream = [dep for dep in depends_on if steps[dep].will_run]
+            if force:
+                will_run, reason = True, "forced"
+            elif step.inputs is None:
+                will_run, reason = True, "no declared inputs; always runs"
+            elif last is None:
+                will_run, reason = True, "no run recorded"
+            elif not last["success"]:
+                will_run, reason = True, "last run failed"
+            elif changed:
+                will_run, reason = True, f"changed: {', '.join(changed)}"
+            elif upstream:
+                will_run, reason = True, f"upstream will run: {', '.join(upstream)}"
+            else:
+                will_run, reason = False, self._unchanged_since(last)
+
+            steps[name] = PlannedStep(name=name, description=step.description, depends_on=depends_on,
+                                      wave=wave, will_run=will_run, reason=reason,
+                                      estimate=self.estimate(name), changed_inputs=changed)
+            while len(waves) <= wave:
+                waves.append([])
+            waves[wave].append(name)
+        return FixPlan(steps=steps, waves=waves)
+
+    def execute(self, only: Optional[Sequence[str]] = None, force: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Run the selected steps, each as soon as its dependencies finish.
+
+        Returns {step: result} in topological order. A failing upstream
+        step does not stop its dependents; fixers are best-effort, as when
+        they ran one after another.
+        """
+        selected = self._selection(only)
+        pending = {name: {dep for dep in self.dependencies[name] if dep in selected} for name in selected}
+        results: Dict[str, Dict[str, Any]] = {}
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+            running = {}
+            while pending or running:
+                for name in [name for name, deps in pending.items() if not deps]:
+                    del pending[name]
+                    running[pool.submit(self._execute_step, self.steps[name], force)] = name
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    for deps in pending.values():
+                        deps.discard(name)
+
+        return {name: results[name] for name in selected}
+
+    def _execute_step(self, step: FixStep, force: bool) -> Dict[str, Any]:
+        last = self._skippable(step, self.state_digests(step), force)
+        if last is not None:
+            skip_reason = self._unchanged_since(last)
+            print(f"   ⏭️  {step.name}: {skip_reason}")
+            return {**last["result"], "skipped": True, "skip_reason": skip_reason}
+
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            result = step.action()
+        except Exception as e:
+            result = {"fixer_type": step.name, "fixes_applied": [], "errors": [f"Exception in {step.name}: {e}"],
+                      "success": False, "timestamp": time.time()}
+        duration = time.perf_counter() - started
+
+        # Record the post-run state: a step that rewrites its own inputs
+        # (pod install regenerating Podfile.lock) is then stable next time
+        self._record(step.name, self.state_digests(step), bool(result.get("success")),
+                     started_at, duration, result)
+        return {**result, "skipped": False}
+
+
+def fixer_steps(fixer) -> List[FixStep]:
+    """Steps for AutomatedFixer's fixers.
+
+    `flutter pub get` writes pubspec.lock and the Flutter podspec that
+    `pod install` reads, so Flutter runs first; the signing, environment,
+    Xcode Cloud and App Store checks only read and overlap with it.
+    """
+    return [
+        FixStep("flutter", fixer.fix_flutter_issues,
+                inputs=["pubspec.yaml", "pubspec.lock", "tool:flutter"],
+                outputs=["pubspec.lock", "ios/Flutter/Generated.xcconfig"],
+                description="flutter clean, pub get, doctor"),
+        FixStep("cocoapods", fixer.fix_cocoapods_issues,
+                inputs=["ios/Podfile", "ios/Podfile.lock", "pubspec.lock", "tool:pod"],
+                outputs=["ios/Podfile.lock", "ios/Pods/Manifest.lock"],
+                description="pod install (from the Pods cache when possible)"),
+        FixStep("code_signing", fixer.fix_code_signing_issues,
+                inputs=["ios/Runner.xcodeproj/project.pbxproj", "~/Library/Keychains/login.keychain-db"],
+                description="signing settings and keychain identities"),
+        FixStep("build_environment", fixer.fix_build_environment_issues,
+                inputs=["tool:xcodebuild", "tool:flutter", "tool:pod",
+                        "/System/Library/CoreServices/SystemVersion.plist"],
+                description="Xcode, macOS, Flutter and CocoaPods versions"),
+        FixStep("xcode_cloud", fixer.fix_xcode_cloud_issues,
+                description="Xcode Cloud workflow files"),
+        FixStep("app_store", fixer.fix_app_store_connect_issues,
+                inputs=["ios/Runner/Info.plist", "pubspec.yaml"],
+                description="Info.plist metadata and version numbers")
+    ]
+
+
+def _format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "no history"
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    return f"{int(seconds // 60)}m {int(seconds % 60):02d}s"
+
+
+def format_plan(plan: FixPlan) -> str:
+    """Dry-run listing: waves, what runs or is skipped and why, estimated time"""
+    to_run = sum(1 for step in plan.steps.values() if step.will_run)
+    lines = [
+        f"🗺️  Fix plan: {len(plan.steps)} steps in {len(plan.waves)} waves, "
+        f"{to_run} to run, {len(plan.steps) - to_run} to skip",
+        f"   ⏱️  Estimated {_format_duration(plan.estimated_duration())} wall clock "
+        f"({_format_duration(plan.serial_duration())} if run one after another)"
+    ]
+    unknown = [step.name for step in plan.steps.values() if step.will_run and step.estimate is None]
+    if unknown:
+        lines.append(f"   ⚠️  No history for {', '.join(unknown)}; not counted in the estimate")
+    for index, wave in enumerate(plan.waves, 1):
+        lines.append(f"\nWave {index}")
+        for name in wave:
+            step = plan.steps[name]
+            icon = "▶️ " if step.will_run else "⏭️ "
+            after = f" (after {', '.join(step.depends_on)})" if step.depends_on else ""
+            lines.append(f"   {icon} {name:18s} ~{_format_duration(step.estimate):>10s}  {step.reason}{after}")
+    return "\n".join(lines)
+
+
+def main():
+    """Show or run the fix plan for a project"""
+    import argparse
+    from automated_fixer import AutomatedFixer
+
+    parser = argparse.ArgumentParser(description="Dependency-ordered, incremental deployment fixes")
+    parser.add_argument("--project-path", default=".", help="Flutter project root")
+    parser.add_argument("--db", default="deployment_metrics.db", help="Deployment metrics database")
+    parser.add_argument("--step", action="append", dest="steps", help="Run only these steps (repeatable)")
+    parser.add_argument("--force", action="store_true", help="Run steps even if their inputs are unchanged")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan with estimated durations")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS, help="Steps run at once")
+    args = parser.parse_args()
+
+    fixer = AutomatedFixer(args.project_path, history_db=args.db)
+    planner = FixPlanner(args.project_path, fixer_steps(fixer), db_path=args.db, max_workers=args.workers)
+    try:
+        print(format_plan(planner.plan(args.steps, force=args.force)))
+        if args.dry_run:
+            return
+        results = planner.execute(args.steps, force=args.force)
+    except ValueError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+    print()
+    for name, result in results.items():
+        status = "⏭️  skipped" if result.get("skipped") else ("✅" if result.get("success") else "❌")
+        print(f"{status} {name}: {len(result.get('fixes_applied', []))} fixes, {len(result.get('errors', []))} errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Gradle Build Analyzer
+Task timings, configuration time and cache effectiveness from Gradle profiles and build logs
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import time
+from html.parser import HTMLParser
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from build_log_analyzer import open_log
+from build_phase_profiler import BuildProfile, PhaseTiming, parse_timestamp
+
+SOURCE_GRADLE_PROFILE = "gradle_profile"   # --profile HTML report
+SOURCE_GRADLE_LOG = "gradle_log"           # gaps between timestamped "> Task" lines
+SOURCE_GRADLE_TASKS = "gradle_tasks"       # untimestamped logs: outcomes only
+# Build phase totals (configuration, task execution, ...) are stored under
+# "<source>_summary" so they are not ranked against the tasks they contain
+SUMMARY_SOURCE_SUFFIX = "_summary"
+
+EXECUTED = "EXECUTED"
+UP_TO_DATE = "UP-TO-DATE"
+FROM_CACHE = "FROM-CACHE"
+
+# Profile report result column -> task outcome; executed tasks leave the cell empty
+PROFILE_OUTCOMES = {"": EXECUTED, "did work": EXECUTED, "did no work": UP_TO_DATE}
+
+R8_TASK = re.compile(r"(?:R8|minify\w*WithR8)", re.IGNORECASE)
+DEX_TASK = re.compile(r"^(?:dexBuilder|merge(?:Ext|Lib|Project)?Dex)", re.IGNORECASE)
+
+# "> Task :app:compileReleaseKotlin UP-TO-DATE"
+TASK_LINE = re.compile(r"^> Task (?P<path>:\S+)(?:\s+(?P<outcome>UP-TO-DATE|FROM-CACHE|NO-SOURCE|SKIPPED|FAILED))?\s*$")
+CONFIGURE_LINE = re.compile(r"^> Configure project (?P<path>\S+)")
+RESULT_LINE = re.compile(r"^BUILD (?P<status>SUCCESSFUL|FAILED) in (?P<duration>.+?)\s*$")
+# "47 actionable tasks: 12 executed, 30 up-to-date, 5 from cache"
+ACTIONABLE_LINE = re.compile(r"^\d+ actionable tasks?: (?P<counts>.+?)\s*$")
+ACTIONABLE_OUTCOMES = {"executed": EXECUTED, "up-to-date": UP_TO_DATE, "from cache": FROM_CACHE}
+
+# Summary tab rows and the report fields they fill
+PROFILE_SUMMARY_FIELDS = [
+    ("Total Build Time", "total_duration"),
+    ("Startup", "startup_time"),
+    ("Settings and buildSrc", "settings_time"),
+    ("Loading Projects", "loading_time"),
+    ("Configuring Projects", "configuration_time"),
+    ("Artifact Transforms", "transform_time"),
+    ("Task Execution", "task_execution_time")
+]
+SUMMARY_ROWS = {label.lower(): attribute for label, attribute in PROFILE_SUMMARY_FIELDS}
+
+@dataclass
+class GradleTask:
+    """One executed or avoided Gradle task"""
+    path: str
+    outcome: str
+    duration: float = 0.0
+
+    @property
+    def project(self) -> str:
+        return self.path.rsplit(":", 1)[0] or ":"
+
+    @property
+    def name(self) -> str:
+        return self.path.rsplit(":", 1)[1]
+
+@dataclass
+class GradleBuildReport:
+    """Timings and cache effectiveness of one Gradle build"""
+    build_id: str
+    status: Optional[str] = None
+    requested_tasks: Optional[str] = None
+    total_duration: Optional[float] = None
+    startup_time: Optional[float] = None
+    settings_time: Optional[float] = None
+    loading_time: Optional[float] = None
+    configuration_time: Optional[float] = None
+    transform_time: Optional[float] = None
+    task_execution_time: Optional[float] = None
+    tasks: List[GradleTask] = field(default_factory=list)
+    project_configuration: Dict[str, float] = field(default_factory=dict)
+    problems: List[Dict[str, Any]] = field(default_factory=list)
+    actionable_counts: Dict[str, int] = field(default_factory=dict)
+    source: str = SOURCE_GRADLE_TASKS
+
+    def outcome_counts(self) -> Dict[str, int]:
+        if not self.tasks:
+            # Rich console logs have no "> Task" lines, only the final tally
+            return dict(self.actionable_counts)
+        counts: Dict[str, int] = {}
+        for task in self.tasks:
+            counts[task.outcome] = counts.get(task.outcome, 0) + 1
+        # Gradle's own "actionable tasks" tally is authoritative for the buckets it reports
+        counts.update(self.actionable_counts)
+        return counts
+
+    @property
+    def up_to_date_rate(self) -> float:
+        """Share of actionable tasks skipped as up to date"""
+        counts = self.outcome_counts()
+        actionable = sum(counts.get(outcome, 0) for outcome in (EXECUTED, UP_TO_DATE, FROM_CACHE))
+        return counts.get(UP_TO_DATE, 0) / actionable if actionable else 0.0
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """Share of tasks that had to produce outputs and got them from the build cache"""
+        counts = self.outcome_counts()
+        candidates = counts.get(FROM_CACHE, 0) + counts.get(EXECUTED, 0)
+        return counts.get(FROM_CACHE, 0) / candidates if candidates else 0.0
+
+    @property
+    def r8_time(self) -> float:
+        return sum(task.duration for task in self.tasks if R8_TASK.search(task.name))
+
+    @property
+    def dex_time(self) -> float:
+        return sum(task.duration for task in self.tasks if DEX_TASK.search(task.name))
+
+    def slowest_tasks(self, limit: int = 10) -> List[GradleTask]:
+        return sorted(self.tasks, key=lambda task: task.duration, reverse=True)[:limit]
+
+    def to_build_profile(self) -> BuildProfile:
+        """Phase timings for DeploymentMonitor.record_build_profile"""
+        profile = BuildProfile(build_id=self.build_id, total_duration=self.total_duration)
+        for label, attribute in PROFILE_SUMMARY_FIELDS[1:]:
+            value = getattr(self, attribute)
+            if value is not None:
+                profile.timings.append(PhaseTiming(phase=label, duration=value, project="android",
+                                                   source=self.source + SUMMARY_SOURCE_SUFFIX))
+        for task in self.tasks:
+            profile.timings.append(PhaseTiming(
+                phase=task.name, duration=task.duration, target=task.project,
+                project="android", source=self.source, outcome=task.outcome
+            ))
+        return profile
+
+
+def parse_gradle_duration(text: str) -> Optional[float]:
+    """'1m12.34s', '2m 13s', '845ms', '1h 2m 3s' -> seconds"""
+    parts = re.findall(r"(\d+(?:\.\d+)?)\s*(ms|d|h|m|s)", text)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400}
+    return sum(float(value) * scale[unit] for value, unit in parts)
+
+
+class _ProfileReportParser(HTMLParser):
+    """Collects table rows under each <h1>/<h2> heading of a --profile report"""
+
+    def __init__(self):
+        super().__init__()
+        self.sections: Dict[str, List[List[str]]] = {}
+        self.headings: List[str] = []
+        self._heading: Optional[List[str]] = None
+        self._row: Optional[List[str]] = None
+        self._cell: Optional[List[str]] = None
+        self._section = ""
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("h1", "h2"):
+            self._heading = []
+        elif tag == "tr":
+            self._row = []
+        elif tag == "td" and self._row is not None:
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if tag in ("h1", "h2") and self._heading is not None:
+            heading = " ".join("".join(self._heading).split())
+            self.headings.append(heading)
+            if tag == "h2":
+                self._section = heading.lower()
+            self._heading = None
+        elif tag == "td" and self._cell is not None and self._row is not None:
+            self._row.append(" ".join("".join(self._cell).split()))
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            if self._row:
+                self.sections.setdefault(self._section, []).append(self._row)
+            self._row = None
+
+    def handle_data(self, data):
+        if self._heading is not None:
+            self._heading.append(data)
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+class GradleBuildAnalyzer:
+    """Parses Gradle --profile reports, console logs and problems reports"""
+
+    def parse_profile_report(self, path: str, build_id: str) -> GradleBuildReport:
+        """build/reports/profile/profile-*.html from `gradle --profile`"""
+        parser = _ProfileReportParser()
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            parser.feed(f.read())
+        parser.close()
+
+        report = GradleBuildReport(build_id=build_id, source=SOURCE_GRADLE_PROFILE)
+        for heading in parser.headings:
+            if heading.lower().startswith("profiled build:"):
+                report.requested_tasks = heading.split(":", 1)[1].strip()
+
+        for row in parser.sections.get("summary", []):
+            attribute = SUMMARY_ROWS.get(row[0].lower()) if len(row) >= 2 else None
+            if attribute:
+                setattr(report, attribute, parse_gradle_duration(row[1]))
+
+        for row in parser.sections.get("configuration", []):
+            if len(row) >= 2 and row[0].startswith(":"):
+                report.project_configuration[row[0]] = parse_gradle_duration(row[1]) or 0.0
+
+        for row in parser.sections.get("task execution", []):
+            # Per-project "(total)" rows are followed by that project's tasks
+            if len(row) < 3 or row[2] == "(total)" or row[0].count(":") < 1:
+                continue
+            outcome = PROFILE_OUTCOMES.get(row[2].lower(), row[2].upper())
+            report.tasks.append(GradleTask(row[0], outcome, parse_gradle_duration(row[1]) or 0.0))
+
+        return report
+
+    def parse_log(self, path: str, build_id: str) -> GradleBuildReport:
+        """Gradle console output (--console=plain), .gz or "-" for stdin"""
+        if path == "-":
+            return self.parse_log_lines(sys.stdin, build_id)
+        with open_log(path) as f:
+            return self.parse_log_lines(f, build_id)
+
+    def parse_log_lines(self, lines: Iterable[str], build_id: str) -> GradleBuildReport:
+        """Stream a console log once.
+
+        Gradle prints "> Task" headers when a task completes, so with
+        timestamped CI logs the gap before a header is charged to that task,
+        and the gap before the first task to configuration.
+        """
+        report = GradleBuildReport(build_id=build_id)
+        first_ts = last_ts = None
+        configuring = False
+
+        for raw in lines:
+            ts, line = parse_timestamp(raw.rstrip("\r\n"))
+            if ts is not None and first_ts is None:
+                first_ts = last_ts = ts
+
+            task = TASK_LINE.match(line)
+            if task:
+                elapsed = max(0.0, ts - last_ts) if ts is not None and last_ts is not None else 0.0
+                if configuring:
+                    report.configuration_time = (report.configuration_time or 0.0) + elapsed
+                    elapsed = 0.0
+                    configuring = False
+                report.tasks.append(GradleTask(task.group("path"), task.group("outcome") or EXECUTED, elapsed))
+                if ts is not None:
+                    last_ts = ts
+                continue
+
+            if CONFIGURE_LINE.match(line):
+                configuring = True
+                continue
+
+            actionable = ACTIONABLE_LINE.match(line)
+            if actionable:
+                for part in actionable.group("counts").split(","):
+                    count, _, outcome = part.strip().partition(" ")
+                    if outcome in ACTIONABLE_OUTCOMES and count.isdigit():
+                        report.actionable_counts[ACTIONABLE_OUTCOMES[outcome]] = int(count)
+                continue
+
+            result = RESULT_LINE.match(line)
+            if result:
+                report.status = "success" if result.group("status") == "SUCCESSFUL" else "failed"
+                report.total_duration = parse_gradle_duration(result.group("duration"))
+
+        if first_ts is not None:
+            report.source = SOURCE_GRADLE_LOG
+            if report.tasks:
+                report.task_execution_time = sum(task.duration for task in report.tasks)
+        return report
+
+    def parse_problems_report(self, path: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Problems and report metadata embedded in build/reports/problems/problems-report.html"""
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            content = f.read()
+        match = re.search(r"// begin-report-data\s*(.*?)\s*// end-report-data", content, re.DOTALL)
+        if not match:
+            return [], {}
+        data = json.loads(match.group(1))
+        problems = [
+            {
+                "severity": diagnostic.get("severity"),
+                "message": diagnostic.get("contextualLabel")
+                           or " ".join(part.get("text", "") for part in diagnostic.get("problem", [])),
+                "category": next((p.get("name") for p in diagnostic.get("problemId", [])), None),
+                "documentation": diagnostic.get("documentationLink")
+            }
+            for diagnostic in data.get("diagnostics", [])
+        ]
+        return problems, data.get("problemsReport", {})
+
+    def analyze(self, build_id: str, profile_path: Optional[str] = None, log_path: Optional[str] = None,
+                problems_path: Optional[str] = None) -> GradleBuildReport:
+        """Combine whatever reports exist; profile timings win over log timings"""
+        if not profile_path and not log_path and not problems_path:
+            raise ValueError("No Gradle profile report, build log or problems report given")
+
+        report = GradleBuildReport(build_id=build_id)
+        if log_path:
+            report = self.parse_log(log_path, build_id)
+        if profile_path:
+            profiled = self.parse_profile_report(profile_path, build_id)
+            profiled.status = report.status
+            profiled.actionable_counts = report.actionable_counts
+            # The log names FROM-CACHE/NO-SOURCE outcomes the profile may not distinguish
+            logged = {task.path: task.outcome for task in report.tasks}
+            for task in profiled.tasks:
+                task.outcome = logged.get(task.path, task.outcome)
+            if profiled.total_duration is None:
+                profiled.total_duration = report.total_duration
+            report = profiled
+        if problems_path:
+            report.problems, metadata = self.parse_problems_report(problems_path)
+            report.requested_tasks = report.requested_tasks or metadata.get("requestedTasks")
+        return report
+
+
+def find_reports(project_dir: str) -> Dict[str, Optional[str]]:
+    """Newest --profile report and the problems report under an android/ project"""
+    profiles = glob.glob(os.path.join(project_dir, "build", "reports", "profile", "profile-*.html"))
+    problems = os.path.join(project_dir, "build", "reports", "problems", "problems-report.html")
+    return {
+        "profile": max(profiles, key=os.path.getmtime) if profiles else None,
+        "problems": problems if os.path.exists(problems) else None
+    }
+
+
+def format_report(report: GradleBuildReport, limit: int = 10) -> str:
+    """Human-readable build summary"""
+    def seconds(value: Optional[float]) -> str:
+        return f"{value:.1f}s" if value is not None else "n/a"
+
+    counts = report.outcome_counts()
+    lines = [
+        f"🤖 Android build {report.build_id} ({report.requested_tasks or 'tasks unknown'}, "
+        f"{report.status or 'status unknown'})",
+        f"   Total: {seconds(report.total_duration)}  Configuration: {seconds(report.configuration_time)}  "
+        f"Task execution: {seconds(report.task_execution_time)}",
+        f"   Tasks: {len(report.tasks)} ({', '.join(f'{n} {o.lower()}' for o, n in sorted(counts.items()))})",
+        f"   Up-to-date rate: {report.up_to_date_rate:.1%}  Cache hit rate: {report.cache_hit_rate:.1%}",
+        f"   R8: {report.r8_time:.1f}s  Dex: {report.dex_time:.1f}s"
+    ]
+    if report.source != SOURCE_GRADLE_TASKS:
+        lines.append("\n🐢 Slowest tasks:")
+        for task in report.slowest_tasks(limit):
+            lines.append(f"   {task.duration:8.1f}s  {task.outcome:<10}  {task.path}")
+    if report.problems:
+        lines.append(f"\n⚠️  {len(report.problems)} Gradle problem(s):")
+        for problem in report.problems[:limit]:
+            lines.append(f"   [{problem['severity']}] {problem['message']}")
+    return "\n".join(lines)
+
+
+def main():
+    """Analyze the Android Gradle build and record it with the iOS build metrics"""
+    import argparse
+    from deployment_monitor import DeploymentMonitor, BuildMetrics
+
+    parser = argparse.ArgumentParser(description="Analyze Gradle --profile reports and build logs")
+    parser.add_argument("--project", default="android", help="Android project dir to search for reports")
+    parser.add_argument("--profile", help="Gradle --profile HTML report (default: newest under --project)")
+    parser.add_argument("--log", help="Gradle console log (.gz supported, - for stdin)")
+    parser.add_argument("--problems", help="problems-report.html (default: under --project)")
+    parser.add_argument("--build-id", default=f"android_{time.strftime('%Y%m%d_%H%M%S')}")
+    parser.add_argument("--db", default="deployment_metrics.db", help="Deployment metrics database")
+    parser.add_argument("--no-record", action="store_true", help="Only print the report")
+    args = parser.parse_args()
+
+    found = find_reports(args.project)
+    analyzer = GradleBuildAnalyzer()
+    report = analyzer.analyze(args.build_id, profile_path=args.profile or found["profile"], log_path=args.log,
+                              problems_path=args.problems or found["problems"])
+    print(format_report(report))
+    if args.no_record:
+        return
+
+    monitor = DeploymentMonitor(args.db)
+    if report.status and report.total_duration is not None:
+        monitor.record_build_metric(BuildMetrics(
+            timestamp=time.time(), build_id=report.build_id, status=report.status,
+            duration=report.total_duration, error_type="gradle" if report.status == "failed" else None,
+            error_message=None, fixer_applied=None, fix_success=None
+        ))
+    monitor.record_build_profile(report.to_build_profile())
+    print(f"\n💾 Recorded Android build {report.build_id}")
+
+    regressions = [r for r in monitor.detect_phase_regressions(report.build_id) if r["regressed"]]
+    for regression in regressions:
+        print(f"🐢 {regression['key']} ({regression['source']}): {regression['baseline']:.1f}s -> "
+              f"{regression['current']:.1f}s (+{regression['delta']:.1f}s, {regression['change']:+.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Live Build Monitor
+Surfaces deployment issues while `flutter build ipa` / xcodebuild is still running
+"""
+
+import os
+import sys
+import time
+import codecs
+import signal
+import asyncio
+import argparse
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+from build_log_analyzer import LogAnalysis, LogMatch
+from xcode_deploy_bot import XCodeDeployBot, DeploymentIssue, Severity
+
+READ_SIZE = 64 * 1024
+FOLLOW_POLL_INTERVAL = 0.5
+KILL_TIMEOUT = 10.0
+
+DEFAULT_BUILD_COMMAND = ["flutter", "build", "ipa", "--release"]
+
+@dataclass
+class LiveBuildResult:
+    """Outcome of a watched build or followed log"""
+    source: str
+    issues: List[DeploymentIssue]
+    analysis: LogAnalysis
+    return_code: Optional[int] = None
+    aborted: bool = False
+    abort_issue: Optional[DeploymentIssue] = None
+    duration: float = 0.0
+
+
+class LiveBuildMonitor:
+    """Feeds build output through the bot's log analyzer as it is produced.
+
+    Each knowledge-base pattern is reported once, as a DeploymentIssue, on
+    its first occurrence; later occurrences only update the issue's count.
+    With ``abort_on_fatal`` the build is stopped at the first fatal issue
+    (by default every CRITICAL pattern) instead of running to its end.
+    """
+
+    def __init__(self, bot: Optional[XCodeDeployBot] = None, abort_on_fatal: bool = False,
+                 fatal_patterns: Optional[Sequence[str]] = None,
+                 on_issue: Optional[Callable[[DeploymentIssue, LogMatch], None]] = None,
+                 echo: bool = True, log_path: Optional[str] = None):
+        self.bot = bot or XCodeDeployBot()
+        self.abort_on_fatal = abort_on_fatal
+        error_patterns = self.bot.knowledge_base["error_patterns"]
+        if fatal_patterns is None:
+            fatal_patterns = [pattern for pattern, info in error_patterns.items()
+                              if info["severity"] == Severity.CRITICAL]
+        unknown = [pattern for pattern in fatal_patterns if pattern not in error_patterns]
+        if unknown:
+            raise ValueError(f"Unknown fatal patterns: {', '.join(unknown)}")
+        self.fatal_patterns = set(fatal_patterns)
+        self.on_issue = on_issue
+        self.echo = echo
+        self.log_path = log_path
+
+    async def run_command(self, command: Sequence[str] = DEFAULT_BUILD_COMMAND,
+                          cwd: Optional[str] = None) -> LiveBuildResult:
+        """Launch a build and watch its combined stdout/stderr"""
+        print(f"🚀 Launching {' '.join(command)} with live issue detection...")
+        # Own process group, so an abort also stops xcodebuild under flutter
+        process = await asyncio.create_subprocess_exec(
+            *command, cwd=cwd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+            start_new_session=(os.name == "posix")
+        )
+        watch = _Watch(self, " ".join(command))
+
+        try:
+            while True:
+                data = await process.stdout.read(READ_SIZE)
+                if not data:
+                    break
+                if watch.feed(data):
+                    await self._terminate(process)
+                    break
+            watch.result.return_code = await process.wait()
+        except BaseException:
+            if process.returncode is None:
+                await self._terminate(process)
+            raise
+        finally:
+            watch.close()
+
+        return watch.finish()
+
+    async def follow_file(self, path: str, from_start: bool = True,
+                          idle_timeout: Optional[float] = None,
+                          poll_interval: float = FOLLOW_POLL_INTERVAL) -> LiveBuildResult:
+        """Follow a growing log file, like tail -f.
+
+        Waits for the file to appear, reopens it if it is truncated or
+        replaced, and stops after ``idle_timeout`` seconds without new
+        output or at the first fatal issue when aborting is enabled.
+        """
+        print(f"👀 Following {path} with live issue detection...")
+        watch = _Watch(self, path)
+        f = None
+        position = 0
+        last_data = time.monotonic()
+
+        try:
+            while True:
+                if f is None and os.path.exists(path):
+                    f = open(path, 'rb')
+                    if not from_start:
+                        f.seek(0, os.SEEK_END)
+                    position = f.tell()
+                    from_start = True  # a rotated log is read from its start
+
+                data = f.read(READ_SIZE) if f is not None else b""
+                if data:
+                    position += len(data)
+                    last_data = time.monotonic()
+                    if watch.feed(data):
+                        break
+                    continue
+
+                if f is not None and _replaced(f, path, position):
+                    f.close()
+                    f = None
+                    continue
+                if idle_timeout is not None and time.monotonic() - last_data >= idle_timeout:
+                    break
+                await asyncio.sleep(poll_interval)
+        finally:
+            if f is not None:
+                f.close()
+            watch.close()
+
+        return watch.finish()
+
+    async def _terminate(self, process: asyncio.subprocess.Process):
+        """SIGTERM the build's process group, then SIGKILL it if it lingers"""
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                if os.name == "posix":
+                    os.killpg(process.pid, sig)
+                elif sig == signal.SIGTERM:
+                    process.terminate()
+                else:
+                    process.kill()
+            except ProcessLookupError:
+                return
+            try:
+                await asyncio.wait_for(process.wait(), KILL_TIMEOUT)
+                return
+            except asyncio.TimeoutError:
+                continue
+
+
+class _Watch:
+    """Per-run state shared by run_command and follow_file"""
+
+    def __init__(self, monitor: LiveBuildMonitor, source: str):
+        self.monitor = monitor
+        self.scanner = monitor.bot.log_analyzer.scanner(source)
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.issues: Dict[str, DeploymentIssue] = {}
+        self.result = LiveBuildResult(source=source, issues=[], analysis=self.scanner.analysis)
+        self.started = time.monotonic()
+        self.log = open(monitor.log_path, 'w', encoding='utf-8') if monitor.log_path else None
+
+    def feed(self, data: bytes) -> bool:
+        """Scan a block of output; returns True if the build should be aborted"""
+        text = self.decoder.decode(data)
+        if self.monitor.echo:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+        if self.log:
+            self.log.write(text)
+        return self._handle(self.scanner.feed(text))
+
+    def _handle(self, matches: List[LogMatch]) -> bool:
+        abort = False
+        for match in matches:
+            issue = self.issues.get(match.pattern)
+            if issue is None:
+                issue = self.monitor.bot.issue_for_pattern(
+                    match.pattern, occurrences=self.scanner.analysis.matches[match.pattern]
+                )
+                self.issues[match.pattern] = issue
+                self.result.issues.append(issue)
+                print(f"\n⚠️  [line {match.line_number}] {issue.severity.value.upper()}: {issue.error_message}")
+                print(f"    > {match.line}")
+                if self.monitor.on_issue:
+                    self.monitor.on_issue(issue, match)
+            issue.occurrence_count = self.scanner.analysis.counts[match.pattern]
+
+            if (self.monitor.abort_on_fatal and match.pattern in self.monitor.fatal_patterns
+                    and not self.result.aborted):
+                self.result.aborted = True
+                self.result.abort_issue = issue
+                print(f"🛑 Fatal issue detected, aborting: {issue.error_message}")
+                abort = True
+        return abort
+
+    def close(self):
+        if self.log:
+            self.log.close()
+            self.log = None
+
+    def finish(self) -> LiveBuildResult:
+        if not self.result.aborted:
+            self._handle(self.scanner.feed(self.decoder.decode(b"", final=True)))
+            self._handle(self.scanner.flush())
+        self.scanner.finish()
+        for pattern, issue in self.issues.items():
+            issue.occurrence_count = self.scanner.analysis.counts[pattern]
+        self.result.duration = time.monotonic() - self.started
+        return self.result
+
+
+def _replaced(f, path: str, position: int) -> bool:
+    """True if the followed file was truncated, rotated or deleted"""
+    try:
+        current = os.stat(path)
+    except FileNotFoundError:
+        return False  # keep reading the old handle until a new file appears
+    opened = os.fstat(f.fileno())
+    return (current.st_ino, current.st_dev) != (opened.st_ino, opened.st_dev) or current.st_size < position
+
+
+def main():
+    """Watch a build (default: flutter build ipa) or follow a log file"""
+    parser = argparse.ArgumentParser(description="Surface iOS deployment issues while a build runs")
+    parser.add_argument("command", nargs=argparse.REMAINDER,
+                        help="Build command to launch (default: flutter build ipa --release)")
+    parser.add_argument("--follow", help="Follow an existing log file instead of launching a build")
+    parser.add_argument("--from-end", action="store_true", help="With --follow, skip existing content")
+    parser.add_argument("--idle-timeout", type=float, default=300.0,
+                        help="With --follow, stop after this many seconds without output")
+    parser.add_argument("--abort-on-fatal", action="store_true", help="Stop the build at the first fatal issue")
+    parser.add_argument("--fatal", action="append", help="Fatal pattern (repeatable; default: critical patterns)")
+    parser.add_argument("--log", help="Also write the build output to this file")
+    parser.add_argument("--quiet", action="store_true", help="Do not echo build output")
+    parser.add_argument("--cwd", help="Working directory for the build command")
+    args = parser.parse_args()
+
+    command = [part for part in args.command if part != "--"] or DEFAULT_BUILD_COMMAND
+    monitor = LiveBuildMonitor(abort_on_fatal=args.abort_on_fatal, fatal_patterns=args.fatal,
+                               echo=not args.quiet, log_path=args.log)
+
+    try:
+        if args.follow:
+            result = asyncio.run(monitor.follow_file(args.follow, from_start=not args.from_end,
+                                                     idle_timeout=args.idle_timeout))
+        else:
+            result = asyncio.run(monitor.run_command(command, cwd=args.cwd))
+    except FileNotFoundError as e:
+        print(f"❌ Could not launch build: {e}")
+        sys.exit(127)
+
+    print(f"\n📊 {result.analysis.lines_scanned:,} lines in {result.duration:.1f}s, "
+          f"{len(result.issues)} issue type(s) detected")
+    for issue in result.issues:
+        print(f"   • {issue.error_message} ({issue.occurrence_count}x)")
+    if result.issues:
+        print("\n🎯 Next Steps:")
+        for step in monitor.bot.provide_next_steps(result.issues):
+            print(f"   {step}")
+
+    if result.aborted:
+        sys.exit(2)
+    sys.exit(result.return_code or 0)
+
+
+if __name__ == "__main__":
+    main()
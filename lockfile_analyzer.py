@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+"""
+Lockfile Analyzer
+Dependency graph of pubspec.lock and Podfile.lock, with native pods attributed to Flutter plugins
+"""
+
+import os
+import re
+import json
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# Pods every plugin depends on; they ship with the engine, not with the plugin
+FLUTTER_PODS = {"Flutter", "FlutterMacOS"}
+
+DIRECT_DEPENDENCIES = ("direct main", "direct overridden")
+
+# Compiled arm64 code is a fraction of its source size; only used for pods
+# that are built from source, to rank them against vendored binaries
+SOURCE_BINARY_RATIO = 0.25
+SOURCE_EXTENSIONS = (".m", ".mm", ".c", ".cc", ".cpp", ".swift")
+OBJC_EXTENSIONS = (".m", ".mm")
+
+# Bundled into the .app next to the binary: ML models, images, strings
+RESOURCE_DIRECTORIES = ("Resources",)
+RESOURCE_SUFFIXES = (".bundle",)
+
+# Pods declared in the Podfile itself rather than by a plugin
+PODFILE_OWNER = "(Podfile)"
+
+# +load methods and static constructors run before main()
+LOAD_METHOD = re.compile(rb"^\s*\+\s*\(\s*void\s*\)\s*load\b|__attribute__\s*\(\(\s*constructor", re.M)
+POD_ENTRY = re.compile(r"^(?P<name>\S+)(?:\s+\((?P<version>[^)]*)\))?$")
+PLUGIN_PATH = re.compile(r"\.symlinks/plugins/(?P<package>[^/]+)/")
+
+MH_DYLIB = 6
+RANK_KEYS = ("size", "pods", "weight", "startup")
+
+@dataclass
+class DartPackage:
+    """One package from pubspec.lock"""
+    name: str
+    version: str
+    dependency: str          # "direct main", "direct dev", "direct overridden" or "transitive"
+    source: str = "hosted"
+    dependencies: List[str] = field(default_factory=list)
+
+    @property
+    def direct(self) -> bool:
+        return self.dependency in DIRECT_DEPENDENCIES
+
+@dataclass
+class Pod:
+    """One pod from Podfile.lock; subspecs are folded into their root pod"""
+    name: str
+    version: str
+    dependencies: List[str] = field(default_factory=list)
+    external_path: Optional[str] = None
+    plugin: Optional[str] = None       # Dart package that vends this pod
+
+@dataclass
+class PodFootprint:
+    """Estimated contribution of one pod to the app binary and launch"""
+    binary_bytes: int = 0
+    resource_bytes: int = 0
+    dynamic_frameworks: int = 0
+    load_methods: int = 0
+    on_disk: bool = False
+
+    @property
+    def size_bytes(self) -> int:
+        return self.binary_bytes + self.resource_bytes
+
+@dataclass
+class PluginFootprint:
+    """Everything one direct dependency pulls into the app"""
+    package: str
+    version: str
+    dart_packages: List[str] = field(default_factory=list)
+    pods: List[str] = field(default_factory=list)
+    exclusive_pods: List[str] = field(default_factory=list)
+    size_bytes: int = 0                # binaries plus bundled resources
+    exclusive_size_bytes: int = 0      # what removing this dependency would save
+    dynamic_frameworks: int = 0
+    load_methods: int = 0
+
+    @property
+    def weight(self) -> int:
+        return len(self.dart_packages)
+
+    def sort_key(self, by: str):
+        if by == "pods":
+            return (len(self.pods), self.size_bytes)
+        if by == "weight":
+            return (self.weight, len(self.pods))
+        if by == "startup":
+            return (self.dynamic_frameworks, self.load_methods, self.size_bytes)
+        return (self.exclusive_size_bytes, self.size_bytes)
+
+@dataclass
+class LockfileGraph:
+    """Resolved Dart and CocoaPods dependency graphs of one project state"""
+    packages: Dict[str, DartPackage] = field(default_factory=dict)
+    pods: Dict[str, Pod] = field(default_factory=dict)
+    resolved_packages: int = 0      # packages whose edges came from their pubspec.yaml
+    inferred_edges: int = 0         # edges guessed from federated plugin naming
+
+    def plugin_pods(self) -> Dict[str, str]:
+        """Dart package -> pod it vends"""
+        return {pod.plugin: pod.name for pod in self.pods.values() if pod.plugin}
+
+    def dart_closure(self, name: str) -> List[str]:
+        return _closure([name], lambda n: self.packages[n].dependencies if n in self.packages else [])
+
+    def pod_closure(self, names: Iterable[str]) -> List[str]:
+        return [pod for pod in _closure(names, lambda n: self.pods[n].dependencies if n in self.pods else [])
+                if pod not in FLUTTER_PODS]
+
+@dataclass
+class LockfileDiff:
+    """Changes between two lockfile graphs"""
+    packages_added: List[Tuple[str, str]] = field(default_factory=list)
+    packages_removed: List[Tuple[str, str]] = field(default_factory=list)
+    packages_changed: List[Tuple[str, str, str]] = field(default_factory=list)
+    pods_added: List[Tuple[str, str]] = field(default_factory=list)
+    pods_removed: List[Tuple[str, str]] = field(default_factory=list)
+    pods_changed: List[Tuple[str, str, str]] = field(default_factory=list)
+    # direct dependency -> (old pod count, new pod count), only where it changed
+    plugin_pod_counts: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+
+
+def _closure(roots: Iterable[str], edges) -> List[str]:
+    seen: Dict[str, None] = {}
+    queue = deque(roots)
+    while queue:
+        name = queue.popleft()
+        if name in seen:
+            continue
+        seen[name] = None
+        queue.extend(edges(name))
+    return list(seen)
+
+
+def _load_yaml(path: str):
+    if yaml is None:
+        raise ValueError("PyYAML is required to read lockfiles: pip install pyyaml")
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=loader) or {}
+
+
+def parse_pubspec_lock(path: str) -> Dict[str, DartPackage]:
+    """Packages from pubspec.lock; edges are filled in by LockfileAnalyzer"""
+    data = _load_yaml(path)
+    return {
+        name: DartPackage(name=name, version=str(info.get("version", "")),
+                          dependency=info.get("dependency", "transitive"), source=info.get("source", "hosted"))
+        for name, info in (data.get("packages") or {}).items()
+    }
+
+
+def _pod_name(entry: str) -> Tuple[str, str]:
+    match = POD_ENTRY.match(entry.strip())
+    name, version = (match.group("name"), match.group("version") or "") if match else (entry.strip(), "")
+    return name.split("/")[0], version
+
+
+def parse_podfile_lock(path: str) -> Dict[str, Pod]:
+    """Pods from Podfile.lock, keyed by root pod name"""
+    data = _load_yaml(path)
+    pods: Dict[str, Pod] = {}
+    for entry in data.get("PODS") or []:
+        if isinstance(entry, dict):
+            (spec, dependencies), = entry.items()
+        else:
+            spec, dependencies = entry, []
+        name, version = _pod_name(spec)
+        pod = pods.setdefault(name, Pod(name=name, version=version))
+        for dependency in dependencies or []:
+            dependency_name = _pod_name(dependency)[0]
+            if dependency_name != name and dependency_name not in pod.dependencies:
+                pod.dependencies.append(dependency_name)
+
+    for name, source in (data.get("EXTERNAL SOURCES") or {}).items():
+        pod = pods.get(name.split("/")[0])
+        if pod is None or not isinstance(source, dict):
+            continue
+        pod.external_path = source.get(":path")
+        match = PLUGIN_PATH.search((pod.external_path or "") + "/")
+        if match:
+            pod.plugin = match.group("package")
+    return pods
+
+
+def _tree_size(directory: str) -> int:
+    return sum(os.path.getsize(os.path.join(dirpath, name))
+               for dirpath, _, filenames in os.walk(directory) for name in filenames)
+
+
+def _macho_is_dylib(path: str) -> bool:
+    with open(path, 'rb') as f:
+        header = f.read(16)
+    if header[:4] in (b"\xcf\xfa\xed\xfe", b"\xce\xfa\xed\xfe"):
+        return int.from_bytes(header[12:16], "little") == MH_DYLIB
+    return False
+
+
+def _device_slice(xcframework: str) -> Optional[str]:
+    """The ios-arm64 slice of an .xcframework, not the simulator or Catalyst one"""
+    for name in sorted(os.listdir(xcframework)):
+        if name.startswith("ios-arm64") and "simulator" not in name and "maccatalyst" not in name:
+            return os.path.join(xcframework, name)
+    return None
+
+
+class LockfileAnalyzer:
+    """Builds the dependency graph of a Flutter project from its lockfiles.
+
+    pubspec.lock lists packages but not the edges between them; those are
+    read from each package's pubspec.yaml, located through
+    .dart_tool/package_config.json or the pub cache. Packages that are not
+    on disk get an edge from the package their name extends
+    (camera -> camera_avfoundation), the federated plugin convention.
+
+    package_config.json describes only the project's current resolution, so
+    with ``locked_versions_only`` hosted packages are read solely from the pub
+    cache entry for the version their lockfile names. That is how lockfiles
+    from other revisions are loaded; their path and git packages are then
+    left to the federated-plugin inference.
+    """
+
+    def __init__(self, project_path: str = ".", pub_cache: Optional[str] = None,
+                 locked_versions_only: bool = False):
+        self.project_path = project_path
+        self.locked_versions_only = locked_versions_only
+        self.ios_path = os.path.join(project_path, "ios")
+        self.pub_cache = pub_cache or os.environ.get("PUB_CACHE") or os.path.expanduser("~/.pub-cache")
+        self._package_roots: Optional[Dict[str, str]] = None
+        self._pod_footprints: Dict[str, PodFootprint] = {}
+
+    def load(self, pubspec_lock: Optional[str] = None, podfile_lock: Optional[str] = None) -> LockfileGraph:
+        """Graph of the project's lockfiles, or of the given lockfile paths"""
+        pubspec_lock = pubspec_lock or os.path.join(self.project_path, "pubspec.lock")
+        podfile_lock = podfile_lock or os.path.join(self.ios_path, "Podfile.lock")
+        graph = LockfileGraph(packages=parse_pubspec_lock(pubspec_lock))
+        if os.path.exists(podfile_lock):
+            graph.pods = parse_podfile_lock(podfile_lock)
+        self._resolve_edges(graph)
+        return graph
+
+    def _package_root(self, package: DartPackage) -> Optional[str]:
+        if self.locked_versions_only:
+            return self._pub_cache_root(package)
+        if self._package_roots is None:
+            self._package_roots = {}
+            config_path = os.path.join(self.project_path, ".dart_tool", "package_config.json")
+            try:
+                with open(config_path, 'r') as f:
+                    config = json.load(f)
+                for entry in config.get("packages", []):
+                    uri = urlparse(entry.get("rootUri", ""))
+                    root = unquote(uri.path) if uri.scheme == "file" else \
+                        os.path.normpath(os.path.join(os.path.dirname(config_path), unquote(uri.path)))
+                    self._package_roots[entry["name"]] = root
+            except (OSError, ValueError, KeyError):
+                pass
+
+        return self._package_roots.get(package.name) or self._pub_cache_root(package)
+
+    def _pub_cache_root(self, package: DartPackage) -> Optional[str]:
+        if package.source != "hosted":
+            return None
+        return os.path.join(self.pub_cache, "hosted", "pub.dev", f"{package.name}-{package.version}")
+
+    def _resolve_edges(self, graph: LockfileGraph):
+        for package in graph.packages.values():
+            root = self._package_root(package)
+            pubspec_path = os.path.join(root, "pubspec.yaml") if root else None
+            if not pubspec_path or not os.path.exists(pubspec_path):
+                continue
+            try:
+                pubspec = _load_yaml(pubspec_path)
+            except (OSError, yaml.YAMLError):
+                continue
+            package.dependencies = [name for name in (pubspec.get("dependencies") or {}) if name in graph.packages]
+            graph.resolved_packages += 1
+
+        # Federated plugins: camera_avfoundation belongs to camera
+        reached = {dependency for package in graph.packages.values() for dependency in package.dependencies}
+        for name, package in graph.packages.items():
+            if package.direct or name in reached:
+                continue
+            parts = name.split("_")
+            for end in range(len(parts) - 1, 0, -1):
+                parent = graph.packages.get("_".join(parts[:end]))
+                if parent is not None:
+                    parent.dependencies.append(name)
+                    graph.inferred_edges += 1
+                    break
+
+    def pod_footprint(self, pod: Pod) -> PodFootprint:
+        """Binary size and launch-time estimate for one pod, from its files under ios/"""
+        if pod.name in self._pod_footprints:
+            return self._pod_footprints[pod.name]
+
+        directory = os.path.join(self.ios_path, pod.external_path) if pod.external_path \
+            else os.path.join(self.ios_path, "Pods", pod.name)
+        footprint = PodFootprint(on_disk=os.path.isdir(directory))
+        source_bytes = 0
+
+        for dirpath, dirnames, filenames in os.walk(directory):
+            for dirname in list(dirnames):
+                path = os.path.join(dirpath, dirname)
+                if dirname in RESOURCE_DIRECTORIES or dirname.endswith(RESOURCE_SUFFIXES):
+                    dirnames.remove(dirname)
+                    footprint.resource_bytes += _tree_size(path)
+                elif dirname.endswith(".xcframework"):
+                    dirnames.remove(dirname)
+                    device = _device_slice(path)
+                    if device:
+                        self._add_vendored(footprint, device)
+                elif dirname.endswith(".framework"):
+                    dirnames.remove(dirname)
+                    self._add_vendored(footprint, dirpath, [dirname])
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if filename.endswith(".a"):
+                    footprint.binary_bytes += os.path.getsize(path)
+                elif filename.endswith(SOURCE_EXTENSIONS):
+                    source_bytes += os.path.getsize(path)
+                    if filename.endswith(OBJC_EXTENSIONS):
+                        with open(path, 'rb') as f:
+                            footprint.load_methods += len(LOAD_METHOD.findall(f.read()))
+
+        footprint.binary_bytes += int(source_bytes * SOURCE_BINARY_RATIO)
+        self._pod_footprints[pod.name] = footprint
+        return footprint
+
+    def _add_vendored(self, footprint: PodFootprint, directory: str, names: Optional[List[str]] = None):
+        for name in names if names is not None else os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith(".framework"):
+                binary = os.path.join(path, name[:-len(".framework")])
+                if os.path.isfile(binary):
+                    footprint.binary_bytes += os.path.getsize(binary)
+                    footprint.dynamic_frameworks += _macho_is_dylib(binary)
+            elif name.endswith(".a"):
+                footprint.binary_bytes += os.path.getsize(path)
+
+    def footprints(self, graph: LockfileGraph, sizes: bool = True) -> List[PluginFootprint]:
+        """What each direct dependency pulls in, including pods shared with others.
+        
+        Pods no plugin reaches were added by the Podfile itself and are
+        reported under PODFILE_OWNER.
+        """
+        plugin_pods = graph.plugin_pods()
+        results = []
+        for package in graph.packages.values():
+            if not package.direct:
+                continue
+            dart_packages = graph.dart_closure(package.name)
+            vended = [plugin_pods[name] for name in dart_packages if name in plugin_pods]
+            results.append(PluginFootprint(package=package.name, version=package.version,
+                                           dart_packages=dart_packages, pods=graph.pod_closure(vended)))
+
+        attributed = {pod for result in results for pod in result.pods}
+        unattributed = [name for name, pod in graph.pods.items()
+                        if name not in attributed and name not in FLUTTER_PODS and not pod.plugin]
+        if unattributed:
+            results.append(PluginFootprint(package=PODFILE_OWNER, version="", pods=graph.pod_closure(unattributed)))
+
+        owners: Dict[str, int] = {}
+        for result in results:
+            for pod in result.pods:
+                owners[pod] = owners.get(pod, 0) + 1
+
+        for result in results:
+            result.exclusive_pods = [pod for pod in result.pods if owners[pod] == 1]
+            if not sizes:
+                continue
+            for pod in result.pods:
+                footprint = self.pod_footprint(graph.pods[pod])
+                result.size_bytes += footprint.size_bytes
+                result.dynamic_frameworks += footprint.dynamic_frameworks
+                result.load_methods += footprint.load_methods
+                if owners[pod] == 1:
+                    result.exclusive_size_bytes += footprint.size_bytes
+        return results
+
+    def rank(self, graph: LockfileGraph, by: str = "size", sizes: bool = True) -> List[PluginFootprint]:
+        """Direct dependencies, heaviest first"""
+        if by not in RANK_KEYS:
+            raise ValueError(f"Unknown ranking {by!r}; expected one of {', '.join(RANK_KEYS)}")
+        return sorted(self.footprints(graph, sizes=sizes or by in ("size", "startup")),
+                      key=lambda footprint: footprint.sort_key(by), reverse=True)
+
+
+def _versions_diff(old: Dict[str, str], new: Dict[str, str]):
+    added = sorted((name, new[name]) for name in new.keys() - old.keys())
+    removed = sorted((name, old[name]) for name in old.keys() - new.keys())
+    changed = sorted((name, old[name], new[name]) for name in old.keys() & new.keys() if old[name] != new[name])
+    return added, removed, changed
+
+
+def diff_graphs(old: LockfileGraph, new: LockfileGraph) -> LockfileDiff:
+    """Packages and pods added, removed or re-versioned between two graphs"""
+    diff = LockfileDiff()
+    diff.packages_added, diff.packages_removed, diff.packages_changed = _versions_diff(
+        {name: package.version for name, package in old.packages.items()},
+        {name: package.version for name, package in new.packages.items()}
+    )
+    diff.pods_added, diff.pods_removed, diff.pods_changed = _versions_diff(
+        {name: pod.version for name, pod in old.pods.items()},
+        {name: pod.version for name, pod in new.pods.items()}
+    )
+
+    analyzer = LockfileAnalyzer()
+    old_counts = {f.package: len(f.pods) for f in analyzer.footprints(old, sizes=False)}
+    new_counts = {f.package: len(f.pods) for f in analyzer.footprints(new, sizes=False)}
+    for package in sorted(old_counts.keys() | new_counts.keys()):
+        counts = (old_counts.get(package, 0), new_counts.get(package, 0))
+        if counts[0] != counts[1]:
+            diff.plugin_pod_counts[package] = counts
+    return diff
+
+
+def _megabytes(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def format_ranking(graph: LockfileGraph, footprints: List[PluginFootprint], limit: int = 20) -> str:
+    direct = sum(1 for package in graph.packages.values() if package.direct)
+    lines = [f"📦 {len(graph.packages)} Dart packages ({direct} direct), {len(graph.pods)} pods, "
+             f"{len(graph.plugin_pods())} plugin pods",
+             f"   edges: {graph.resolved_packages} packages resolved from pubspec.yaml, "
+             f"{graph.inferred_edges} inferred from plugin naming",
+             "",
+             f"   {'package':32s} {'dart':>5s} {'pods':>5s} {'excl':>5s} {'size':>10s} {'exclusive':>10s} "
+             f"{'dylibs':>6s} {'+load':>5s}"]
+    for footprint in footprints[:limit]:
+        lines.append(f"   {footprint.package:32s} {footprint.weight:5d} {len(footprint.pods):5d} "
+                     f"{len(footprint.exclusive_pods):5d} {_megabytes(footprint.size_bytes):>10s} "
+                     f"{_megabytes(footprint.exclusive_size_bytes):>10s} {footprint.dynamic_frameworks:6d} "
+                     f"{footprint.load_methods:5d}")
+    return "\n".join(lines)
+
+
+def format_diff(diff: LockfileDiff) -> str:
+    lines = []
+    for title, added, removed, changed in (
+            ("Dart packages", diff.packages_added, diff.packages_removed, diff.packages_changed),
+            ("Pods", diff.pods_added, diff.pods_removed, diff.pods_changed)):
+        lines.append(f"📦 {title}: +{len(added)} -{len(removed)} ~{len(changed)}")
+        lines.extend(f"   + {name} {version}" for name, version in added)
+        lines.extend(f"   - {name} {version}" for name, version in removed)
+        lines.extend(f"   ~ {name} {old} -> {new}" for name, old, new in changed)
+    if diff.plugin_pod_counts:
+        lines.append("🔌 Native pods per direct dependency:")
+        lines.extend(f"   {package}: {old} -> {new}" for package, (old, new) in diff.plugin_pod_counts.items())
+    return "\n".join(lines)
+
+
+def main():
+    """Rank Flutter plugins by native footprint, or diff two lockfile sets"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="pubspec.lock / Podfile.lock dependency graph analyzer")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rank_parser = subparsers.add_parser("rank", help="Rank direct dependencies by what they pull in")
+    rank_parser.add_argument("project", nargs="?", default=".", help="Flutter project directory")
+    rank_parser.add_argument("--by", choices=RANK_KEYS, default="size")
+    rank_parser.add_argument("--limit", type=int, default=20)
+
+    diff_parser = subparsers.add_parser("diff", help="Compare two pubspec.lock files (and Podfile.lock files)")
+    diff_parser.add_argument("old_pubspec_lock")
+    diff_parser.add_argument("new_pubspec_lock")
+    diff_parser.add_argument("--old-podfile-lock")
+    diff_parser.add_argument("--new-podfile-lock")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "rank":
+            analyzer = LockfileAnalyzer(args.project)
+            graph = analyzer.load()
+            print(format_ranking(graph, analyzer.rank(graph, by=args.by), args.limit))
+        else:
+            # Each side's edges come from the pub cache at its own locked versions
+            analyzer = LockfileAnalyzer(locked_versions_only=True)
+            old = analyzer.load(args.old_pubspec_lock, args.old_podfile_lock or os.devnull)
+            new = analyzer.load(args.new_pubspec_lock, args.new_podfile_lock or os.devnull)
+            print(format_diff(diff_graphs(old, new)))
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Metrics Export
+Constant-memory NDJSON, CSV, JSON and Parquet writers for metric rows
+"""
+
+import io
+import os
+import csv
+import json
+import gzip
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+EXPORT_FORMATS = ("json", "ndjson", "csv", "parquet")
+EXPORT_COMPRESSIONS = (None, "gzip", "zstd")
+
+FORMAT_EXTENSIONS = {"json": "json", "ndjson": "ndjson", "csv": "csv", "parquet": "parquet"}
+COMPRESSION_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+# Simple column type names -> pyarrow types, resolved lazily
+ARROW_TYPES = {
+    "float": lambda: pyarrow.float64(),
+    "int": lambda: pyarrow.int64(),
+    "string": lambda: pyarrow.string(),
+    "bool": lambda: pyarrow.bool_()
+}
+
+
+def check_export_options(format: str, compression: Optional[str]):
+    """Raise ValueError for unsupported or unavailable format/compression combinations"""
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {format}")
+    if compression not in EXPORT_COMPRESSIONS:
+        raise ValueError(f"Unsupported export compression: {compression}")
+    if format == "parquet" and pyarrow is None:
+        raise ValueError("Parquet export requires pyarrow (pip install pyarrow)")
+    if compression == "zstd" and format != "parquet" and zstandard is None:
+        raise ValueError("zstd compression requires zstandard (pip install zstandard)")
+
+
+def export_filename(prefix: str, format: str, compression: Optional[str], stamp: str) -> str:
+    """e.g. deployment_metrics_20240101_120000.ndjson.gz; Parquet compresses internally"""
+    suffix = "" if format == "parquet" or compression is None else COMPRESSION_EXTENSIONS[compression]
+    return f"{prefix}_{stamp}.{FORMAT_EXTENSIONS[format]}{suffix}"
+
+
+def _open_text(path: str, compression: Optional[str]):
+    if compression == "gzip":
+        return gzip.open(path, 'wt', compresslevel=6, encoding='utf-8', newline='')
+    if compression == "zstd":
+        raw = open(path, 'wb')
+        return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(raw), encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def _convert_chunk(rows: List[Tuple], bool_indexes: List[int]) -> List[List[Any]]:
+    """SQLite stores booleans as 0/1; export them as real booleans"""
+    converted = []
+    for row in rows:
+        row = list(row)
+        for index in bool_indexes:
+            if row[index] is not None:
+                row[index] = bool(row[index])
+        converted.append(row)
+    return converted
+
+
+def write_rows(path: str, format: str, columns: Dict[str, str], chunks: Iterable[List[Tuple]],
+               compression: Optional[str] = None, header: Optional[Dict[str, Any]] = None,
+               header_key: str = "metrics") -> int:
+    """Stream row chunks to ``path`` and return the number of rows written.
+
+    ``columns`` maps column names to "float", "int", "string" or "bool".
+    Only one chunk is held in memory at a time. ``header`` is only used by
+    the json format, whose rows are nested under ``header_key``. The file is
+    written under a temporary name and renamed on success, so readers never
+    see a partial export.
+    """
+    check_export_options(format, compression)
+    names = list(columns)
+    bool_indexes = [index for index, kind in enumerate(columns.values()) if kind == "bool"]
+    tmp_path = f"{path}.tmp"
+    written = 0
+
+    try:
+        if format == "parquet":
+            schema = pyarrow.schema([(name, ARROW_TYPES[kind]()) for name, kind in columns.items()])
+            with pyarrow.parquet.ParquetWriter(tmp_path, schema, compression=compression or "snappy") as writer:
+                for chunk in chunks:
+                    rows = _convert_chunk(chunk, bool_indexes)
+                    arrays = [pyarrow.array([row[i] for row in rows], type=schema.field(i).type) for i in range(len(names))]
+                    writer.write_table(pyarrow.Table.from_arrays(arrays, schema=schema))
+                    written += len(rows)
+        else:
+            with _open_text(tmp_path, compression) as f:
+                if format == "csv":
+                    csv_writer = csv.writer(f)
+                    csv_writer.writerow(names)
+                    for chunk in chunks:
+                        csv_writer.writerows(_convert_chunk(chunk, bool_indexes))
+                        written += len(chunk)
+                elif format == "ndjson":
+                    for chunk in chunks:
+                        f.writelines(json.dumps(dict(zip(names, row))) + "\n" for row in _convert_chunk(chunk, bool_indexes))
+                        written += len(chunk)
+                else:
+                    # One JSON document, with rows streamed into its array
+                    f.write(json.dumps(header or {})[:-1])
+                    f.write(f'{", " if header else ""}"{header_key}": [')
+                    for chunk in chunks:
+                        for row in _convert_chunk(chunk, bool_indexes):
+                            f.write(("\n  " if not written else ",\n  ") + json.dumps(dict(zip(names, row))))
+                            written += 1
+                    f.write("\n]}\n")
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return written
@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Metrics Exporter
+OpenMetrics/Prometheus exposition of performance, crash and build metrics
+"""
+
+import os
+import json
+import math
+import time
+import sqlite3
+import asyncio
+import argparse
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from columnar_metric_store import METRIC_COLUMNS
+from metrics_ingest_server import (
+    HTTPError, KEEP_ALIVE_TIMEOUT, MAX_HEADER_BYTES, read_http_request, write_http_response
+)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram name and bucket upper bounds, in the units each metric is recorded in
+PERFORMANCE_HISTOGRAMS = {
+    "startup_time": ("chatsy_app_startup_seconds", (0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0)),
+    "memory_usage": ("chatsy_app_memory_megabytes", (50, 100, 150, 200, 300, 500, 800)),
+    "ui_fps": ("chatsy_app_ui_fps", (15, 30, 45, 55, 60, 90, 120)),
+    "network_latency": ("chatsy_app_network_latency_milliseconds", (50, 100, 200, 500, 1000, 2000, 5000)),
+    "image_load_time": ("chatsy_app_image_load_seconds", (0.1, 0.25, 0.5, 1.0, 2.0, 5.0)),
+    "database_query_time": ("chatsy_app_database_query_milliseconds", (5, 10, 25, 50, 100, 250, 500)),
+}
+
+BUILD_DURATION_BUCKETS = (30, 60, 120, 300, 600, 900, 1200, 1800, 3600)
+
+FETCH_BATCH_SIZE = 10000
+
+
+@dataclass
+class MetricFamily:
+    """One exposed metric and its samples"""
+    name: str
+    metric_type: str  # gauge, counter, histogram
+    help: str
+    samples: List[Tuple[str, Dict[str, str], float]] = field(default_factory=list)
+
+    def add(self, value: float, suffix: str = "", **labels: str):
+        self.samples.append((suffix, labels, value))
+
+
+class CumulativeHistogram:
+    """Bucket counts that only ever grow, fed incrementally with new rows"""
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = np.array(bounds, dtype=np.float64)
+        self.counts = np.zeros(len(bounds) + 1, dtype=np.int64)
+        self.total = 0.0
+
+    def observe(self, values: np.ndarray):
+        values = values[~np.isnan(values)]
+        # side='left' puts a value equal to a bound into that bound's bucket (le semantics)
+        indexes = np.searchsorted(self.bounds, values, side='left')
+        self.counts += np.bincount(indexes, minlength=len(self.counts))
+        self.total += float(values.sum())
+
+    def to_family(self, name: str, help_text: str) -> MetricFamily:
+        family = MetricFamily(name, "histogram", help_text)
+        cumulative = np.cumsum(self.counts)
+        for bound, count in zip(self.bounds, cumulative[:-1]):
+            family.add(int(count), "_bucket", le=repr(float(bound)))
+        family.add(int(cumulative[-1]), "_bucket", le="+Inf")
+        family.add(int(cumulative[-1]), "_count")
+        family.add(self.total, "_sum")
+        return family
+
+
+def format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(text: str) -> str:
+    return str(text).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_families(families: List[MetricFamily], openmetrics: bool = True) -> bytes:
+    """Render families in the OpenMetrics or Prometheus 0.0.4 text format"""
+    lines = []
+    for family in families:
+        # Prometheus text names counters with their _total suffix, OpenMetrics without
+        exposed = family.name
+        if family.metric_type == "counter" and not openmetrics:
+            exposed += "_total"
+        lines.append(f"# TYPE {exposed} {family.metric_type}")
+        lines.append(f"# HELP {exposed} {family.help}")
+        for suffix, labels, value in family.samples:
+            label_text = ""
+            if labels:
+                label_text = "{" + ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items()) + "}"
+            lines.append(f"{family.name}{suffix}{label_text} {format_value(value)}")
+
+    if openmetrics:
+        lines.append("# EOF")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class PerformanceCollector:
+    """Latest values, sample histograms and alert counts from PerformanceDashboard"""
+
+    def __init__(self, dashboard):
+        self.db_path = dashboard.db_path
+        self._reset()
+
+    def _reset(self):
+        self.last_id = 0
+        self.samples = 0
+        self.histograms = {metric: CumulativeHistogram(bounds) for metric, (_, bounds) in PERFORMANCE_HISTOGRAMS.items()}
+
+    def collect(self) -> List[MetricFamily]:
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM performance_metrics")
+        if cursor.fetchone()[0] < self.last_id:
+            self._reset()  # table was recreated; counters restart from zero
+
+        # Only rows added since the previous refresh are read
+        names = list(PERFORMANCE_HISTOGRAMS)
+        cursor.execute(f'''
+            SELECT id, {", ".join(names)} FROM performance_metrics
+            WHERE id > ? ORDER BY id
+        ''', (self.last_id,))
+        while True:
+            rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+            if not rows:
+                break
+            data = np.array(rows, dtype=np.float64)
+            for index, name in enumerate(names, 1):
+                self.histograms[name].observe(data[:, index])
+            self.samples += len(rows)
+            self.last_id = int(data[-1, 0])
+
+        cursor.execute(f'''
+            SELECT timestamp, {", ".join(METRIC_COLUMNS)} FROM performance_metrics
+            ORDER BY timestamp DESC LIMIT 1
+        ''')
+        latest = cursor.fetchone()
+
+        cursor.execute('''
+            SELECT severity, COUNT(*) FROM performance_alerts
+            WHERE resolved = FALSE GROUP BY severity
+        ''')
+        active_counts = cursor.fetchall()
+        cursor.execute("SELECT COUNT(*) FROM performance_alerts")
+        raised_count = cursor.fetchone()[0]
+        conn.close()
+
+        families = []
+        latest_family = MetricFamily("chatsy_performance_latest", "gauge", "Most recent recorded value of each performance metric")
+        last_sample = MetricFamily("chatsy_performance_last_sample_timestamp_seconds", "gauge", "Time of the most recent performance sample")
+        if latest:
+            last_sample.add(latest[0])
+            for name, value in zip(METRIC_COLUMNS, latest[1:]):
+                latest_family.add(value, metric=name)
+        families += [latest_family, last_sample]
+
+        samples_family = MetricFamily("chatsy_performance_samples", "counter", "Performance samples recorded")
+        samples_family.add(self.samples, "_total")
+        families.append(samples_family)
+
+        for name, (metric_name, _) in PERFORMANCE_HISTOGRAMS.items():
+            families.append(self.histograms[name].to_family(metric_name, f"Distribution of recorded {name} samples"))
+
+        active = MetricFamily("chatsy_performance_alerts_active", "gauge", "Open or acknowledged performance alerts")
+        for severity, count in active_counts:
+            active.add(count, severity=severity)
+        # Alerts escalate in place, so only the overall count is monotonic
+        raised = MetricFamily("chatsy_performance_alerts", "counter", "Performance alerts raised")
+        raised.add(raised_count, "_total")
+        families += [active, raised]
+
+        return families
+
+
+class CrashCollector:
+    """Latest crash-free rates and crash counts from CrashMonitoring"""
+
+    def __init__(self, crash_monitoring):
+        self.db_path = crash_monitoring.db_path
+
+    def collect(self) -> List[MetricFamily]:
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT timestamp, total_crashes, unique_issues, crash_free_users, crash_free_sessions, top_crash_types
+            FROM crash_metrics ORDER BY timestamp DESC LIMIT 1
+        ''')
+        latest = cursor.fetchone()
+        cursor.execute("SELECT COUNT(*) FROM crash_metrics")
+        reports = cursor.fetchone()[0]
+        conn.close()
+
+        crash_free_users = MetricFamily("chatsy_crash_free_users_ratio", "gauge", "Share of users without a crash")
+        crash_free_sessions = MetricFamily("chatsy_crash_free_sessions_ratio", "gauge", "Share of sessions without a crash")
+        crashes = MetricFamily("chatsy_crashes", "gauge", "Crashes in the most recent crash report")
+        unique_issues = MetricFamily("chatsy_crash_unique_issues", "gauge", "Distinct crash issues in the most recent report")
+        by_type = MetricFamily("chatsy_crashes_by_type", "gauge", "Crashes per crash type in the most recent report")
+        last_report = MetricFamily("chatsy_crash_last_report_timestamp_seconds", "gauge", "Time of the most recent crash report")
+        report_count = MetricFamily("chatsy_crash_reports", "counter", "Crash reports recorded")
+        report_count.add(reports, "_total")
+
+        if latest:
+            timestamp, total_crashes, issues, users, sessions, top_crash_types = latest
+            # Crashlytics reports crash-free rates as percentages
+            crash_free_users.add(users / 100.0)
+            crash_free_sessions.add(sessions / 100.0)
+            crashes.add(total_crashes)
+            unique_issues.add(issues)
+            last_report.add(timestamp)
+            for crash_type, count in json.loads(top_crash_types or "{}").items():
+                by_type.add(count, crash_type=crash_type)
+
+        return [crash_free_users, crash_free_sessions, crashes, unique_issues, by_type, last_report, report_count]
+
+
+class BuildCollector:
+    """Build counters, error/fix counters and build duration histogram from DeploymentMonitor"""
+
+    def __init__(self, deployment_monitor, success_window_days: int = 30):
+        self.db_path = deployment_monitor.db_path
+        self.success_window_days = success_window_days
+        self._reset()
+
+    def _reset(self):
+        self.last_id = 0
+        self.by_status: Dict[str, int] = {}
+        self.by_error: Dict[str, int] = {}
+        self.fixes: Dict[Tuple[str, str], int] = {}
+        self.durations = CumulativeHistogram(BUILD_DURATION_BUCKETS)
+
+    def collect(self) -> List[MetricFamily]:
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM build_metrics")
+        if cursor.fetchone()[0] < self.last_id:
+            self._reset()
+
+        cursor.execute('''
+            SELECT id, status, duration, error_type, fixer_applied, fix_success
+            FROM build_metrics WHERE id > ? ORDER BY id
+        ''', (self.last_id,))
+        while True:
+            rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+            if not rows:
+                break
+            for _, status, _, error_type, fixer, fix_success in rows:
+                self.by_status[status] = self.by_status.get(status, 0) + 1
+                if error_type:
+                    self.by_error[error_type] = self.by_error.get(error_type, 0) + 1
+                if fixer:
+                    key = (fixer, "success" if fix_success else "failure")
+                    self.fixes[key] = self.fixes.get(key, 0) + 1
+            self.durations.observe(np.array([row[2] for row in rows if row[2] is not None], dtype=np.float64))
+            self.last_id = rows[-1][0]
+
+        cursor.execute('''
+            SELECT COUNT(*), SUM(status = 'success') FROM build_metrics WHERE timestamp > ?
+        ''', (time.time() - self.success_window_days * 86400,))
+        window_total, window_success = cursor.fetchone()
+
+        cursor.execute('''
+            SELECT timestamp, duration, status FROM build_metrics ORDER BY timestamp DESC LIMIT 1
+        ''')
+        last_build = cursor.fetchone()
+        conn.close()
+
+        builds = MetricFamily("chatsy_builds", "counter", "Builds recorded by status")
+        for status, count in sorted(self.by_status.items()):
+            builds.add(count, "_total", status=status)
+        errors = MetricFamily("chatsy_build_errors", "counter", "Failed builds by error type")
+        for error_type, count in sorted(self.by_error.items()):
+            errors.add(count, "_total", error_type=error_type)
+        fixes = MetricFamily("chatsy_build_fixes", "counter", "Automated fixes applied by fixer and outcome")
+        for (fixer, result), count in sorted(self.fixes.items()):
+            fixes.add(count, "_total", fixer=fixer, result=result)
+
+        success_rate = MetricFamily("chatsy_build_success_ratio", "gauge",
+                                    f"Successful builds over the last {self.success_window_days} days")
+        if window_total:
+            success_rate.add((window_success or 0) / window_total)
+
+        last_timestamp = MetricFamily("chatsy_build_last_timestamp_seconds", "gauge", "Time of the most recent build")
+        last_success = MetricFamily("chatsy_build_last_success", "gauge", "Whether the most recent build succeeded")
+        if last_build:
+            last_timestamp.add(last_build[0])
+            last_success.add(1 if last_build[2] == "success" else 0)
+
+        return [
+            builds, errors, fixes,
+            self.durations.to_family("chatsy_build_duration_seconds", "Build durations"),
+            success_rate, last_timestamp, last_success
+        ]
+
+
+class MetricsExporter:
+    """Exposes precomputed metric snapshots; scrapes never touch SQLite.
+
+    ``refresh`` runs every collector and renders both exposition formats
+    once. Scrapes and textfile writes only hand out the rendered bytes.
+    """
+
+    def __init__(self, dashboard=None, crash_monitoring=None, deployment_monitor=None):
+        self.collectors = []
+        if dashboard is not None:
+            self.collectors.append(PerformanceCollector(dashboard))
+        if crash_monitoring is not None:
+            self.collectors.append(CrashCollector(crash_monitoring))
+        if deployment_monitor is not None:
+            self.collectors.append(BuildCollector(deployment_monitor))
+
+        self.openmetrics_body = render_families([], openmetrics=True)
+        self.prometheus_body = render_families([], openmetrics=False)
+        self.refreshed_at = 0.0
+
+    def refresh(self):
+        """Collect from every source and pre-render the exposition"""
+        started = time.perf_counter()
+        families = []
+        for collector in self.collectors:
+            try:
+                families.extend(collector.collect())
+            except sqlite3.Error as e:
+                print(f"⚠️ {type(collector).__name__} failed: {e}")
+
+        refresh_seconds = MetricFamily("chatsy_exporter_refresh_seconds", "gauge", "Time taken by the last snapshot refresh")
+        refresh_seconds.add(time.perf_counter() - started)
+        families.append(refresh_seconds)
+
+        self.openmetrics_body = render_families(families, openmetrics=True)
+        self.prometheus_body = render_families(families, openmetrics=False)
+        self.refreshed_at = time.time()
+
+    def exposition(self, accept: str = "") -> Tuple[bytes, str]:
+        """Body and content type for a scrape, negotiated from the Accept header"""
+        if "application/openmetrics-text" in accept:
+            return self.openmetrics_body, OPENMETRICS_CONTENT_TYPE
+        return self.prometheus_body, PROMETHEUS_CONTENT_TYPE
+
+    def write_textfile(self, path: str):
+        """Atomically write the snapshot for node_exporter's textfile collector"""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self.prometheus_body)
+        os.replace(tmp_path, path)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve scrapes on one keep-alive connection"""
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_http_request(reader), KEEP_ALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                except HTTPError as e:
+                    write_http_response(writer, e.status, e.message.encode("utf-8"), "text/plain", keep_alive=False)
+                    break
+
+                if request is None:
+                    break
+
+                if request.path == "/metrics" and request.method == "GET":
+                    body, content_type = self.exposition(request.headers.get("accept", ""))
+                    write_http_response(writer, 200, body, content_type, keep_alive=request.keep_alive)
+                else:
+                    write_http_response(writer, 404, b"Not found", "text/plain", keep_alive=request.keep_alive)
+                await writer.drain()
+
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def run(self, host: Optional[str] = None, port: Optional[int] = None,
+                  textfile: Optional[str] = None, interval: float = 15.0):
+        """Refresh every ``interval`` seconds, serving /metrics and/or writing a textfile"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.refresh)
+
+        server = None
+        if port is not None:
+            server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+            print(f"📈 Serving metrics on http://{host}:{port}/metrics")
+
+        try:
+            while True:
+                if textfile:
+                    self.write_textfile(textfile)
+                await asyncio.sleep(interval)
+                await loop.run_in_executor(None, self.refresh)
+        finally:
+            if server is not None:
+                server.close()
+
+
+def main():
+    """Run the metrics exporter"""
+    from performance_dashboard import PerformanceDashboard
+    from firebase_crashlytics_bot import CrashMonitoring
+    from deployment_monitor import DeploymentMonitor
+
+    parser = argparse.ArgumentParser(description="ChatSY OpenMetrics/Prometheus exporter")
+    parser.add_argument("--host", default="0.0.0.0", help="Address to bind")
+    parser.add_argument("--port", type=int, help="Serve /metrics on this port")
+    parser.add_argument("--textfile", help="Write a node_exporter textfile collector file")
+    parser.add_argument("--once", action="store_true", help="Write the textfile once and exit")
+    parser.add_argument("--interval", type=float, default=15.0, help="Seconds between snapshot refreshes")
+    parser.add_argument("--performance-db", default="performance_metrics.db", help="Performance metrics database")
+    parser.add_argument("--crash-db", default="crash_metrics.db", help="Crash metrics database")
+    parser.add_argument("--deployment-db", default="deployment_metrics.db", help="Deployment metrics database")
+
+    args = parser.parse_args()
+    if args.port is None and not args.textfile:
+        parser.error("specify --port and/or --textfile")
+
+    exporter = MetricsExporter(
+        dashboard=PerformanceDashboard(args.performance_db),
+        crash_monitoring=CrashMonitoring(args.crash_db),
+        deployment_monitor=DeploymentMonitor(args.deployment_db)
+    )
+
+    if args.once:
+        if not args.textfile:
+            parser.error("--once requires --textfile")
+        exporter.refresh()
+        exporter.write_textfile(args.textfile)
+        print(f"📄 Metrics written to {args.textfile}")
+        return
+
+    try:
+        asyncio.run(exporter.run(args.host, args.port, args.textfile, args.interval))
+    except KeyboardInterrupt:
+        print("\n🛑 Metrics exporter stopped.")
+
+
+if __name__ == "__main__":
+    main()
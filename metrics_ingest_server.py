@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Metrics Ingestion Server
+Asyncio HTTP and statsd-style UDP endpoint for on-device performance samples
+"""
+
+import json
+import math
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple
+
+from columnar_metric_store import METRIC_COLUMNS
+from performance_dashboard import PerformanceDashboard
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+MAX_SAMPLES_PER_BATCH = 1000
+KEEP_ALIVE_TIMEOUT = 30.0
+
+HTTP_REASONS = {
+    200: "OK",
+    202: "Accepted",
+    204: "No Content",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    408: "Request Timeout",
+    411: "Length Required",
+    413: "Payload Too Large",
+    501: "Not Implemented",
+    503: "Service Unavailable"
+}
+
+class HTTPError(Exception):
+    """Request that should be answered with an error status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+@dataclass
+class HTTPRequest:
+    """Parsed HTTP/1.1 request"""
+    method: str
+    path: str
+    query: str
+    headers: Dict[str, str]
+    body: bytes
+
+    @property
+    def keep_alive(self) -> bool:
+        return self.headers.get("connection", "").lower() != "close"
+
+@dataclass
+class IngestStats:
+    """Counters exposed on the health endpoint"""
+    accepted: int = 0
+    rejected: int = 0
+    dropped: int = 0
+    flushed: int = 0
+    flushes: int = 0
+    last_flush_ms: float = 0.0
+    started_at: float = field(default_factory=time.time)
+
+
+async def read_http_request(reader: asyncio.StreamReader) -> Optional[HTTPRequest]:
+    """Read one request from a keep-alive connection; None on clean EOF"""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise HTTPError(400, "Incomplete request head")
+    except asyncio.LimitOverrunError:
+        raise HTTPError(413, "Request head too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+
+    headers = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    transfer_encoding = headers.get("transfer-encoding", "").lower()
+    if transfer_encoding:
+        # Transfer-Encoding overrides Content-Length (RFC 9112 6.3)
+        if [coding.strip() for coding in transfer_encoding.split(",")] != ["chunked"]:
+            raise HTTPError(501, f"Unsupported Transfer-Encoding: {transfer_encoding}")
+        body = await read_chunked_body(reader)
+    else:
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length < 0 or length > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+
+    path, _, query = target.partition("?")
+    return HTTPRequest(method.upper(), path, query, headers, body)
+
+
+async def read_chunked_body(reader: asyncio.StreamReader) -> bytes:
+    """Decode a ``Transfer-Encoding: chunked`` body (dart:io's default for streamed writes)"""
+    body = bytearray()
+    while True:
+        try:
+            size_line = await reader.readuntil(b"\r\n")
+        except asyncio.LimitOverrunError:
+            raise HTTPError(400, "Chunk size line too long")
+        try:
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+        except ValueError:
+            raise HTTPError(400, "Invalid chunk size")
+        if size < 0 or len(body) + size > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        if size == 0:
+            break
+        chunk = await reader.readexactly(size + 2)
+        if chunk[-2:] != b"\r\n":
+            raise HTTPError(400, "Chunk not terminated by CRLF")
+        body += chunk[:-2]
+
+    # Trailer fields are read and ignored
+    while True:
+        try:
+            line = await reader.readuntil(b"\r\n")
+        except asyncio.LimitOverrunError:
+            raise HTTPError(400, "Trailer line too long")
+        if line == b"\r\n":
+            return bytes(body)
+
+
+def write_http_response(writer: asyncio.StreamWriter, status: int, body: bytes = b"",
+                        content_type: str = "application/json", keep_alive: bool = True,
+                        extra_headers: Optional[Dict[str, str]] = None):
+    """Queue a complete HTTP/1.1 response on the writer"""
+    headers = {
+        "Content-Type": content_type,
+        "Content-Length": str(len(body)),
+        "Connection": "keep-alive" if keep_alive else "close"
+    }
+    headers.update(extra_headers or {})
+
+    head = f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'Unknown')}\r\n"
+    head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+    writer.write(head.encode("latin-1") + b"\r\n" + body)
+
+
+def json_body(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def validate_metrics(metrics: Any) -> Dict[str, float]:
+    """Keep known, finite numeric metrics; reject anything else"""
+    if not isinstance(metrics, dict) or not metrics:
+        raise ValueError("metrics must be a non-empty object")
+
+    clean = {}
+    for name, value in metrics.items():
+        if name not in METRIC_COLUMNS:
+            raise ValueError(f"unknown metric: {name}")
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f"metric {name} must be a finite number")
+        clean[name] = float(value)
+    return clean
+
+
+def parse_sample_batch(body: bytes) -> List[Dict[str, float]]:
+    """Validate a device batch and return its samples in device order.
+
+    Accepts ``{"device_id": ..., "samples": [{"timestamp": ..., "metrics": {...}}]}``
+    or a bare list of samples. Device timestamps only order samples within
+    the batch; rows are stored at receive time like record_performance_metric.
+    """
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPError(400, "Body is not valid JSON")
+
+    samples = payload.get("samples") if isinstance(payload, dict) else payload
+    if not isinstance(samples, list) or not samples:
+        raise HTTPError(400, "Expected a non-empty samples list")
+    if len(samples) > MAX_SAMPLES_PER_BATCH:
+        raise HTTPError(413, f"At most {MAX_SAMPLES_PER_BATCH} samples per batch")
+
+    ordered = []
+    for index, sample in enumerate(samples):
+        if not isinstance(sample, dict):
+            raise HTTPError(400, f"Sample {index} must be an object")
+        try:
+            metrics = validate_metrics(sample.get("metrics"))
+        except ValueError as e:
+            raise HTTPError(400, f"Sample {index}: {e}")
+        device_time = sample.get("timestamp", 0)
+        if not isinstance(device_time, (int, float)):
+            raise HTTPError(400, f"Sample {index}: timestamp must be a number")
+        ordered.append((device_time, index, metrics))
+
+    ordered.sort()
+    return [metrics for _, _, metrics in ordered]
+
+
+def parse_statsd_datagram(data: bytes) -> List[Dict[str, float]]:
+    """Parse ``metric:value|g`` lines; invalid lines are skipped.
+
+    The gauges of one datagram form one sample, so a device reporting
+    several metrics at once does not produce one mostly-default row per
+    metric. A metric repeated within the datagram starts a new sample.
+    """
+    samples = []
+    current: Dict[str, float] = {}
+    for line in data.decode("utf-8", "replace").splitlines():
+        name, _, rest = line.strip().partition(":")
+        value, _, _type = rest.partition("|")
+        try:
+            metric = validate_metrics({name: float(value)})
+        except ValueError:
+            continue
+        if name in current:
+            samples.append(current)
+            current = {}
+        current.update(metric)
+    if current:
+        samples.append(current)
+    return samples
+
+
+class MetricsIngestServer:
+    """Accepts device samples, buffers them and group-commits to the dashboard store"""
+
+    def __init__(self, dashboard: PerformanceDashboard, host: str = "0.0.0.0", port: int = 8125,
+                 udp_port: Optional[int] = None, queue_size: int = 100000,
+                 batch_size: int = 2000, flush_interval: float = 1.0):
+        self.dashboard = dashboard
+        self.host = host
+        self.port = port
+        self.udp_port = udp_port
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.stats = IngestStats()
+
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._udp_transport = None
+        self._flusher: Optional[asyncio.Task] = None
+        # A single writer thread keeps SQLite commits and alert state serialized;
+        # anything else touching the dashboard in this process should share it
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="metrics-writer")
+
+    def enqueue(self, samples: List[Dict[str, float]]) -> bool:
+        """Add samples if the whole batch fits; False signals backpressure"""
+        if self.queue.maxsize and self.queue.qsize() + len(samples) > self.queue.maxsize:
+            return False
+
+        received_at = time.time()
+        for metrics in samples:
+            self.queue.put_nowait((received_at, metrics))
+        self.stats.accepted += len(samples)
+        return True
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one keep-alive connection"""
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_http_request(reader), KEEP_ALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                except HTTPError as e:
+                    write_http_response(writer, e.status, json_body({"error": e.message}), keep_alive=False)
+                    break
+
+                if request is None:
+                    break
+
+                status, body, headers = self.route(request)
+                write_http_response(writer, status, body, keep_alive=request.keep_alive, extra_headers=headers)
+                await writer.drain()
+
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def route(self, request: HTTPRequest) -> Tuple[int, bytes, Dict[str, str]]:
+        """Dispatch a request to its endpoint"""
+        if request.path == "/v1/samples":
+            if request.method != "POST":
+                return 405, json_body({"error": "POST only"}), {"Allow": "POST"}
+            try:
+                samples = parse_sample_batch(request.body)
+            except HTTPError as e:
+                self.stats.rejected += 1
+                return e.status, json_body({"error": e.message}), {}
+
+            if not self.enqueue(samples):
+                self.stats.dropped += len(samples)
+                return 503, json_body({"error": "Ingestion queue full"}), {"Retry-After": "5"}
+            return 202, json_body({"accepted": len(samples)}), {}
+
+        if request.path == "/healthz":
+            return 200, json_body(self.health()), {}
+
+        return 404, json_body({"error": "Not found"}), {}
+
+    def health(self) -> Dict[str, Any]:
+        """Queue depth and ingestion counters"""
+        return {
+            "status": "ok",
+            "queue_depth": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+            "accepted": self.stats.accepted,
+            "rejected": self.stats.rejected,
+            "dropped": self.stats.dropped,
+            "flushed": self.stats.flushed,
+            "flushes": self.stats.flushes,
+            "last_flush_ms": round(self.stats.last_flush_ms, 2),
+            "uptime_seconds": round(time.time() - self.stats.started_at, 1)
+        }
+
+    async def flush_loop(self):
+        """Drain the queue into group commits of up to batch_size samples"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                if self.queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self.queue.get_nowait())
+
+            await self._write_batch(batch)
+
+    async def _write_batch(self, batch: List[Tuple[float, Dict[str, float]]]):
+        """Run the blocking SQLite group commit off the event loop"""
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self.writer, self.dashboard.record_performance_metrics_batch, batch)
+            self.stats.flushed += len(batch)
+            self.stats.flushes += 1
+        except Exception as e:
+            self.stats.dropped += len(batch)
+            print(f"❌ Failed to flush {len(batch)} samples: {e}")
+        self.stats.last_flush_ms = (time.perf_counter() - started) * 1000
+
+    async def start(self):
+        """Start HTTP (and optional UDP) listeners and the flusher"""
+        self._server = await asyncio.start_server(
+            self.handle_connection, self.host, self.port, limit=MAX_HEADER_BYTES, backlog=4096
+        )
+
+        if self.udp_port is not None:
+            loop = asyncio.get_running_loop()
+            self._udp_transport, _ = await loop.create_datagram_endpoint(
+                lambda: StatsdProtocol(self), local_addr=(self.host, self.udp_port)
+            )
+
+        self._flusher = asyncio.create_task(self.flush_loop())
+
+    async def stop(self):
+        """Stop accepting samples and flush whatever is buffered"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._udp_transport is not None:
+            self._udp_transport.close()
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+
+        remaining = []
+        while not self.queue.empty():
+            remaining.append(self.queue.get_nowait())
+        if remaining:
+            await self._write_batch(remaining)
+        await asyncio.get_running_loop().run_in_executor(self.writer, self.dashboard.flush_alerts)
+        self.writer.shutdown(wait=True)
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"📡 Ingesting samples on http://{self.host}:{self.port}/v1/samples")
+        if self.udp_port is not None:
+            print(f"📡 Accepting statsd gauges on udp://{self.host}:{self.udp_port}")
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+
+class StatsdProtocol(asyncio.DatagramProtocol):
+    """statsd-style ``metric:value|g`` datagrams"""
+
+    def __init__(self, server: MetricsIngestServer):
+        self.server = server
+
+    def datagram_received(self, data: bytes, addr):
+        samples = parse_statsd_datagram(data)
+        if samples and not self.server.enqueue(samples):
+            self.server.stats.dropped += len(samples)
+
+
+def main():
+    """Run the ingestion server"""
+    parser = argparse.ArgumentParser(description="ChatSY performance sample ingestion server")
+    parser.add_argument("--host", default="0.0.0.0", help="Address to bind")
+    parser.add_argument("--port", type=int, default=8125, help="HTTP port")
+    parser.add_argument("--udp-port", type=int, help="Optional statsd-style UDP port")
+    parser.add_argument("--db-path", default="performance_metrics.db", help="Performance metrics database")
+    parser.add_argument("--columnar-dir", help="Optional columnar store directory")
+    parser.add_argument("--queue-size", type=int, default=100000, help="Maximum buffered samples")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Samples per group commit")
+    parser.add_argument("--flush-interval", type=float, default=1.0, help="Maximum seconds between commits")
+
+    args = parser.parse_args()
+
+    dashboard = PerformanceDashboard(args.db_path, columnar_dir=args.columnar_dir)
+    server = MetricsIngestServer(
+        dashboard,
+        host=args.host,
+        port=args.port,
+        udp_port=args.udp_port,
+        queue_size=args.queue_size,
+        batch_size=args.batch_size,
+        flush_interval=args.flush_interval
+    )
+
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\n🛑 Ingestion server stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Metrics Storage
+Shared SQLite schema, versioned migrations and maintenance for the monitoring bots
+"""
+
+import time
+import sqlite3
+from typing import Callable, Dict, List, Tuple, Union
+
+PERFORMANCE_SCHEMA = "performance"
+DEPLOYMENT_SCHEMA = "deployment"
+CRASH_SCHEMA = "crash"
+BUILD_LOG_SCHEMA = "build_logs"
+
+DEFAULT_TIMEOUT = 30.0
+
+Migration = Union[List[str], Callable[[sqlite3.Connection], None]]
+
+
+def connect(db_path: str, timeout: float = DEFAULT_TIMEOUT) -> sqlite3.Connection:
+    """Open a metrics database; waits on locks held by other bots instead of failing"""
+    return sqlite3.connect(db_path, timeout=timeout)
+
+
+def add_column_if_missing(conn: sqlite3.Connection, table: str, column: str, definition: str):
+    """ALTER TABLE ... ADD COLUMN unless the column already exists"""
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _add_alert_state_columns(conn: sqlite3.Connection):
+    # Databases created before the alert engine lack these columns
+    add_column_if_missing(conn, "performance_alerts", "status", "TEXT DEFAULT 'open'")
+    add_column_if_missing(conn, "performance_alerts", "updated_at", "REAL")
+    add_column_if_missing(conn, "performance_alerts", "resolved_at", "REAL")
+
+
+
+def _collapse_open_alerts(conn: sqlite3.Connection):
+    # Before the alert engine every breaching sample inserted an unresolved
+    # row; only the newest per metric can still be resolved, so close the rest
+    now = time.time()
+    conn.execute('''
+        UPDATE performance_alerts SET resolved = TRUE, status = 'resolved', updated_at = ?, resolved_at = ?
+        WHERE resolved = FALSE AND EXISTS (
+            SELECT 1 FROM performance_alerts AS newer
+            WHERE newer.metric_name = performance_alerts.metric_name AND newer.resolved = FALSE
+              AND (newer.timestamp > performance_alerts.timestamp
+                   OR (newer.timestamp = performance_alerts.timestamp AND newer.id > performance_alerts.id))
+        )
+    ''', (now, now))
+
+def _split_gradle_phase_rows(conn: sqlite3.Connection):
+    # Gradle rows used to keep task outcomes in detail, and phase totals
+    # under the same source as the tasks they add up
+    add_column_if_missing(conn, "build_phase_timings", "outcome", "TEXT NOT NULL DEFAULT ''")
+    conn.execute('''
+        UPDATE build_phase_timings SET outcome = detail, detail = ''
+        WHERE source IN ('gradle_profile', 'gradle_log', 'gradle_tasks') AND target != ''
+    ''')
+    conn.execute('''
+        UPDATE build_phase_timings SET source = source || '_summary'
+        WHERE source IN ('gradle_profile', 'gradle_log', 'gradle_tasks') AND target = ''
+    ''')
+
+
+# Ordered (version, description, migration) lists per schema. Never edit a
+# released migration; append a new one instead.
+MIGRATIONS: Dict[str, List[Tuple[int, str, Migration]]] = {
+    PERFORMANCE_SCHEMA: [
+        (1, "performance tables", [
+            '''
+            CREATE TABLE IF NOT EXISTS performance_metrics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp REAL NOT NULL,
+                startup_time REAL NOT NULL,
+                memory_usage REAL NOT NULL,
+                battery_drain REAL NOT NULL,
+                ui_fps REAL NOT NULL,
+                network_latency REAL NOT NULL,
+                image_load_time REAL NOT NULL,
+                database_query_time REAL NOT NULL,
+                crash_rate REAL NOT NULL,
+                user_satisfaction REAL NOT NULL
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS performance_alerts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                alert_id TEXT UNIQUE NOT NULL,
+                timestamp REAL NOT NULL,
+                alert_type TEXT NOT NULL,
+                severity TEXT NOT NULL,
+                message TEXT NOT NULL,
+                metric_name TEXT NOT NULL,
+                current_value REAL NOT NULL,
+                threshold_value REAL NOT NULL,
+                resolved BOOLEAN DEFAULT FALSE
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS performance_trends (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp REAL NOT NULL,
+                metric_name TEXT NOT NULL,
+                time_period TEXT NOT NULL,
+                current_value REAL NOT NULL,
+                previous_value REAL NOT NULL,
+                trend_direction TEXT NOT NULL,
+                change_percentage REAL NOT NULL
+            )
+            '''
+        ]),
+        (2, "alert state columns", _add_alert_state_columns),
+        (3, "time-window indexes", [
+            "CREATE INDEX IF NOT EXISTS idx_performance_metrics_timestamp ON performance_metrics (timestamp)",
+            # Covers the 24h trend summary (GROUP BY metric_name, trend_direction)
+            '''CREATE INDEX IF NOT EXISTS idx_performance_trends_timestamp
+               ON performance_trends (timestamp, metric_name, trend_direction)''',
+            '''CREATE INDEX IF NOT EXISTS idx_performance_trends_metric_timestamp
+               ON performance_trends (metric_name, timestamp)''',
+            '''CREATE INDEX IF NOT EXISTS idx_performance_alerts_metric_timestamp
+               ON performance_alerts (metric_name, timestamp)''',
+            '''CREATE INDEX IF NOT EXISTS idx_performance_alerts_resolved
+               ON performance_alerts (resolved, severity)'''
+        ]),
+        (4, "dart code size reports", [
+            '''
+            CREATE TABLE IF NOT EXISTS dart_size_reports (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp REAL NOT NULL,
+                app_version TEXT NOT NULL,
+                report_type TEXT NOT NULL,
+                total_size INTEGER NOT NULL,
+                aot_size INTEGER NOT NULL,
+                source TEXT
+            )
+            ''',
+            '''CREATE INDEX IF NOT EXISTS idx_dart_size_reports_version
+               ON dart_size_reports (app_version, report_type)''',
+            "CREATE INDEX IF NOT EXISTS idx_dart_size_reports_timestamp ON dart_size_reports (timestamp)",
+            '''
+            CREATE TABLE IF NOT EXISTS dart_size_packages (
+                report_id INTEGER NOT NULL,
+                package TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                PRIMARY KEY (report_id, package)
+            ) WITHOUT ROWID
+            '''
+        ]),
+        (5, "collapse legacy open alerts", _collapse_open_alerts)
+    ],
+    DEPLOYMENT_SCHEMA: [
+        (1, "deployment tables", [
+            '''
+            CREATE TABLE IF NOT EXISTS build_metrics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp REAL NOT NULL,
+                build_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                duration REAL,
+                error_type TEXT,
+                error_message TEXT,
+                fixer_applied TEXT,
+                fix_success BOOLEAN
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS deployment_health (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp REAL NOT NULL,
+                success_rate REAL NOT NULL,
+                average_build_time REAL NOT NULL,
+                common_errors TEXT,
+                fix_effectiveness TEXT,
+                trend_data TEXT
+            )
+            '''
+        ]),
+        (2, "time-window indexes", [
+            # Covers success rate and average build time over a window
+            '''CREATE INDEX IF NOT EXISTS idx_build_metrics_timestamp
+               ON build_metrics (timestamp, status, duration)''',
+            '''CREATE INDEX IF NOT EXISTS idx_build_metrics_error_type_timestamp
+               ON build_metrics (error_type, timestamp)''',
+            '''CREATE INDEX IF NOT EXISTS idx_build_metrics_fixer_timestamp
+               ON build_metrics (fixer_applied, timestamp, fix_success)''',
+            "CREATE INDEX IF NOT EXISTS idx_deployment_health_timestamp ON deployment_health (timestamp)"
+        ]),
+        (3, "incremental export cursors", [
+            '''
+            CREATE TABLE IF NOT EXISTS export_cursors (
+                name TEXT PRIMARY KEY,
+                last_id INTEGER NOT NULL,
+                exported_at REAL NOT NULL,
+                rows_exported INTEGER NOT NULL
+            )
+            '''
+        ]),
+        (4, "build phase timings", [
+            '''
+            CREATE TABLE IF NOT EXISTS build_phase_timings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                build_id TEXT NOT NULL,
+                timestamp REAL NOT NULL,
+                source TEXT NOT NULL,
+                phase TEXT NOT NULL,
+                target TEXT NOT NULL DEFAULT '',
+                project TEXT NOT NULL DEFAULT '',
+                detail TEXT NOT NULL DEFAULT '',
+                task_count INTEGER NOT NULL,
+                duration REAL NOT NULL
+            )
+            ''',
+            "CREATE INDEX IF NOT EXISTS idx_build_phase_timings_build ON build_phase_timings (build_id)",
+            # Covers phase rankings over a time window
+            '''CREATE INDEX IF NOT EXISTS idx_build_phase_timings_timestamp
+               ON build_phase_timings (timestamp, source, phase, duration)'''
+        ]),
+        (5, "app size components", [
+            '''
+            CREATE TABLE IF NOT EXISTS app_size_components (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                build_id TEXT NOT NULL,
+                timestamp REAL NOT NULL,
+                platform TEXT NOT NULL,
+                format TEXT NOT NULL,
+                category TEXT NOT NULL,
+                component TEXT NOT NULL,
+                compressed INTEGER NOT NULL,
+                uncompressed INTEGER NOT NULL,
+                files INTEGER NOT NULL
+            )
+            ''',
+            "CREATE INDEX IF NOT EXISTS idx_app_size_components_build ON app_size_components (build_id)",
+            '''CREATE INDEX IF NOT EXISTS idx_app_size_components_timestamp
+               ON app_size_components (format, timestamp)'''
+        ]),
+        (6, "fix step runs", [
+            '''
+            CREATE TABLE IF NOT EXISTS fix_step_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project TEXT NOT NULL,
+                step TEXT NOT NULL,
+                input_hash TEXT NOT NULL,
+                inputs TEXT NOT NULL,
+                success BOOLEAN NOT NULL,
+                started_at REAL NOT NULL,
+                duration REAL NOT NULL,
+                result TEXT
+            )
+            ''',
+            # Covers the last-run lookup and the duration estimates
+            '''CREATE INDEX IF NOT EXISTS idx_fix_step_runs_step
+               ON fix_step_runs (project, step, started_at)'''
+        ]),
+        (7, "gradle task outcomes and summary sources", _split_gradle_phase_rows)
+    ],
+    CRASH_SCHEMA: [
+        (1, "crash tables", [
+            '''
+            CREATE TABLE IF NOT EXISTS crash_metrics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp REAL NOT NULL,
+                total_crashes INTEGER NOT NULL,
+                unique_issues INTEGER NOT NULL,
+                crash_free_users REAL NOT NULL,
+                crash_free_sessions REAL NOT NULL,
+                top_crash_types TEXT,
+                affected_devices TEXT,
+                affected_versions TEXT
+            )
+            '''
+        ]),
+        (2, "time-window indexes", [
+            "CREATE INDEX IF NOT EXISTS idx_crash_metrics_timestamp ON crash_metrics (timestamp)"
+        ])
+    ],
+    BUILD_LOG_SCHEMA: [
+        (1, "build log full-text index", [
+            '''
+            CREATE TABLE IF NOT EXISTS build_logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                build_id TEXT NOT NULL,
+                path TEXT,
+                ingested_at REAL NOT NULL,
+                content_hash TEXT,
+                line_count INTEGER NOT NULL DEFAULT 0,
+                chunk_count INTEGER NOT NULL DEFAULT 0,
+                new_chunk_count INTEGER NOT NULL DEFAULT 0
+            )
+            ''',
+            "CREATE INDEX IF NOT EXISTS idx_build_logs_build ON build_logs (build_id)",
+            "CREATE INDEX IF NOT EXISTS idx_build_logs_content_hash ON build_logs (content_hash)",
+            # Chunk contents are stored once, however many logs contain them
+            '''
+            CREATE TABLE IF NOT EXISTS log_chunks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                hash TEXT UNIQUE NOT NULL,
+                content TEXT NOT NULL,
+                line_count INTEGER NOT NULL
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS log_chunk_refs (
+                log_id INTEGER NOT NULL,
+                seq INTEGER NOT NULL,
+                chunk_id INTEGER NOT NULL,
+                first_line INTEGER NOT NULL,
+                PRIMARY KEY (log_id, seq)
+            ) WITHOUT ROWID
+            ''',
+            "CREATE INDEX IF NOT EXISTS idx_log_chunk_refs_chunk ON log_chunk_refs (chunk_id, log_id)",
+            '''
+            CREATE VIRTUAL TABLE IF NOT EXISTS log_chunks_fts
+            USING fts5(content, content='log_chunks', content_rowid='id')
+            '''
+        ])
+    ]
+}
+
+
+def schema_version(conn: sqlite3.Connection, schema: str) -> int:
+    """Applied migration version for a schema, 0 if none"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            schema TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            applied_at REAL NOT NULL
+        )
+    ''')
+    row = conn.execute("SELECT version FROM schema_migrations WHERE schema = ?", (schema,)).fetchone()
+    return row[0] if row else 0
+
+
+def migrate(db_path: str, schema: str) -> int:
+    """Apply pending migrations for ``schema``; returns the number applied.
+
+    Versions are tracked per schema in ``schema_migrations`` so several bots
+    can share one database file. Each migration runs in its own transaction,
+    DDL included. Databases created before migrations existed start at version 0; the
+    first migrations are written to be no-ops against them.
+    """
+    if schema not in MIGRATIONS:
+        raise ValueError(f"Unknown metrics schema: {schema}")
+
+    conn = connect(db_path)
+    applied = 0
+    try:
+        current = schema_version(conn, schema)
+        for version, _description, migration in MIGRATIONS[schema]:
+            if version <= current:
+                continue
+            with conn:
+                # IMMEDIATE takes the write lock up front, so bots starting
+                # together apply each migration exactly once
+                conn.execute("BEGIN IMMEDIATE")
+                if schema_version(conn, schema) >= version:
+                    continue
+                if callable(migration):
+                    migration(conn)
+                else:
+                    for statement in migration:
+                        conn.execute(statement)
+                conn.execute('''
+                    INSERT OR REPLACE INTO schema_migrations (schema, version, applied_at)
+                    VALUES (?, ?, ?)
+                ''', (schema, version, time.time()))
+            applied += 1
+
+        if applied:
+            # Give the planner statistics for any new indexes
+            conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+    return applied
+
+
+def optimize(db_path: str):
+    """Cheap periodic maintenance; only re-analyzes tables whose stats are stale"""
+    conn = connect(db_path)
+    try:
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+
+
+def analyze(db_path: str):
+    """Full statistics refresh, e.g. after a large backfill"""
+    conn = connect(db_path)
+    try:
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+
+def initialize_database(db_path: str, schema: str):
+    """Bring a bot's database up to date; called from each init_database"""
+    if not migrate(db_path, schema):
+        optimize(db_path)
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+PBXProj Parser
+OpenStep plist parser and object model for Xcode project.pbxproj files
+"""
+
+import re
+import hashlib
+import threading
+from fnmatch import fnmatch
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_SDK = "iphoneos"
+MAX_CACHED_PROJECTS = 16
+
+# Each match consumes leading whitespace/comments plus exactly one token
+TOKEN = re.compile(
+    r'(?:\s+|/\*.*?\*/|//[^\n]*)*'
+    r'(?:"((?:[^"\\]|\\.)*)"'            # 1: quoted string
+    r'|([A-Za-z0-9_$/:.\-+]+)'           # 2: unquoted string
+    r'|<([0-9A-Fa-f\s]*)>'               # 3: data
+    r'|([{}();=,]))',                    # 4: punctuation
+    re.S
+)
+TRAILING = re.compile(r'(?:\s+|/\*.*?\*/|//[^\n]*)*', re.S)
+ESCAPE = re.compile(r'\\(U[0-9A-Fa-f]{4}|[0-7]{1,3}|.)', re.S)
+ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "a": "\a", "b": "\b", "f": "\f", "v": "\v"}
+
+# "CODE_SIGN_IDENTITY[sdk=iphoneos*]" -> ("CODE_SIGN_IDENTITY", "iphoneos*")
+CONDITIONAL_SETTING = re.compile(r'^([A-Za-z0-9_]+)\[sdk=([^\]]+)\]$')
+
+
+class PBXProjError(ValueError):
+    """Raised when project.pbxproj is not a valid OpenStep plist"""
+
+
+def _unescape(match: re.Match) -> str:
+    escape = match.group(1)
+    if escape[0] == "U" and len(escape) == 5:
+        return chr(int(escape[1:], 16))
+    if escape[0] in "01234567":
+        return chr(int(escape, 8))
+    return ESCAPES.get(escape, escape)
+
+
+def _tokenize(text: str) -> List[Tuple[int, str, Any]]:
+    tokens = []
+    position = 0
+    for match in TOKEN.finditer(text):
+        if match.start() != position:
+            break
+        position = match.end()
+        quoted, bare, data, punct = match.groups()
+        if punct is not None:
+            tokens.append((position, punct, None))
+        elif bare is not None:
+            tokens.append((position, "s", bare))
+        elif quoted is not None:
+            tokens.append((position, "s", ESCAPE.sub(_unescape, quoted) if "\\" in quoted else quoted))
+        else:
+            tokens.append((position, "d", bytes.fromhex("".join(data.split()))))
+    trailing = TRAILING.match(text, position)
+    if trailing.end() != len(text):
+        line = text.count("\n", 0, position) + 1
+        raise PBXProjError(f"Unexpected character at line {line}: {text[position:position + 20]!r}")
+    return tokens
+
+
+def parse_openstep(text: str) -> Any:
+    """Parse an ASCII (OpenStep) plist into dicts, lists, strings and bytes"""
+    tokens = _tokenize(text)
+    index = 0
+
+    def fail(message: str):
+        position = tokens[min(index, len(tokens) - 1)][0] if tokens else 0
+        raise PBXProjError(f"{message} at line {text.count(chr(10), 0, position) + 1}")
+
+    def expect(kind: str):
+        nonlocal index
+        if index >= len(tokens) or tokens[index][1] != kind:
+            fail(f"Expected '{kind}'")
+        index += 1
+
+    def value() -> Any:
+        nonlocal index
+        if index >= len(tokens):
+            fail("Unexpected end of file")
+        _, kind, payload = tokens[index]
+        index += 1
+        if kind == "s" or kind == "d":
+            return payload
+        if kind == "{":
+            result = {}
+            while tokens[index][1] != "}":
+                _, key_kind, key = tokens[index]
+                if key_kind != "s":
+                    fail("Expected dictionary key")
+                index += 1
+                expect("=")
+                result[key] = value()
+                expect(";")
+            index += 1
+            return result
+        if kind == "(":
+            result = []
+            while tokens[index][1] != ")":
+                result.append(value())
+                if tokens[index][1] == ",":
+                    index += 1
+                elif tokens[index][1] != ")":
+                    fail("Expected ',' or ')'")
+            index += 1
+            return result
+        fail(f"Unexpected '{kind}'")
+
+    try:
+        root = value()
+    except IndexError:
+        raise PBXProjError("Unexpected end of file")
+    if index != len(tokens):
+        fail("Trailing content after root object")
+    return root
+
+
+@dataclass
+class BuildConfiguration:
+    """One XCBuildConfiguration (Debug, Release, Profile, ...)"""
+    id: str
+    name: str
+    build_settings: Dict[str, Any] = field(default_factory=dict)
+    base_configuration: Optional[str] = None   # xcconfig file path, when set
+    # setting name -> [(sdk pattern, value)] for "NAME[sdk=...]" keys
+    conditional: Dict[str, List[Tuple[str, Any]]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        for key, setting in self.build_settings.items():
+            match = CONDITIONAL_SETTING.match(key)
+            if match:
+                self.conditional.setdefault(match.group(1), []).append((match.group(2), setting))
+
+    def get(self, name: str, sdk: Optional[str] = DEFAULT_SDK) -> Optional[Any]:
+        """Setting value as the given SDK sees it; None if not set at this level"""
+        if sdk is not None:
+            for pattern, setting in self.conditional.get(name, ()):
+                if fnmatch(sdk, pattern):
+                    return setting
+        return self.build_settings.get(name)
+
+
+@dataclass
+class Target:
+    """A PBXNativeTarget / PBXAggregateTarget and its configurations"""
+    id: str
+    name: str
+    isa: str
+    product_type: str = ""
+    configurations: Dict[str, BuildConfiguration] = field(default_factory=dict)
+    default_configuration: Optional[str] = None
+
+
+@dataclass
+class PBXProject:
+    """Object graph of one project.pbxproj"""
+    path: str
+    digest: str
+    objects: Dict[str, Dict[str, Any]]
+    root_id: str
+    configurations: Dict[str, BuildConfiguration] = field(default_factory=dict)
+    targets: Dict[str, Target] = field(default_factory=dict)
+    default_configuration: Optional[str] = None
+
+    def configuration_names(self) -> List[str]:
+        names = list(self.configurations)
+        for target in self.targets.values():
+            names.extend(name for name in target.configurations if name not in names)
+        return names
+
+    def app_target(self) -> Optional[Target]:
+        """The first application target (Runner for Flutter projects)"""
+        for target in self.targets.values():
+            if target.product_type == "com.apple.product-type.application":
+                return target
+        return next(iter(self.targets.values()), None)
+
+    def build_setting(self, name: str, configuration: Optional[str] = None, target: Optional[str] = None,
+                      sdk: Optional[str] = DEFAULT_SDK) -> Optional[Any]:
+        """Effective setting for a target in one configuration.
+
+        Target-level settings override project-level ones, as in Xcode.
+        ``target`` defaults to the app target and ``configuration`` to the
+        target's default (Release for Flutter projects). xcconfig files are
+        not read, so settings defined only there come back as None.
+        """
+        owner = self.targets.get(target) if target else self.app_target()
+        if target and owner is None:
+            raise KeyError(f"No target named {target!r}")
+        configuration = configuration or (owner.default_configuration if owner else None) \
+            or self.default_configuration
+
+        if owner is not None and configuration in owner.configurations:
+            value = owner.configurations[configuration].get(name, sdk)
+            if value is not None:
+                return value
+        if configuration in self.configurations:
+            return self.configurations[configuration].get(name, sdk)
+        return None
+
+    def settings_by_configuration(self, name: str, target: Optional[str] = None,
+                                  sdk: Optional[str] = DEFAULT_SDK) -> Dict[str, Optional[Any]]:
+        """{configuration: effective value} across Debug, Release, Profile, ..."""
+        owner = self.targets.get(target) if target else self.app_target()
+        names = list(owner.configurations) if owner else list(self.configurations)
+        return {configuration: self.build_setting(name, configuration, target, sdk) for configuration in names}
+
+
+def _configurations(objects: Dict[str, Dict], list_id: Optional[str]) -> Tuple[Dict[str, BuildConfiguration], Optional[str]]:
+    config_list = objects.get(list_id or "", {})
+    configurations = {}
+    for config_id in config_list.get("buildConfigurations", []):
+        config = objects.get(config_id, {})
+        base = objects.get(config.get("baseConfigurationReference", ""), {})
+        configurations[config.get("name", config_id)] = BuildConfiguration(
+            id=config_id,
+            name=config.get("name", config_id),
+            build_settings=config.get("buildSettings", {}),
+            base_configuration=base.get("path")
+        )
+    return configurations, config_list.get("defaultConfigurationName")
+
+
+def build_project(root: Dict[str, Any], path: str = "", digest: str = "") -> PBXProject:
+    """Object model from a parsed project.pbxproj plist"""
+    if not isinstance(root, dict) or "objects" not in root or "rootObject" not in root:
+        raise PBXProjError("Not a project.pbxproj: missing objects/rootObject")
+    objects = root["objects"]
+    project_object = objects.get(root["rootObject"], {})
+    configurations, default_configuration = _configurations(objects, project_object.get("buildConfigurationList"))
+    project = PBXProject(path=path, digest=digest, objects=objects, root_id=root["rootObject"],
+                         configurations=configurations, default_configuration=default_configuration)
+
+    for target_id in project_object.get("targets", []):
+        target_object = objects.get(target_id, {})
+        target_configurations, target_default = _configurations(objects, target_object.get("buildConfigurationList"))
+        name = target_object.get("name", target_id)
+        project.targets[name] = Target(
+            id=target_id,
+            name=name,
+            isa=target_object.get("isa", ""),
+            product_type=target_object.get("productType", ""),
+            configurations=target_configurations,
+            default_configuration=target_default
+        )
+    return project
+
+
+_cache: "OrderedDict[str, PBXProject]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def load_project(path: str) -> PBXProject:
+    """Parsed project, reused for as long as the file's content hash is unchanged"""
+    with open(path, 'rb') as f:
+        content = f.read()
+    digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+
+    with _cache_lock:
+        project = _cache.get(digest)
+        if project is not None and project.path == str(path):
+            _cache.move_to_end(digest)
+            return project
+
+    project = build_project(parse_openstep(content.decode('utf-8')), str(path), digest)
+    with _cache_lock:
+        _cache[digest] = project
+        while len(_cache) > MAX_CACHED_PROJECTS:
+            _cache.popitem(last=False)
+    return project
+
+
+def main():
+    """Print effective build settings per target and configuration"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Effective build settings from project.pbxproj")
+    parser.add_argument("path", help="Path to project.pbxproj (or the .xcodeproj directory)")
+    parser.add_argument("settings", nargs="*", default=[
+        "IPHONEOS_DEPLOYMENT_TARGET", "CODE_SIGN_STYLE", "CODE_SIGN_IDENTITY",
+        "DEVELOPMENT_TEAM", "PROVISIONING_PROFILE_SPECIFIER", "PRODUCT_BUNDLE_IDENTIFIER"
+    ], help="Setting names to show")
+    parser.add_argument("--target", help="Target name (default: the app target)")
+    parser.add_argument("--sdk", default=DEFAULT_SDK, help="SDK for [sdk=...] conditional settings")
+    args = parser.parse_args()
+
+    path = args.path
+    if path.endswith(".xcodeproj") or path.endswith(".xcodeproj/"):
+        path = path.rstrip("/") + "/project.pbxproj"
+    try:
+        project = load_project(path)
+    except (OSError, PBXProjError) as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+    target = project.targets.get(args.target) if args.target else project.app_target()
+    print(f"📁 {path}: {len(project.objects):,} objects, targets: {', '.join(project.targets) or 'none'}")
+    print(f"🎯 {target.name if target else 'project'} (sdk={args.sdk})")
+    for name in args.settings:
+        print(f"\n   {name}")
+        for configuration, value in project.settings_by_configuration(name, args.target, args.sdk).items():
+            print(f"      {configuration:10s} {value if value is not None else '(not set)'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Performance Alert Engine
+Stateful threshold alerting with hysteresis, cooldowns and batched persistence
+"""
+
+import json
+import time
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+from dataclasses import dataclass
+
+from setup_performance_bot import DEFAULT_ALERT_THRESHOLDS
+
+ALERT_OPEN = "open"
+ALERT_ACKNOWLEDGED = "acknowledged"
+ALERT_RESOLVED = "resolved"
+
+# Defaults used when performance_config.json does not override them
+DEFAULT_HYSTERESIS = 0.1  # fraction of the threshold a value must recover by
+DEFAULT_COOLDOWN_SECONDS = 300.0
+DEFAULT_FLUSH_BATCH_SIZE = 50
+DEFAULT_FLUSH_INTERVAL_SECONDS = 30.0
+
+@dataclass
+class PerformanceAlert:
+    """Performance alert data structure"""
+    alert_id: str
+    timestamp: float
+    alert_type: str
+    severity: str
+    message: str
+    metric_name: str
+    current_value: float
+    threshold_value: float
+    resolved: bool = False
+    status: str = ALERT_OPEN
+    updated_at: Optional[float] = None
+    resolved_at: Optional[float] = None
+
+@dataclass
+class AlertThreshold:
+    """Warning/critical thresholds for a single metric"""
+    metric_name: str
+    warning: float
+    critical: float
+
+    @property
+    def higher_is_worse(self) -> bool:
+        """Metrics such as ui_fps alert when they drop, others when they rise"""
+        return self.critical >= self.warning
+
+    def level_value(self, severity: str) -> float:
+        return self.critical if severity == "critical" else self.warning
+
+    def breaches(self, value: float, severity: str, band: float = 0.0) -> bool:
+        """Whether value is beyond the given level, widened by a hysteresis band"""
+        threshold = self.level_value(severity)
+        margin = abs(threshold) * band
+        if self.higher_is_worse:
+            return value >= threshold - margin
+        return value <= threshold + margin
+
+
+def load_alert_config(config_path: str = "performance_config.json") -> Dict[str, Any]:
+    """Load alerting settings from the performance config.
+
+    Falls back to the defaults written by
+    ``setup_performance_bot.create_performance_config`` for anything the file
+    does not define.
+    """
+    monitoring = {}
+    path = Path(config_path)
+    if path.exists():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                monitoring = json.load(f).get("performance_monitoring", {})
+        except (OSError, ValueError):
+            monitoring = {}
+
+    thresholds = dict(DEFAULT_ALERT_THRESHOLDS)
+    thresholds.update(monitoring.get("alert_thresholds", {}))
+
+    return {
+        "thresholds": {
+            name: AlertThreshold(name, float(levels["warning"]), float(levels["critical"]))
+            for name, levels in thresholds.items()
+        },
+        "hysteresis": float(monitoring.get("alert_hysteresis", DEFAULT_HYSTERESIS)),
+        "cooldown_seconds": float(monitoring.get("alert_cooldown_seconds", DEFAULT_COOLDOWN_SECONDS)),
+        "flush_batch_size": int(monitoring.get("alert_flush_batch_size", DEFAULT_FLUSH_BATCH_SIZE)),
+        "flush_interval_seconds": float(monitoring.get("alert_flush_interval_seconds", DEFAULT_FLUSH_INTERVAL_SECONDS))
+    }
+
+
+def load_open_alerts(db_path: str) -> List[PerformanceAlert]:
+    """Unresolved alerts as persisted by any process, oldest first"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        SELECT alert_id, timestamp, alert_type, severity, message, metric_name,
+               current_value, threshold_value, resolved, status, updated_at, resolved_at
+        FROM performance_alerts
+        WHERE resolved = FALSE
+        ORDER BY timestamp
+    ''')
+
+    alerts = []
+    for row in cursor.fetchall():
+        alert = PerformanceAlert(*row)
+        alert.resolved = bool(alert.resolved)
+        alert.status = alert.status or ALERT_OPEN
+        alerts.append(alert)
+
+    conn.close()
+    return alerts
+
+
+class AlertEngine:
+    """Tracks one alert per metric and persists only state transitions"""
+
+    def __init__(self, db_path: str, thresholds: Dict[str, AlertThreshold],
+                 hysteresis: float = DEFAULT_HYSTERESIS,
+                 cooldown_seconds: float = DEFAULT_COOLDOWN_SECONDS,
+                 flush_batch_size: int = DEFAULT_FLUSH_BATCH_SIZE,
+                 flush_interval_seconds: float = DEFAULT_FLUSH_INTERVAL_SECONDS):
+        self.db_path = db_path
+        self.thresholds = thresholds
+        self.hysteresis = hysteresis
+        self.cooldown_seconds = cooldown_seconds
+        self.flush_batch_size = flush_batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+
+        self.active: Dict[str, PerformanceAlert] = {}
+        self.last_resolved: Dict[str, float] = {}
+        self._pending: Dict[str, PerformanceAlert] = {}
+        self._last_flush = time.monotonic()
+
+        self._load_active_alerts()
+
+    @classmethod
+    def from_config(cls, db_path: str, config_path: str = "performance_config.json") -> "AlertEngine":
+        """Create an engine using thresholds from performance_config.json"""
+        return cls(db_path, **load_alert_config(config_path))
+
+    def _load_active_alerts(self):
+        """Restore unresolved alerts so a restart does not reopen them"""
+        for alert in load_open_alerts(self.db_path):
+            self.active[alert.metric_name] = alert
+
+    def observe(self, metrics: Dict[str, float], now: Optional[float] = None) -> List[PerformanceAlert]:
+        """Feed one sample through the state machine.
+
+        Returns the alerts whose state changed (opened, escalated,
+        de-escalated or resolved) as a result of this sample. Opening and
+        resolving are written through at once, so short-lived callers never
+        lose them; severity changes wait for the next batch.
+        """
+        now = time.time() if now is None else now
+        changed = []
+        opened_or_resolved = False
+
+        for metric_name, value in metrics.items():
+            threshold = self.thresholds.get(metric_name)
+            if threshold is None:
+                continue
+
+            was_active = metric_name in self.active
+            alert = self._transition(threshold, value, now)
+            if alert is not None:
+                changed.append(alert)
+                self._pending[alert.alert_id] = alert
+                opened_or_resolved = opened_or_resolved or was_active != (metric_name in self.active)
+
+        # Sample timestamps may be backfilled or skewed, so flushes are timed by the local clock
+        if (opened_or_resolved or len(self._pending) >= self.flush_batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval_seconds):
+            self.flush()
+
+        return changed
+
+    def _transition(self, threshold: AlertThreshold, value: float, now: float) -> Optional[PerformanceAlert]:
+        """Apply one value to a metric's alert state"""
+        metric_name = threshold.metric_name
+        alert = self.active.get(metric_name)
+
+        if alert is None:
+            if threshold.breaches(value, "critical"):
+                severity = "critical"
+            elif threshold.breaches(value, "warning"):
+                severity = "warning"
+            else:
+                return None
+
+            if now - self.last_resolved.get(metric_name, float("-inf")) < self.cooldown_seconds:
+                return None
+
+            return self._open(threshold, value, severity, now)
+
+        # Existing alerts only clear once the value recovers past the hysteresis band
+        alert.current_value = value
+        if alert.severity == "critical":
+            if threshold.breaches(value, "critical", self.hysteresis):
+                return None
+            if threshold.breaches(value, "warning", self.hysteresis):
+                return self._change_severity(alert, threshold, value, "warning", now)
+            return self._resolve(alert, now)
+
+        if threshold.breaches(value, "critical"):
+            return self._change_severity(alert, threshold, value, "critical", now)
+        if threshold.breaches(value, "warning", self.hysteresis):
+            return None
+        return self._resolve(alert, now)
+
+    def _open(self, threshold: AlertThreshold, value: float, severity: str, now: float) -> PerformanceAlert:
+        """Open a new alert for a metric"""
+        threshold_value = threshold.level_value(severity)
+        alert = PerformanceAlert(
+            alert_id=f"{threshold.metric_name}_{int(now * 1000)}",
+            timestamp=now,
+            alert_type="performance_threshold",
+            severity=severity,
+            message=self._message(threshold, value, severity),
+            metric_name=threshold.metric_name,
+            current_value=value,
+            threshold_value=threshold_value,
+            updated_at=now
+        )
+        self.active[threshold.metric_name] = alert
+        return alert
+
+    def _change_severity(self, alert: PerformanceAlert, threshold: AlertThreshold, value: float,
+                         severity: str, now: float) -> PerformanceAlert:
+        """Escalate or de-escalate an open alert in place"""
+        alert.severity = severity
+        alert.threshold_value = threshold.level_value(severity)
+        alert.message = self._message(threshold, value, severity)
+        alert.updated_at = now
+        return alert
+
+    def _resolve(self, alert: PerformanceAlert, now: float) -> PerformanceAlert:
+        """Close an alert and start the metric's cooldown"""
+        alert.resolved = True
+        alert.status = ALERT_RESOLVED
+        alert.updated_at = now
+        alert.resolved_at = now
+        del self.active[alert.metric_name]
+        self.last_resolved[alert.metric_name] = now
+        return alert
+
+    def _message(self, threshold: AlertThreshold, value: float, severity: str) -> str:
+        if threshold.higher_is_worse:
+            return (f"{threshold.metric_name} exceeded {severity} threshold: "
+                    f"{value:.2f} > {threshold.level_value(severity):.2f}")
+        return (f"{threshold.metric_name} fell below {severity} threshold: "
+                f"{value:.2f} < {threshold.level_value(severity):.2f}")
+
+    def acknowledge(self, metric_name: str) -> Optional[PerformanceAlert]:
+        """Mark the open alert for a metric as acknowledged"""
+        alert = self.active.get(metric_name)
+        if alert is None or alert.status == ALERT_ACKNOWLEDGED:
+            return None
+
+        alert.status = ALERT_ACKNOWLEDGED
+        alert.updated_at = time.time()
+        self._pending[alert.alert_id] = alert
+        return alert
+
+    def get_active_alerts(self) -> List[PerformanceAlert]:
+        """Currently open or acknowledged alerts, newest first"""
+        return sorted(self.active.values(), key=lambda a: a.timestamp, reverse=True)
+
+    def flush(self):
+        """Write all pending state changes in a single transaction"""
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+
+        rows = [
+            (a.alert_id, a.timestamp, a.alert_type, a.severity, a.message, a.metric_name,
+             a.current_value, a.threshold_value, a.resolved, a.status, a.updated_at, a.resolved_at)
+            for a in self._pending.values()
+        ]
+
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO performance_alerts
+                (alert_id, timestamp, alert_type, severity, message, metric_name, current_value,
+                 threshold_value, resolved, status, updated_at, resolved_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+        conn.close()
+
+        self._pending.clear()
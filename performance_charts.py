@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Performance Chart Renderer
+Cached, process-parallel chart rendering for the performance dashboard
+"""
+
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+
+SUPPORTED_FORMATS = ("png", "svg")
+
+@dataclass
+class ChartSpec:
+    """Single chart panel definition"""
+    metric_name: str
+    title: str
+    ylabel: str
+    color: Optional[str] = None
+
+# Individual charts, in the order they have always been generated
+CHART_SPECS = [
+    ChartSpec('startup_time', 'Startup Time Over Time', 'Startup Time (seconds)'),
+    ChartSpec('memory_usage', 'Memory Usage Over Time', 'Memory Usage (MB)', 'orange'),
+    ChartSpec('ui_fps', 'UI Frame Rate Over Time', 'FPS', 'green'),
+    ChartSpec('network_latency', 'Network Latency Over Time', 'Latency (ms)', 'red'),
+]
+
+# Panels of the combined 2x2 dashboard chart
+DASHBOARD_PANELS = [
+    ChartSpec('startup_time', 'Startup Time', 'Seconds'),
+    ChartSpec('memory_usage', 'Memory Usage', 'MB', 'orange'),
+    ChartSpec('ui_fps', 'UI Frame Rate', 'FPS', 'green'),
+    ChartSpec('network_latency', 'Network Latency', 'ms', 'red'),
+]
+
+SINGLE_FIGSIZE = (12, 6)
+DASHBOARD_FIGSIZE = (15, 10)
+
+# Markers are only drawn while individual samples are still distinguishable
+MARKER_POINT_LIMIT = 200
+
+
+def lttb_downsample(x: np.ndarray, y: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Downsample a series with Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last points and, for every bucket in between, the
+    point forming the largest triangle with the previously selected point and
+    the average of the next bucket. Returns the inputs untouched when they are
+    already at or below ``threshold`` points.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    x_float = x.astype(np.float64)
+    y_float = y.astype(np.float64)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    # Bucket boundaries for the n - 2 interior points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x_float[next_start:next_end].mean()
+        avg_y = y_float[next_start:next_end].mean()
+
+        bucket_x = x_float[start:end]
+        bucket_y = y_float[start:end]
+        areas = np.abs(
+            (x_float[a] - avg_x) * (bucket_y - y_float[a]) -
+            (x_float[a] - bucket_x) * (avg_y - y_float[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return x[selected], y[selected]
+
+
+def series_digest(timestamps: np.ndarray, values: np.ndarray) -> str:
+    """Stable hash of the data backing a chart"""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(timestamps, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def _plot_panel(ax, spec: Dict[str, Any], timestamps: np.ndarray, values: np.ndarray, pixel_width: int):
+    """Draw one downsampled series onto an axes"""
+    x, y = lttb_downsample(timestamps, values, pixel_width)
+    dates = (x * 1e6).astype('datetime64[us]')
+    marker = 'o' if len(x) <= MARKER_POINT_LIMIT else None
+    ax.plot(dates, y, marker=marker, linewidth=2, color=spec.get('color'))
+    ax.grid(True, alpha=0.3)
+    ax.tick_params(axis='x', rotation=45)
+
+
+def render_chart_job(job: Dict[str, Any]) -> str:
+    """Render a single chart file.
+
+    Module-level so it can be shipped to worker processes. Uses the
+    object-oriented Figure/Agg API rather than the global pyplot state, which
+    is neither process- nor thread-safe.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    dpi = job['dpi']
+    timestamps = job['timestamps']
+    figure = Figure(figsize=job['figsize'], dpi=dpi)
+    FigureCanvasAgg(figure)
+
+    if job['kind'] == 'single':
+        spec = job['panels'][0]
+        ax = figure.add_subplot(1, 1, 1)
+        _plot_panel(ax, spec, timestamps, job['series'][spec['metric_name']], int(job['figsize'][0] * dpi))
+        ax.set_title(spec['title'], fontsize=16, fontweight='bold')
+        ax.set_xlabel('Time')
+        ax.set_ylabel(spec['ylabel'])
+    else:
+        panel_width = int(job['figsize'][0] * dpi / 2)
+        for index, spec in enumerate(job['panels'], 1):
+            ax = figure.add_subplot(2, 2, index)
+            _plot_panel(ax, spec, timestamps, job['series'][spec['metric_name']], panel_width)
+            ax.set_title(spec['title'])
+            ax.set_ylabel(spec['ylabel'])
+        figure.suptitle(job['title'], fontsize=16, fontweight='bold')
+
+    figure.tight_layout()
+    figure.savefig(job['output_path'], dpi=dpi, format=job['format'], bbox_inches='tight')
+    return job['output_path']
+
+
+class ChartRenderer:
+    """Renders dashboard charts, skipping any whose data has not changed"""
+
+    def __init__(self, output_dir: str = ".", dpi: int = 300, image_format: str = "png",
+                 cache_file: str = ".chart_render_cache.json", max_workers: Optional[int] = None):
+        if image_format not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported chart format: {image_format}")
+
+        self.output_dir = output_dir
+        self.dpi = dpi
+        self.image_format = image_format
+        self.cache_path = os.path.join(output_dir, cache_file)
+        self.max_workers = max_workers
+
+    def render(self, timestamps: np.ndarray, series: Dict[str, np.ndarray]) -> Dict[str, str]:
+        """Render all dashboard charts and return chart name -> file path"""
+        digests = {name: series_digest(timestamps, values) for name, values in series.items()}
+        jobs = self._build_jobs(timestamps, series, digests)
+
+        cache = self._load_cache()
+        charts = {}
+        stale_jobs = []
+        for name, job in jobs.items():
+            charts[name] = job['output_path']
+            if cache.get(job['output_path']) != job['cache_key'] or not os.path.exists(job['output_path']):
+                stale_jobs.append(job)
+
+        if stale_jobs:
+            self._render_jobs(stale_jobs)
+            for job in stale_jobs:
+                cache[job['output_path']] = job['cache_key']
+            self._save_cache(cache)
+
+        return charts
+
+    def _build_jobs(self, timestamps: np.ndarray, series: Dict[str, np.ndarray],
+                    digests: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Describe every chart as a picklable render job"""
+        jobs = {}
+
+        for spec in CHART_SPECS:
+            jobs[spec.metric_name] = self._make_job(
+                name=spec.metric_name,
+                filename=f"{spec.metric_name}_chart",
+                kind='single',
+                title=spec.title,
+                panels=[spec],
+                figsize=SINGLE_FIGSIZE,
+                timestamps=timestamps,
+                series=series,
+                digests=digests
+            )
+
+        jobs['dashboard'] = self._make_job(
+            name='dashboard',
+            filename='performance_dashboard',
+            kind='dashboard',
+            title='Performance Metrics Dashboard',
+            panels=DASHBOARD_PANELS,
+            figsize=DASHBOARD_FIGSIZE,
+            timestamps=timestamps,
+            series=series,
+            digests=digests
+        )
+
+        return jobs
+
+    def _make_job(self, name: str, filename: str, kind: str, title: str, panels: List[ChartSpec],
+                  figsize: Tuple[int, int], timestamps: np.ndarray, series: Dict[str, np.ndarray],
+                  digests: Dict[str, str]) -> Dict[str, Any]:
+        """Build a render job and the cache key covering its data and settings"""
+        panel_dicts = [asdict(panel) for panel in panels]
+        key_source = json.dumps({
+            "kind": kind,
+            "title": title,
+            "panels": panel_dicts,
+            "figsize": figsize,
+            "dpi": self.dpi,
+            "format": self.image_format,
+            "data": [digests[panel.metric_name] for panel in panels]
+        }, sort_keys=True)
+
+        return {
+            "name": name,
+            "kind": kind,
+            "title": title,
+            "panels": panel_dicts,
+            "figsize": figsize,
+            "dpi": self.dpi,
+            "format": self.image_format,
+            "timestamps": timestamps,
+            "series": {panel.metric_name: series[panel.metric_name] for panel in panels},
+            "output_path": os.path.join(self.output_dir, f"{filename}.{self.image_format}"),
+            "cache_key": hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+        }
+
+    def _render_jobs(self, jobs: List[Dict[str, Any]]):
+        """Render jobs across worker processes, falling back to in-process rendering"""
+        workers = min(len(jobs), self.max_workers or os.cpu_count() or 1)
+
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    list(executor.map(render_chart_job, jobs))
+                return
+            except (OSError, BrokenProcessPool):
+                pass
+
+        for job in jobs:
+            render_chart_job(job)
+
+    def _load_cache(self) -> Dict[str, str]:
+        """Load chart file -> cache key manifest"""
+        try:
+            with open(self.cache_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self, cache: Dict[str, str]):
+        """Persist chart file -> cache key manifest"""
+        with open(self.cache_path, 'w') as f:
+            json.dump(cache, f, indent=2)
@@ -7,25 +7,15 @@ Real-time performance monitoring and analytics system
 import json
 import time
 import sqlite3
-import matplotlib.pyplot as plt
-import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Callable
 from dataclasses import dataclass, asdict
 import numpy as np
 
-@dataclass
-class PerformanceAlert:
-    """Performance alert data structure"""
-    alert_id: str
-    timestamp: float
-    alert_type: str
-    severity: str
-    message: str
-    metric_name: str
-    current_value: float
-    threshold_value: float
-    resolved: bool = False
+from performance_charts import ChartRenderer
+from performance_alerts import AlertEngine, PerformanceAlert
+from columnar_metric_store import ColumnarMetricStore, METRIC_COLUMNS
+from metrics_storage import initialize_database, PERFORMANCE_SCHEMA
 
 @dataclass
 class PerformanceTrend:
@@ -40,66 +30,37 @@ class PerformanceTrend:
 class PerformanceDashboard:
     """Real-time performance monitoring dashboard"""
     
-    def __init__(self, db_path: str = "performance_metrics.db"):
+    def __init__(self, db_path: str = "performance_metrics.db", config_path: str = "performance_config.json",
+                 columnar_dir: Optional[str] = None):
         self.db_path = db_path
+        self.columnar_store = ColumnarMetricStore(columnar_dir) if columnar_dir else None
         self.alerts = []
         self.trends = []
+        self._write_listeners: List[Callable[[], None]] = []
         self.init_database()
+        if self.columnar_store is not None:
+            # Backfill rows recorded before the store existed or while it was not in use
+            self.columnar_store.import_from_sqlite(self.db_path)
+        self.alert_engine = AlertEngine.from_config(db_path, config_path)
+        self.alerts = self.alert_engine.get_active_alerts()
     
     def init_database(self):
         """Initialize SQLite database for performance metrics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create performance_metrics table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS performance_metrics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp REAL NOT NULL,
-                startup_time REAL NOT NULL,
-                memory_usage REAL NOT NULL,
-                battery_drain REAL NOT NULL,
-                ui_fps REAL NOT NULL,
-                network_latency REAL NOT NULL,
-                image_load_time REAL NOT NULL,
-                database_query_time REAL NOT NULL,
-                crash_rate REAL NOT NULL,
-                user_satisfaction REAL NOT NULL
-            )
-        ''')
-        
-        # Create performance_alerts table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS performance_alerts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                alert_id TEXT UNIQUE NOT NULL,
-                timestamp REAL NOT NULL,
-                alert_type TEXT NOT NULL,
-                severity TEXT NOT NULL,
-                message TEXT NOT NULL,
-                metric_name TEXT NOT NULL,
-                current_value REAL NOT NULL,
-                threshold_value REAL NOT NULL,
-                resolved BOOLEAN DEFAULT FALSE
-            )
-        ''')
-        
-        # Create performance_trends table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS performance_trends (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp REAL NOT NULL,
-                metric_name TEXT NOT NULL,
-                time_period TEXT NOT NULL,
-                current_value REAL NOT NULL,
-                previous_value REAL NOT NULL,
-                trend_direction TEXT NOT NULL,
-                change_percentage REAL NOT NULL
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        initialize_database(self.db_path, PERFORMANCE_SCHEMA)
+    
+    def _metric_row(self, metrics: Dict[str, float]) -> Dict[str, float]:
+        """Fill in defaults for metrics missing from a sample"""
+        return {
+            'startup_time': metrics.get('startup_time', 0.0),
+            'memory_usage': metrics.get('memory_usage', 0.0),
+            'battery_drain': metrics.get('battery_drain', 0.0),
+            'ui_fps': metrics.get('ui_fps', 60.0),
+            'network_latency': metrics.get('network_latency', 0.0),
+            'image_load_time': metrics.get('image_load_time', 0.0),
+            'database_query_time': metrics.get('database_query_time', 0.0),
+            'crash_rate': metrics.get('crash_rate', 0.0),
+            'user_satisfaction': metrics.get('user_satisfaction', 1.0)
+        }
     
     def record_performance_metric(self, metrics: Dict[str, float]):
         """Record performance metrics and check for alerts"""
@@ -107,98 +68,105 @@ class PerformanceDashboard:
         cursor = conn.cursor()
         
         timestamp = time.time()
+        row = self._metric_row(metrics)
         
         # Insert metrics
         cursor.execute('''
             INSERT INTO performance_metrics 
             (timestamp, startup_time, memory_usage, battery_drain, ui_fps, network_latency, image_load_time, database_query_time, crash_rate, user_satisfaction)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            timestamp,
-            metrics.get('startup_time', 0.0),
-            metrics.get('memory_usage', 0.0),
-            metrics.get('battery_drain', 0.0),
-            metrics.get('ui_fps', 60.0),
-            metrics.get('network_latency', 0.0),
-            metrics.get('image_load_time', 0.0),
-            metrics.get('database_query_time', 0.0),
-            metrics.get('crash_rate', 0.0),
-            metrics.get('user_satisfaction', 1.0)
-        ))
+        ''', (timestamp,) + tuple(row[name] for name in METRIC_COLUMNS))
         
+        last_rowid = cursor.lastrowid
         conn.commit()
         conn.close()
         
+        self._sync_columnar_store(last_rowid, [(timestamp, row)])
+        
         # Check for alerts
         self._check_performance_alerts(metrics)
         
         # Update trends
         self._update_performance_trends(metrics)
-    
-    def _check_performance_alerts(self, metrics: Dict[str, float]):
-        """Check for performance alerts based on thresholds"""
-        thresholds = {
-            'startup_time': {'critical': 5.0, 'warning': 3.0},
-            'memory_usage': {'critical': 200.0, 'warning': 150.0},
-            'battery_drain': {'critical': 8.0, 'warning': 5.0},
-            'ui_fps': {'critical': 30.0, 'warning': 45.0},
-            'network_latency': {'critical': 1000.0, 'warning': 500.0},
-            'image_load_time': {'critical': 3.0, 'warning': 2.0},
-            'crash_rate': {'critical': 5.0, 'warning': 2.0},
-            'user_satisfaction': {'critical': 0.5, 'warning': 0.7}
-        }
         
-        for metric_name, value in metrics.items():
-            if metric_name not in thresholds:
-                continue
-            
-            threshold = thresholds[metric_name]
-            
-            # Check critical threshold
-            if value >= threshold['critical']:
-                self._create_alert(metric_name, value, threshold['critical'], 'critical')
-            elif value >= threshold['warning']:
-                self._create_alert(metric_name, value, threshold['warning'], 'warning')
+        self._notify_write()
     
-    def _create_alert(self, metric_name: str, current_value: float, threshold_value: float, severity: str):
-        """Create a performance alert"""
-        alert_id = f"{metric_name}_{int(time.time())}"
-        
-        alert = PerformanceAlert(
-            alert_id=alert_id,
-            timestamp=time.time(),
-            alert_type="performance_threshold",
-            severity=severity,
-            message=f"{metric_name} exceeded {severity} threshold: {current_value:.2f} > {threshold_value:.2f}",
-            metric_name=metric_name,
-            current_value=current_value,
-            threshold_value=threshold_value
-        )
-        
-        # Store in database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def record_performance_metrics_batch(self, samples: List[Tuple[float, Dict[str, float]]]):
+        """Record many (timestamp, metrics) samples in one group commit
+
+        Alerts still see every sample in order; trends are updated once per
+        batch from the batch averages.
+        """
+        if not samples:
+            return
         
-        cursor.execute('''
-            INSERT OR REPLACE INTO performance_alerts 
-            (alert_id, timestamp, alert_type, severity, message, metric_name, current_value, threshold_value, resolved)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            alert.alert_id,
-            alert.timestamp,
-            alert.alert_type,
-            alert.severity,
-            alert.message,
-            alert.metric_name,
-            alert.current_value,
-            alert.threshold_value,
-            alert.resolved
-        ))
+        samples = sorted(samples, key=lambda sample: sample[0])
+        rows = [(timestamp, self._metric_row(metrics)) for timestamp, metrics in samples]
         
-        conn.commit()
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            conn.executemany('''
+                INSERT INTO performance_metrics 
+                (timestamp, startup_time, memory_usage, battery_drain, ui_fps, network_latency, image_load_time, database_query_time, crash_rate, user_satisfaction)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [(timestamp,) + tuple(row[name] for name in METRIC_COLUMNS) for timestamp, row in rows])
+            # The transaction holds SQLite's write lock, so the batch got consecutive ids
+            last_rowid = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
         conn.close()
         
-        self.alerts.append(alert)
+        self._sync_columnar_store(last_rowid, rows)
+        
+        changed = False
+        for timestamp, metrics in samples:
+            changed = bool(self.alert_engine.observe(metrics, now=timestamp)) or changed
+        if changed:
+            self.alerts = self.alert_engine.get_active_alerts()
+        
+        totals: Dict[str, List[float]] = {}
+        for _, metrics in samples:
+            for name, value in metrics.items():
+                totals.setdefault(name, []).append(value)
+        self._update_performance_trends({name: sum(values) / len(values) for name, values in totals.items()})
+        
+        self._notify_write()
+    
+    def _sync_columnar_store(self, last_rowid: int, rows: List[Tuple[float, Dict[str, float]]]):
+        """Mirror just-committed rows into the columnar store.
+
+        In-order rows are appended as they are; if another writer committed
+        in between or timestamps went backwards, the store re-reads SQLite.
+        """
+        if self.columnar_store is not None:
+            self.columnar_store.append_mirrored(
+                self.db_path, last_rowid,
+                np.array([timestamp for timestamp, _ in rows], dtype=np.float64),
+                {name: np.array([row[name] for _, row in rows], dtype=np.float64) for name in METRIC_COLUMNS}
+            )
+    
+    def _check_performance_alerts(self, metrics: Dict[str, float]):
+        """Feed metrics to the alert engine; only state transitions create alerts"""
+        if self.alert_engine.observe(metrics):
+            self.alerts = self.alert_engine.get_active_alerts()
+    
+    def acknowledge_alert(self, metric_name: str) -> Optional[PerformanceAlert]:
+        """Acknowledge the open alert for a metric"""
+        alert = self.alert_engine.acknowledge(metric_name)
+        self.alert_engine.flush()
+        if alert is not None:
+            self._notify_write()
+        return alert
+    
+    def flush_alerts(self):
+        """Persist any buffered alert state changes"""
+        self.alert_engine.flush()
+    
+    def add_write_listener(self, callback: Callable[[], None]):
+        """Call ``callback`` after every write, e.g. to invalidate cached aggregates"""
+        self._write_listeners.append(callback)
+    
+    def _notify_write(self):
+        for callback in self._write_listeners:
+            callback()
     
     def _update_performance_trends(self, metrics: Dict[str, float]):
         """Update performance trends"""
@@ -272,8 +240,84 @@ class PerformanceDashboard:
         conn.commit()
         conn.close()
     
-    def get_performance_summary(self) -> Dict[str, Any]:
-        """Get performance summary with current metrics and trends"""
+    def _load_metric_series(self, metric_names: List[str], start: float, end: float) -> Dict[str, np.ndarray]:
+        """Load metric columns for a time range, from the columnar store when enabled"""
+        if self.columnar_store is not None:
+            return self.columnar_store.range(start, end, columns=metric_names)
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute(f'''
+            SELECT timestamp, {", ".join(metric_names)}
+            FROM performance_metrics
+            WHERE timestamp >= ? AND timestamp < ?
+            ORDER BY timestamp
+        ''', (start, end))
+        
+        data = np.array(cursor.fetchall(), dtype=np.float64).reshape(-1, len(metric_names) + 1)
+        conn.close()
+        
+        series = {'timestamp': data[:, 0]}
+        for index, name in enumerate(metric_names, 1):
+            series[name] = data[:, index]
+        return series
+    
+    def get_metric_series(self, metric_names: List[str], hours: float = 24) -> Dict[str, np.ndarray]:
+        """Timestamps and values of the given metrics over the last ``hours``"""
+        end = time.time()
+        return self._load_metric_series(metric_names, end - hours * 3600, end)
+    
+    def get_metric_statistics(self, days: int = 7) -> Dict[str, Dict[str, float]]:
+        """Vectorized count/mean/min/max/percentiles for every metric"""
+        end = time.time()
+        start = end - days * 86400
+        
+        if self.columnar_store is not None:
+            return {name: self.columnar_store.aggregate(name, start, end) for name in METRIC_COLUMNS}
+        
+        series = self._load_metric_series(list(METRIC_COLUMNS), start, end)
+        statistics = {}
+        for name in METRIC_COLUMNS:
+            values = series[name]
+            if len(values) == 0:
+                statistics[name] = {"count": 0}
+                continue
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            statistics[name] = {
+                "count": int(len(values)),
+                "mean": float(values.mean()),
+                "min": float(values.min()),
+                "max": float(values.max()),
+                "std": float(values.std()),
+                "p50": float(p50),
+                "p95": float(p95),
+                "p99": float(p99)
+            }
+        return statistics
+    
+    def get_metric_correlation(self, metric_a: str, metric_b: str, days: int = 7) -> Optional[float]:
+        """Pearson correlation between two metrics, e.g. memory_usage vs ui_fps"""
+        end = time.time()
+        start = end - days * 86400
+        
+        if self.columnar_store is not None:
+            return self.columnar_store.correlation(metric_a, metric_b, start, end)
+        
+        series = self._load_metric_series([metric_a, metric_b], start, end)
+        if len(series[metric_a]) < 2:
+            return None
+        return float(np.corrcoef(series[metric_a], series[metric_b])[0, 1])
+    
+    def get_performance_summary(self, flush_alerts: bool = True) -> Dict[str, Any]:
+        """Get performance summary with current metrics and trends
+
+        Buffered alert changes are persisted first unless ``flush_alerts`` is
+        False; alerts opening or resolving are written at once either way.
+        """
+        if flush_alerts:
+            self.flush_alerts()
+        
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
@@ -404,117 +448,40 @@ class PerformanceDashboard:
         else:
             return "critical"
     
-    def generate_performance_charts(self) -> Dict[str, str]:
-        """Generate performance charts and save as files"""
+    def generate_performance_charts(self, dpi: int = 300, image_format: str = "png",
+                                    output_dir: str = ".") -> Dict[str, str]:
+        """Generate performance charts and save as files
+
+        Charts whose underlying series are unchanged since the last run are
+        served from the render cache instead of being redrawn.
+        """
         conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
         
         # Get performance data for last 7 days
-        df = pd.read_sql_query('''
-            SELECT * FROM performance_metrics 
+        cursor.execute('''
+            SELECT timestamp, startup_time, memory_usage, ui_fps, network_latency
+            FROM performance_metrics 
             WHERE timestamp > ? - 604800
             ORDER BY timestamp
-        ''', conn, params=(time.time(),))
+        ''', (time.time(),))
         
+        rows = cursor.fetchall()
         conn.close()
         
-        if df.empty:
+        if not rows:
             return {"error": "No performance data available"}
         
-        # Convert timestamp to datetime
-        df['datetime'] = pd.to_datetime(df['timestamp'], unit='s')
-        
-        charts = {}
-        
-        # Startup time chart
-        plt.figure(figsize=(12, 6))
-        plt.plot(df['datetime'], df['startup_time'], marker='o', linewidth=2)
-        plt.title('Startup Time Over Time', fontsize=16, fontweight='bold')
-        plt.xlabel('Time')
-        plt.ylabel('Startup Time (seconds)')
-        plt.grid(True, alpha=0.3)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig('startup_time_chart.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        charts['startup_time'] = 'startup_time_chart.png'
-        
-        # Memory usage chart
-        plt.figure(figsize=(12, 6))
-        plt.plot(df['datetime'], df['memory_usage'], marker='o', linewidth=2, color='orange')
-        plt.title('Memory Usage Over Time', fontsize=16, fontweight='bold')
-        plt.xlabel('Time')
-        plt.ylabel('Memory Usage (MB)')
-        plt.grid(True, alpha=0.3)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig('memory_usage_chart.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        charts['memory_usage'] = 'memory_usage_chart.png'
-        
-        # UI FPS chart
-        plt.figure(figsize=(12, 6))
-        plt.plot(df['datetime'], df['ui_fps'], marker='o', linewidth=2, color='green')
-        plt.title('UI Frame Rate Over Time', fontsize=16, fontweight='bold')
-        plt.xlabel('Time')
-        plt.ylabel('FPS')
-        plt.grid(True, alpha=0.3)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig('ui_fps_chart.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        charts['ui_fps'] = 'ui_fps_chart.png'
-        
-        # Network latency chart
-        plt.figure(figsize=(12, 6))
-        plt.plot(df['datetime'], df['network_latency'], marker='o', linewidth=2, color='red')
-        plt.title('Network Latency Over Time', fontsize=16, fontweight='bold')
-        plt.xlabel('Time')
-        plt.ylabel('Latency (ms)')
-        plt.grid(True, alpha=0.3)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig('network_latency_chart.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        charts['network_latency'] = 'network_latency_chart.png'
-        
-        # Combined performance chart
-        plt.figure(figsize=(15, 10))
-        
-        plt.subplot(2, 2, 1)
-        plt.plot(df['datetime'], df['startup_time'], marker='o', linewidth=2)
-        plt.title('Startup Time')
-        plt.ylabel('Seconds')
-        plt.xticks(rotation=45)
-        plt.grid(True, alpha=0.3)
-        
-        plt.subplot(2, 2, 2)
-        plt.plot(df['datetime'], df['memory_usage'], marker='o', linewidth=2, color='orange')
-        plt.title('Memory Usage')
-        plt.ylabel('MB')
-        plt.xticks(rotation=45)
-        plt.grid(True, alpha=0.3)
-        
-        plt.subplot(2, 2, 3)
-        plt.plot(df['datetime'], df['ui_fps'], marker='o', linewidth=2, color='green')
-        plt.title('UI Frame Rate')
-        plt.ylabel('FPS')
-        plt.xticks(rotation=45)
-        plt.grid(True, alpha=0.3)
-        
-        plt.subplot(2, 2, 4)
-        plt.plot(df['datetime'], df['network_latency'], marker='o', linewidth=2, color='red')
-        plt.title('Network Latency')
-        plt.ylabel('ms')
-        plt.xticks(rotation=45)
-        plt.grid(True, alpha=0.3)
-        
-        plt.suptitle('Performance Metrics Dashboard', fontsize=16, fontweight='bold')
-        plt.tight_layout()
-        plt.savefig('performance_dashboard.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        charts['dashboard'] = 'performance_dashboard.png'
-        
-        return charts
+        data = np.array(rows, dtype=np.float64)
+        series = {
+            'startup_time': data[:, 1],
+            'memory_usage': data[:, 2],
+            'ui_fps': data[:, 3],
+            'network_latency': data[:, 4]
+        }
+        
+        renderer = ChartRenderer(output_dir=output_dir, dpi=dpi, image_format=image_format)
+        return renderer.render(data[:, 0], series)
     
     def generate_performance_report(self) -> str:
         """Generate comprehensive performance report"""
@@ -403,7 +403,9 @@ class LazyGridView extends StatelessWidget {
         performance_monitor_file = utils_path / "performance_monitor.dart"
         
         performance_monitor_code = '''import 'dart:async';
+import 'dart:convert';
 import 'dart:developer' as developer;
+import 'dart:io';
 import 'package:flutter/foundation.dart';
 import 'package:flutter/scheduler.dart';
 
@@ -522,6 +524,74 @@ class PerformanceTracker {
   Duration get elapsed => _stopwatch.elapsed;
 }
 
+/// Batches metric samples and posts them to the metrics ingestion server
+/// (metrics_ingest_server.py). Does nothing until [configure] is called.
+class PerformanceReporter {
+  static Uri? _endpoint;
+  static String? _deviceId;
+  static Timer? _timer;
+  static int maxBatchSize = 100;
+  static int maxPendingSamples = 1000;
+  static final List<Map<String, dynamic>> _pending = [];
+  
+  /// Start reporting to e.g. Uri.parse('https://metrics.example.com/v1/samples')
+  static void configure(Uri endpoint, {String? deviceId, Duration flushInterval = const Duration(seconds: 30)}) {
+    _endpoint = endpoint;
+    _deviceId = deviceId;
+    _timer?.cancel();
+    _timer = Timer.periodic(flushInterval, (_) => flush());
+  }
+  
+  /// Queue one sample, e.g. {'startup_time': 2.1, 'memory_usage': 140.0}
+  static void record(Map<String, double> metrics) {
+    if (_endpoint == null) return;
+    
+    if (_pending.length >= maxPendingSamples) {
+      _pending.removeAt(0);
+    }
+    _pending.add({
+      'timestamp': DateTime.now().millisecondsSinceEpoch / 1000.0,
+      'metrics': metrics,
+    });
+    
+    if (_pending.length >= maxBatchSize) {
+      flush();
+    }
+  }
+  
+  /// Send pending samples; they are re-queued if the server applies backpressure
+  static Future<void> flush() async {
+    final endpoint = _endpoint;
+    if (endpoint == null || _pending.isEmpty) return;
+    
+    final batch = List<Map<String, dynamic>>.from(_pending.take(maxBatchSize * 10));
+    _pending.removeRange(0, batch.length);
+    
+    final client = HttpClient();
+    try {
+      // An explicit Content-Length keeps dart:io from sending the body chunked
+      final body = utf8.encode(jsonEncode({'device_id': _deviceId, 'samples': batch}));
+      final request = await client.postUrl(endpoint);
+      request.headers.contentType = ContentType.json;
+      request.contentLength = body.length;
+      request.add(body);
+      final response = await request.close();
+      await response.drain<void>();
+      
+      if (response.statusCode == 503) {
+        _pending.insertAll(0, batch.take(maxPendingSamples - _pending.length));
+      }
+    } catch (e) {
+      developer.log(
+        'Failed to report performance samples: ' + e.toString(),
+        name: 'PerformanceReporter',
+      );
+    } finally {
+      client.close();
+    }
+  }
+}
+
 /// Extension to easily track performance
 extension PerformanceTracking on Future<T> Function<T>() {
   Future<T> trackPerformance<T>(String operationName) async {
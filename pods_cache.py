@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Pods Cache
+Content-addressed snapshots of ios/Pods keyed by Podfile, Podfile.lock and CocoaPods version
+"""
+
+import os
+import sys
+import json
+import time
+import stat
+import shutil
+import hashlib
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "chatsy", "pods"
+)
+DEFAULT_KEEP = 5
+CHUNK_SIZE = 1 << 20
+FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+
+
+class PodsCacheError(ValueError):
+    """Raised when a snapshot cannot be taken or restored"""
+
+
+@dataclass
+class RestoreResult:
+    """Outcome of restoring Pods/ from a snapshot"""
+    key: str
+    files: int
+    cloned: int
+    copied: int
+    duration: float
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+_clonefile = None
+
+
+def _clone(source: str, destination: str) -> bool:
+    """Copy-on-write clone (APFS, Btrfs, XFS); False if the filesystem can't, leaving no destination"""
+    global _clonefile
+    try:
+        if sys.platform == "darwin":
+            if _clonefile is None:
+                import ctypes
+                _clonefile = ctypes.CDLL(None, use_errno=True).clonefile
+            return _clonefile(os.fsencode(source), os.fsencode(destination), 0) == 0
+        if sys.platform.startswith("linux"):
+            import fcntl
+            with open(source, 'rb') as src, open(destination, 'wb') as dst:
+                try:
+                    fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                    return True
+                except OSError:
+                    pass
+            os.unlink(destination)
+    except (OSError, AttributeError):
+        pass
+    return False
+
+
+def cache_key(ios_path: Union[str, Path], cocoapods_version: str) -> str:
+    """Snapshot key: hash of Podfile, Podfile.lock and the CocoaPods version.
+
+    Raises FileNotFoundError when either file is missing, since without a
+    lockfile there is nothing to pin the snapshot to.
+    """
+    ios_path = Path(ios_path)
+    digest = hashlib.sha256()
+    for name in ("Podfile", "Podfile.lock"):
+        digest.update(name.encode() + b"\0")
+        digest.update((ios_path / name).read_bytes())
+        digest.update(b"\0")
+    digest.update(cocoapods_version.strip().encode())
+    return digest.hexdigest()
+
+
+class PodsCache:
+    """Local content-addressed store of Pods/ trees.
+
+    Every file is stored once under objects/ by its sha256 (plus an ``x``
+    suffix when executable) and each snapshot is a manifest of path ->
+    object. Objects are read-only and restored as reflink clones where the
+    filesystem supports them, plain copies otherwise, never as hardlinks:
+    `pod install` and Xcode rewrite files inside Pods/ in place, and a
+    shared inode would carry those edits back into the cache.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = Path(cache_dir or os.environ.get("CHATSY_PODS_CACHE") or DEFAULT_CACHE_DIR)
+        self.objects_dir = self.cache_dir / "objects"
+        self.snapshots_dir = self.cache_dir / "snapshots"
+
+    def _manifest_path(self, key: str) -> Path:
+        return self.snapshots_dir / f"{key}.json"
+
+    def _object_path(self, digest: str, executable: bool) -> Path:
+        return self.objects_dir / digest[:2] / (digest[2:] + (".x" if executable else ""))
+
+    def has(self, key: str) -> bool:
+        return self._manifest_path(key).exists()
+
+    def manifest(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._manifest_path(key), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, source: str, digest: str, executable: bool) -> os.stat_result:
+        target = self._object_path(digest, executable)
+        # An existing object is only reused once its content is re-hashed:
+        # anything that wrote to it since must not leak into this snapshot
+        if target.exists() and _file_digest(str(target)) == digest:
+            return target.stat()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        shutil.copyfile(source, tmp_path)
+        os.chmod(tmp_path, 0o555 if executable else 0o444)
+        os.replace(tmp_path, target)
+        return target.stat()
+
+    def snapshot(self, ios_path: Union[str, Path], key: str) -> Dict:
+        """Store ios/Pods under ``key`` and return its manifest"""
+        pods_dir = Path(ios_path) / "Pods"
+        if not (pods_dir / "Manifest.lock").exists():
+            raise PodsCacheError(f"{pods_dir} has no Manifest.lock; run pod install first")
+
+        files, symlinks, directories = {}, {}, []
+        total_bytes = 0
+        for root, dirnames, filenames in os.walk(pods_dir):
+            relative_root = os.path.relpath(root, pods_dir)
+            for name in list(dirnames):
+                path = os.path.join(root, name)
+                if os.path.islink(path):
+                    # os.walk does not descend into links; record them like files
+                    symlinks[os.path.normpath(os.path.join(relative_root, name))] = os.readlink(path)
+                    dirnames.remove(name)
+                else:
+                    directories.append(os.path.normpath(os.path.join(relative_root, name)))
+            for name in filenames:
+                path = os.path.join(root, name)
+                relative = os.path.normpath(os.path.join(relative_root, name))
+                if os.path.islink(path):
+                    symlinks[relative] = os.readlink(path)
+                    continue
+                mode = os.stat(path).st_mode
+                if not stat.S_ISREG(mode):
+                    continue
+                digest = _file_digest(path)
+                executable = bool(mode & stat.S_IXUSR)
+                stored = self._store(path, digest, executable)
+                files[relative] = [digest, executable, stored.st_size, stored.st_mtime_ns]
+                total_bytes += stored.st_size
+
+        manifest = {
+            "key": key,
+            "created_at": time.time(),
+            "directories": sorted(directories),
+            "files": files,
+            "symlinks": symlinks,
+            "total_bytes": total_bytes
+        }
+        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._manifest_path(key).with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, sort_keys=True)
+        os.replace(tmp_path, self._manifest_path(key))
+        return manifest
+
+    def restore(self, ios_path: Union[str, Path], key: str, deep_verify: bool = False) -> RestoreResult:
+        """Rebuild ios/Pods from the snapshot for ``key``.
+
+        The tree is assembled next to Pods/ and swapped in only after it
+        verifies: every object is present with its recorded size and mtime
+        (and hash, with ``deep_verify``) and Pods/Manifest.lock matches Podfile.lock,
+        which is the same check CocoaPods' build phase performs. On any
+        failure Pods/ is left untouched, the snapshot is dropped and
+        PodsCacheError is raised.
+        """
+        started = time.perf_counter()
+        ios_path = Path(ios_path)
+        manifest = self.manifest(key)
+        if manifest is None:
+            raise PodsCacheError(f"No snapshot for key {key[:12]}")
+
+        staging = ios_path / f"Pods.restore-{os.getpid()}"
+        if staging.exists():
+            shutil.rmtree(staging)
+        cloned = copied = 0
+        try:
+            staging.mkdir()
+            for directory in manifest["directories"]:
+                (staging / directory).mkdir(parents=True, exist_ok=True)
+            for relative, (digest, executable, size, mtime_ns) in manifest["files"].items():
+                source = self._object_path(digest, executable)
+                try:
+                    source_stat = source.stat()
+                except FileNotFoundError:
+                    raise PodsCacheError(f"Missing object for {relative}")
+                if (source_stat.st_size, source_stat.st_mtime_ns) != (size, mtime_ns) \
+                        or (deep_verify and _file_digest(str(source)) != digest):
+                    # The object no longer holds its digest; the next snapshot re-stores it
+                    source.unlink()
+                    raise PodsCacheError(f"Object for {relative} was modified after it was cached")
+                destination = staging / relative
+                if _clone(str(source), str(destination)):
+                    cloned += 1
+                else:
+                    shutil.copyfile(source, destination)
+                    copied += 1
+                os.chmod(destination, 0o755 if executable else 0o644)
+            for relative, target in manifest["symlinks"].items():
+                os.symlink(target, staging / relative)
+
+            lockfile = (ios_path / "Podfile.lock").read_bytes()
+            if (staging / "Manifest.lock").read_bytes() != lockfile:
+                raise PodsCacheError("Restored Manifest.lock does not match Podfile.lock")
+        except (OSError, PodsCacheError) as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            self.drop(key)
+            raise e if isinstance(e, PodsCacheError) else PodsCacheError(f"Restore failed: {e}")
+
+        pods_dir = ios_path / "Pods"
+        if pods_dir.is_symlink() or pods_dir.is_file():
+            pods_dir.unlink()
+        elif pods_dir.exists():
+            shutil.rmtree(pods_dir)
+        os.replace(staging, pods_dir)
+        return RestoreResult(key=key, files=len(manifest["files"]), cloned=cloned, copied=copied,
+                             duration=time.perf_counter() - started)
+
+    def drop(self, key: str):
+        """Forget one snapshot; its objects go on the next prune"""
+        try:
+            self._manifest_path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def snapshots(self) -> List[Dict]:
+        """Manifests, newest first"""
+        manifests = []
+        for path in self.snapshots_dir.glob("*.json"):
+            manifest = self.manifest(path.stem)
+            if manifest is not None:
+                manifests.append(manifest)
+        return sorted(manifests, key=lambda m: m.get("created_at", 0), reverse=True)
+
+    def prune(self, keep: int = DEFAULT_KEEP) -> Dict[str, int]:
+        """Keep the newest ``keep`` snapshots and delete unreferenced objects"""
+        manifests = self.snapshots()
+        for manifest in manifests[keep:]:
+            self.drop(manifest["key"])
+
+        referenced = set()
+        for manifest in manifests[:keep]:
+            for digest, executable, *_ in manifest["files"].values():
+                referenced.add(self._object_path(digest, executable))
+
+        removed = freed = 0
+        if self.objects_dir.exists():
+            for path in self.objects_dir.glob("*/*"):
+                if path not in referenced:
+                    freed += path.stat().st_size
+                    path.unlink()
+                    removed += 1
+        return {"snapshots_dropped": max(0, len(manifests) - keep), "objects_removed": removed, "bytes_freed": freed}
+
+    def clear(self):
+        """Delete the whole cache"""
+        if self.cache_dir.exists():
+            shutil.rmtree(self.cache_dir)
+
+
+def main():
+    """Inspect, snapshot, restore or prune the Pods cache"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Content-addressed cache of ios/Pods")
+    parser.add_argument("command", choices=["list", "snapshot", "restore", "prune", "clear"])
+    parser.add_argument("--ios-path", default="ios", help="Directory containing Podfile (default: ios)")
+    parser.add_argument("--cocoapods-version", help="Override the detected CocoaPods version")
+    parser.add_argument("--keep", type=int, default=DEFAULT_KEEP, help="Snapshots kept by prune")
+    args = parser.parse_args()
+
+    cache = PodsCache()
+    if args.command == "list":
+        for manifest in cache.snapshots():
+            created = time.strftime("%Y-%m-%d %H:%M", time.localtime(manifest["created_at"]))
+            print(f"📦 {manifest['key'][:12]}  {created}  {len(manifest['files']):,} files  "
+                  f"{manifest['total_bytes'] / 1024 / 1024:.1f} MB")
+        return
+    if args.command == "prune":
+        stats = cache.prune(args.keep)
+        print(f"🧹 Dropped {stats['snapshots_dropped']} snapshots, removed {stats['objects_removed']} objects "
+              f"({stats['bytes_freed'] / 1024 / 1024:.1f} MB)")
+        return
+    if args.command == "clear":
+        cache.clear()
+        print(f"🗑️  Cleared {cache.cache_dir}")
+        return
+
+    version = args.cocoapods_version
+    if version is None:
+        from toolchain_probe import shared_probe
+        version = shared_probe().cocoapods_version()
+    try:
+        key = cache_key(args.ios_path, version)
+        if args.command == "snapshot":
+            manifest = cache.snapshot(args.ios_path, key)
+            print(f"📸 Snapshot {key[:12]}: {len(manifest['files']):,} files")
+        else:
+            result = cache.restore(args.ios_path, key)
+            print(f"✅ Restored {result.files:,} files from {key[:12]} in {result.duration:.2f}s "
+                  f"({result.cloned} cloned, {result.copied} copied)")
+    except (OSError, PodsCacheError) as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,12 @@ Setup and installation script for the iOS deployment specialist
 
 import os
 import sys
-import subprocess
-import shutil
 from pathlib import Path
 
+from command_runner import CommandRunner
+
+PIP_TIMEOUT = 900
+
 def setup_xcode_deploy_bot():
     """Setup XCodeDeployBot system"""
     print("🚀 Setting up XCodeDeployBot - iOS Deployment Specialist")
@@ -24,12 +26,14 @@ def setup_xcode_deploy_bot():
     
     # Install required packages
     print("\n📦 Installing required packages...")
-    try:
-        subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], 
-                      check=True)
-        print("✅ Required packages installed successfully")
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Failed to install packages: {e}")
+    result = CommandRunner(echo=True).run(
+        [sys.executable, "-m", "pip", "install", "-r", "requirements.txt"],
+        timeout=PIP_TIMEOUT, label="pip install"
+    )
+    if result.ok:
+        print(f"✅ Required packages installed successfully ({result.wall_time:.0f}s)")
+    else:
+        print(f"❌ Failed to install packages: {result.error or f'exit code {result.returncode}'}")
         sys.exit(1)
     
     # Create necessary directories
@@ -6,10 +6,26 @@ Setup and installation script for the AppPerformanceBot system
 
 import os
 import sys
-import subprocess
 import json
 from pathlib import Path
 
+from command_runner import CommandRunner
+
+PIP_TIMEOUT = 900
+
+# Alert thresholds shared by the config file and the dashboard alert engine.
+# For metrics where lower is worse (ui_fps, user_satisfaction) critical < warning.
+DEFAULT_ALERT_THRESHOLDS = {
+    "startup_time": {"warning": 3.0, "critical": 5.0},
+    "memory_usage": {"warning": 150.0, "critical": 200.0},
+    "battery_drain": {"warning": 5.0, "critical": 8.0},
+    "ui_fps": {"warning": 45.0, "critical": 30.0},
+    "network_latency": {"warning": 500.0, "critical": 1000.0},
+    "image_load_time": {"warning": 2.0, "critical": 3.0},
+    "crash_rate": {"warning": 2.0, "critical": 5.0},
+    "user_satisfaction": {"warning": 0.7, "critical": 0.5}
+}
+
 def check_python_version():
     """Check if Python version is compatible"""
     if sys.version_info < (3, 8):
@@ -32,13 +48,15 @@ def install_requirements():
         "pyyaml>=6.0"
     ]
     
+    runner = CommandRunner(echo=True)
     for requirement in requirements:
-        try:
-            print(f"   Installing {requirement}...")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", requirement])
-            print(f"   ✅ {requirement} installed successfully")
-        except subprocess.CalledProcessError as e:
-            print(f"   ❌ Failed to install {requirement}: {e}")
+        print(f"   Installing {requirement}...")
+        result = runner.run([sys.executable, "-m", "pip", "install", requirement],
+                            timeout=PIP_TIMEOUT, label=f"pip install {requirement}")
+        if result.ok:
+            print(f"   ✅ {requirement} installed successfully ({result.wall_time:.0f}s)")
+        else:
+            print(f"   ❌ Failed to install {requirement}: {result.error or f'exit code {result.returncode}'}")
             return False
     
     return True
@@ -76,14 +94,11 @@ def create_performance_config(project_path: str):
         "performance_monitoring": {
             "enabled": True,
             "interval_seconds": 30,
-            "alert_thresholds": {
-                "startup_time": {"warning": 3.0, "critical": 5.0},
-                "memory_usage": {"warning": 150.0, "critical": 200.0},
-                "battery_drain": {"warning": 5.0, "critical": 8.0},
-                "ui_fps": {"warning": 45.0, "critical": 30.0},
-                "network_latency": {"warning": 500.0, "critical": 1000.0},
-                "crash_rate": {"warning": 2.0, "critical": 5.0}
-            }
+            "alert_thresholds": DEFAULT_ALERT_THRESHOLDS,
+            "alert_hysteresis": 0.1,
+            "alert_cooldown_seconds": 300,
+            "alert_flush_batch_size": 50,
+            "alert_flush_interval_seconds": 30
         },
         "optimization_settings": {
             "startup_optimization": True,
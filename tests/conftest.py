@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The bots are flat top-level modules; make them importable from tests/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
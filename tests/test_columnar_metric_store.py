@@ -0,0 +1,72 @@
+import time
+import sqlite3
+
+from columnar_metric_store import ColumnarMetricStore, METRIC_COLUMNS
+from performance_dashboard import PerformanceDashboard
+
+
+def _insert(db_path, timestamp, memory_usage):
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute(
+            f"INSERT INTO performance_metrics (timestamp, {', '.join(METRIC_COLUMNS)}) VALUES (?{', ?' * len(METRIC_COLUMNS)})",
+            (timestamp,) + tuple(memory_usage if name == "memory_usage" else 0.0 for name in METRIC_COLUMNS)
+        )
+    conn.close()
+
+
+def test_dashboard_backfills_store_on_open(tmp_path):
+    db_path = str(tmp_path / "metrics.db")
+    PerformanceDashboard(db_path, str(tmp_path / "config.json"))
+    for i in range(3):
+        _insert(db_path, 100.0 + i, 50.0 + i)
+
+    dashboard = PerformanceDashboard(db_path, str(tmp_path / "config.json"), columnar_dir=str(tmp_path / "columns"))
+    assert len(dashboard.columnar_store) == 3
+    assert dashboard.columnar_store.aggregate("memory_usage")["max"] == 52.0
+
+
+def test_out_of_order_rows_are_merged(tmp_path):
+    db_path = str(tmp_path / "metrics.db")
+    dashboard = PerformanceDashboard(db_path, str(tmp_path / "config.json"), columnar_dir=str(tmp_path / "columns"))
+    dashboard.record_performance_metrics_batch([(200.0, {"memory_usage": 10.0}), (300.0, {"memory_usage": 30.0})])
+    dashboard.record_performance_metrics_batch([(250.0, {"memory_usage": 20.0})])
+
+    data = dashboard.columnar_store.range(columns=["memory_usage"])
+    assert list(data["timestamp"]) == [200.0, 250.0, 300.0]
+    assert list(data["memory_usage"]) == [10.0, 20.0, 30.0]
+
+
+def test_reader_sees_rows_from_another_writer(tmp_path):
+    db_path = str(tmp_path / "metrics.db")
+    PerformanceDashboard(db_path, str(tmp_path / "config.json"))
+    reader = ColumnarMetricStore(str(tmp_path / "columns"))
+    writer = ColumnarMetricStore(str(tmp_path / "columns"))
+    _insert(db_path, 100.0, 42.0)
+    writer.import_from_sqlite(db_path)
+
+    assert reader.aggregate("memory_usage")["count"] == 1
+
+
+def test_in_order_writes_append_without_reading_sqlite(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "metrics.db")
+    dashboard = PerformanceDashboard(db_path, str(tmp_path / "config.json"), columnar_dir=str(tmp_path / "columns"))
+    dashboard.record_performance_metric({"memory_usage": 10.0})
+
+    imports = []
+    monkeypatch.setattr(dashboard.columnar_store, "_import", lambda *args: imports.append(args))
+    dashboard.record_performance_metric({"memory_usage": 20.0})
+    dashboard.record_performance_metrics_batch([(time.time() + 1, {"memory_usage": 30.0}),
+                                                (time.time() + 2, {"memory_usage": 40.0})])
+    assert imports == []
+    assert list(dashboard.columnar_store.range(columns=["memory_usage"])["memory_usage"]) == [10.0, 20.0, 30.0, 40.0]
+
+
+def test_rows_from_another_writer_trigger_a_resync(tmp_path):
+    db_path = str(tmp_path / "metrics.db")
+    dashboard = PerformanceDashboard(db_path, str(tmp_path / "config.json"), columnar_dir=str(tmp_path / "columns"))
+    dashboard.record_performance_metrics_batch([(100.0, {"memory_usage": 10.0})])
+    _insert(db_path, 150.0, 15.0)
+    dashboard.record_performance_metrics_batch([(200.0, {"memory_usage": 20.0})])
+
+    assert list(dashboard.columnar_store.range(columns=["memory_usage"])["memory_usage"]) == [10.0, 15.0, 20.0]
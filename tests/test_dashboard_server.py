@@ -0,0 +1,29 @@
+from dashboard_server import DashboardServer
+from performance_dashboard import PerformanceDashboard
+
+
+def test_snapshot_includes_alerts_from_other_processes(tmp_path):
+    db_path = str(tmp_path / "metrics.db")
+    config_path = str(tmp_path / "config.json")
+    server = DashboardServer(PerformanceDashboard(db_path, config_path))
+    assert server._compute_snapshot()["alerts"] == []
+
+    # Stands in for a separately run ingest server writing to the same database
+    writer = PerformanceDashboard(db_path, config_path)
+    writer.record_performance_metric({"memory_usage": 500.0})
+    writer.flush_alerts()
+
+    alerts = server._compute_snapshot()["alerts"]
+    assert [alert["metric_name"] for alert in alerts] == ["memory_usage"]
+    assert alerts[0]["severity"] == "critical"
+
+
+def test_snapshot_does_not_write(tmp_path):
+    db_path = str(tmp_path / "metrics.db")
+    dashboard = PerformanceDashboard(db_path, str(tmp_path / "config.json"))
+    dashboard.record_performance_metric({"memory_usage": 500.0})
+    dashboard.record_performance_metric({"memory_usage": 160.0})  # buffered de-escalation
+    server = DashboardServer(dashboard)
+
+    server._compute_snapshot()
+    assert dashboard.alert_engine._pending
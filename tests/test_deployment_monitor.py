@@ -0,0 +1,48 @@
+import pytest
+
+import deployment_monitor
+from deployment_monitor import BuildMetrics, DeploymentMonitor, HEALTH_MEMO_TTL_SECONDS
+
+
+def test_health_memo_expires_as_window_moves(tmp_path, monkeypatch):
+    now = 1_800_000_000.0
+    monkeypatch.setattr(deployment_monitor.time, "time", lambda: now)
+    monitor = DeploymentMonitor(str(tmp_path / "deploy.db"))
+    monitor.record_build_metric(BuildMetrics(now - 86400 + 1.5 * HEALTH_MEMO_TTL_SECONDS, "b1", "success",
+                                             60.0, None, None, None, None))
+    assert monitor.calculate_deployment_health(days=1).success_rate == 1.0
+
+    # No new builds, but the only one has left the 1-day window
+    now += 3 * HEALTH_MEMO_TTL_SECONDS
+    assert monitor.calculate_deployment_health(days=1).success_rate == 0.0
+
+
+def test_health_is_memoized_within_a_bucket(tmp_path, monkeypatch):
+    now = 1_800_000_000.0
+    monkeypatch.setattr(deployment_monitor.time, "time", lambda: now)
+    monitor = DeploymentMonitor(str(tmp_path / "deploy.db"))
+    monitor.record_build_metric(BuildMetrics(now, "b1", "success", 60.0, None, None, None, None))
+    health = monitor.calculate_deployment_health()
+    now += HEALTH_MEMO_TTL_SECONDS / 4
+    assert monitor.calculate_deployment_health() is health
+
+
+def test_json_export_header_matches_exported_rows(tmp_path):
+    import json
+
+    monitor = DeploymentMonitor(str(tmp_path / "deploy.db"))
+    monitor.record_build_metric(BuildMetrics(1000.0, "old", "success", 10.0, None, None, None, None))
+    monitor.record_build_metric(BuildMetrics(2000.0, "new", "failed", 20.0, "signing", None, None, None))
+    path = monitor.export_metrics("json", since=1500.0, output_path=str(tmp_path / "export.json"))
+
+    with open(path) as f:
+        exported = json.load(f)
+    assert [row["build_id"] for row in exported["metrics"]] == ["new"]
+    assert exported["health"]["success_rate"] == 0.0
+    assert exported["health"]["common_errors"] == {"signing": 1}
+
+
+def test_incremental_export_rejects_time_bounds(tmp_path):
+    monitor = DeploymentMonitor(str(tmp_path / "deploy.db"))
+    with pytest.raises(ValueError):
+        monitor.export_metrics("ndjson", incremental=True, since=1500.0, output_path=str(tmp_path / "export.ndjson"))
@@ -0,0 +1,64 @@
+import shutil
+
+from fix_planner import FixPlanner, FixStep
+
+
+def _planner(tmp_path, calls):
+    project = tmp_path / "project"
+    (project / "ios").mkdir(parents=True)
+    (project / "ios" / "Podfile").write_text("platform :ios\n")
+
+    def install():
+        calls.append("cocoapods")
+        (project / "ios" / "Pods").mkdir(exist_ok=True)
+        (project / "ios" / "Pods" / "Manifest.lock").write_text("PODS: [A]\n")
+        return {"fixes_applied": ["installed"], "errors": [], "success": True}
+
+    step = FixStep("cocoapods", install, inputs=["ios/Podfile"], outputs=["ios/Pods/Manifest.lock"])
+    return project, FixPlanner(str(project), [step], db_path=str(tmp_path / "fix.db"))
+
+
+def test_unchanged_step_is_skipped(tmp_path):
+    calls = []
+    _, planner = _planner(tmp_path, calls)
+    planner.execute()
+    result = planner.execute()["cocoapods"]
+    assert calls == ["cocoapods"]
+    assert result["skipped"] and result["success"]
+
+
+def test_missing_output_reruns_step(tmp_path):
+    calls = []
+    project, planner = _planner(tmp_path, calls)
+    planner.execute()
+    shutil.rmtree(project / "ios" / "Pods")
+
+    assert planner.plan().steps["cocoapods"].will_run
+    result = planner.execute()["cocoapods"]
+    assert calls == ["cocoapods", "cocoapods"]
+    assert not result["skipped"]
+    assert (project / "ios" / "Pods" / "Manifest.lock").exists()
+
+
+def test_force_runs_unchanged_step(tmp_path):
+    calls = []
+    _, planner = _planner(tmp_path, calls)
+    planner.execute()
+    planner.execute(force=True)
+    assert calls == ["cocoapods", "cocoapods"]
+
+
+def test_reader_of_an_output_runs_after_its_writer(tmp_path):
+    order = []
+    project = tmp_path / "project"
+    project.mkdir()
+    steps = [
+        FixStep("cocoapods", lambda: order.append("cocoapods") or {"success": True},
+                inputs=["pubspec.lock"]),
+        FixStep("flutter", lambda: order.append("flutter") or {"success": True},
+                inputs=["pubspec.yaml"], outputs=["pubspec.lock"])
+    ]
+    planner = FixPlanner(str(project), steps, db_path=str(tmp_path / "fix.db"))
+    assert planner.plan().steps["cocoapods"].depends_on == ["flutter"]
+    planner.execute()
+    assert order == ["flutter", "cocoapods"]
@@ -0,0 +1,69 @@
+from gradle_build_analyzer import EXECUTED, FROM_CACHE, UP_TO_DATE, GradleBuildAnalyzer
+
+PROFILE = """<html><body>
+<h1>Profiled build: assembleRelease</h1>
+<h2>Summary</h2>
+<table><tr><td>Total Build Time</td><td>1m4.50s</td></tr></table>
+<h2>Task Execution</h2>
+<table>
+<tr><td>:app</td><td>40.000s</td><td>(total)</td></tr>
+<tr><td>:app:compileReleaseKotlin</td><td>30.000s</td><td></td></tr>
+<tr><td>:app:minifyReleaseWithR8</td><td>8.000s</td><td></td></tr>
+<tr><td>:app:mergeReleaseResources</td><td>1.500s</td><td>FROM-CACHE</td></tr>
+<tr><td>:app:preBuild</td><td>0.001s</td><td>UP-TO-DATE</td></tr>
+</table>
+</body></html>
+"""
+
+LOG = """> Task :app:preBuild UP-TO-DATE
+> Task :app:mergeReleaseResources FROM-CACHE
+> Task :app:compileReleaseKotlin FROM-CACHE
+> Task :app:minifyReleaseWithR8
+
+BUILD SUCCESSFUL in 1m 5s
+4 actionable tasks: 1 executed, 1 up-to-date, 2 from cache
+"""
+
+
+def test_empty_profile_result_is_executed(tmp_path):
+    profile = tmp_path / "profile.html"
+    profile.write_text(PROFILE)
+    report = GradleBuildAnalyzer().parse_profile_report(str(profile), "b1")
+
+    outcomes = {task.name: task.outcome for task in report.tasks}
+    assert outcomes["compileReleaseKotlin"] == EXECUTED
+    assert outcomes["mergeReleaseResources"] == FROM_CACHE
+    assert report.outcome_counts() == {EXECUTED: 2, FROM_CACHE: 1, UP_TO_DATE: 1}
+    assert report.cache_hit_rate == 1 / 3
+
+
+def test_analyze_keeps_log_outcomes(tmp_path):
+    profile = tmp_path / "profile.html"
+    profile.write_text(PROFILE)
+    log = tmp_path / "build.log"
+    log.write_text(LOG)
+    report = GradleBuildAnalyzer().analyze("b1", profile_path=str(profile), log_path=str(log))
+
+    assert report.status == "success"
+    assert report.outcome_counts() == {EXECUTED: 1, FROM_CACHE: 2, UP_TO_DATE: 1}
+    assert report.cache_hit_rate == 2 / 3
+    assert report.slowest_tasks(1)[0].duration == 30.0
+
+
+def test_recorded_profile_keeps_phase_totals_apart_from_tasks(tmp_path):
+    from deployment_monitor import DeploymentMonitor
+    from gradle_build_analyzer import GradleBuildReport, GradleTask
+
+    report = GradleBuildReport("b1", configuration_time=10.0, task_execution_time=40.0,
+                               tasks=[GradleTask(":app:compileReleaseKotlin", EXECUTED, 30.0),
+                                      GradleTask(":app:mergeReleaseResources", UP_TO_DATE, 10.0)],
+                               source="gradle_profile")
+    monitor = DeploymentMonitor(str(tmp_path / "deploy.db"))
+    monitor.record_build_profile(report.to_build_profile())
+
+    phases = {(row["source"], row["key"]): row["share"] for row in monitor.rank_build_phases()}
+    assert phases[("gradle_profile", "compileReleaseKotlin")] == 0.75
+    assert ("gradle_profile", "Task Execution") not in phases
+    assert phases[("gradle_profile_summary", "Task Execution")] == 0.8
+    assert monitor.rank_build_phases(group_by="script") == []
+    assert {t.outcome for t in monitor.get_build_profile("b1").timings if t.target} == {EXECUTED, UP_TO_DATE}
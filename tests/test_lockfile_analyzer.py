@@ -0,0 +1,41 @@
+import json
+
+from lockfile_analyzer import LockfileAnalyzer
+
+
+def _lock(path, foo_version):
+    path.write_text(
+        "packages:\n"
+        f"  foo:\n    dependency: \"direct main\"\n    source: hosted\n    version: \"{foo_version}\"\n"
+        "  bar:\n    dependency: transitive\n    source: hosted\n    version: \"1.0.0\"\n"
+        "  baz:\n    dependency: transitive\n    source: hosted\n    version: \"1.0.0\"\n"
+    )
+
+
+def _cached_package(pub_cache, name, version, dependencies):
+    root = pub_cache / "hosted" / "pub.dev" / f"{name}-{version}"
+    root.mkdir(parents=True)
+    root.joinpath("pubspec.yaml").write_text(
+        f"name: {name}\ndependencies:\n" + "".join(f"  {dependency}: any\n" for dependency in dependencies)
+    )
+    return root
+
+
+def test_old_lockfile_resolves_its_own_versions(tmp_path):
+    pub_cache = tmp_path / "pub-cache"
+    _cached_package(pub_cache, "foo", "1.0.0", ["bar"])
+    current = _cached_package(pub_cache, "foo", "2.0.0", ["baz"])
+
+    project = tmp_path / "app"
+    (project / ".dart_tool").mkdir(parents=True)
+    (project / ".dart_tool" / "package_config.json").write_text(
+        json.dumps({"packages": [{"name": "foo", "rootUri": current.as_uri()}]})
+    )
+    old_lock = tmp_path / "old.lock"
+    _lock(old_lock, "1.0.0")
+
+    # The project's package_config.json points at foo 2.0.0
+    assert LockfileAnalyzer(str(project), str(pub_cache)).load(str(old_lock)).packages["foo"].dependencies == ["baz"]
+
+    graph = LockfileAnalyzer(str(project), str(pub_cache), locked_versions_only=True).load(str(old_lock))
+    assert graph.packages["foo"].dependencies == ["bar"]
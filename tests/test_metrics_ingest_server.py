@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+import pytest
+
+from metrics_ingest_server import HTTPError, parse_statsd_datagram, read_http_request
+
+
+def _read(raw: bytes):
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        first = await read_http_request(reader)
+        second = await read_http_request(reader)
+        return first, second
+    return asyncio.run(run())
+
+
+def _chunked(body: bytes, size: int = 7) -> bytes:
+    chunks = b"".join(b"%x\r\n%s\r\n" % (len(body[i:i + size]), body[i:i + size])
+                      for i in range(0, len(body), size))
+    return chunks + b"0\r\n\r\n"
+
+
+def test_chunked_post_is_decoded_and_connection_stays_in_sync():
+    body = json.dumps({"samples": [{"timestamp": 1, "metrics": {"ui_fps": 58.0}}]}).encode()
+    raw = (b"POST /v1/samples HTTP/1.1\r\nHost: x\r\nTransfer-Encoding: chunked\r\n\r\n"
+           + _chunked(body)
+           + b"GET /healthz HTTP/1.1\r\nHost: x\r\n\r\n")
+    request, following = _read(raw)
+    assert request.body == body
+    assert following.method == "GET" and following.path == "/healthz"
+
+
+def test_content_length_post():
+    raw = b"POST /v1/samples HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}"
+    request, following = _read(raw)
+    assert request.body == b"{}"
+    assert following is None
+
+
+def test_unsupported_transfer_encoding_is_rejected():
+    raw = b"POST /v1/samples HTTP/1.1\r\nTransfer-Encoding: gzip, chunked\r\n\r\n"
+    with pytest.raises(HTTPError) as error:
+        _read(raw)
+    assert error.value.status == 501
+
+
+def test_statsd_datagram_gauges_form_one_sample():
+    samples = parse_statsd_datagram(b"ui_fps:58|g\nmemory_usage:120|g\nbogus:1|g\nui_fps:55|g\n")
+    assert samples == [{"ui_fps": 58.0, "memory_usage": 120.0}, {"ui_fps": 55.0}]
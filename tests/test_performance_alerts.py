@@ -0,0 +1,66 @@
+import time
+
+from performance_alerts import AlertEngine, AlertThreshold, load_open_alerts
+from metrics_storage import initialize_database, PERFORMANCE_SCHEMA
+
+
+def _engine(tmp_path):
+    db_path = str(tmp_path / "metrics.db")
+    initialize_database(db_path, PERFORMANCE_SCHEMA)
+    thresholds = {"memory_usage": AlertThreshold("memory_usage", 150.0, 200.0)}
+    return db_path, AlertEngine(db_path, thresholds, cooldown_seconds=0.0, flush_interval_seconds=3600.0)
+
+
+def test_open_and_resolve_are_persisted_without_flush(tmp_path):
+    db_path, engine = _engine(tmp_path)
+    engine.observe({"memory_usage": 250.0}, now=1000.0)
+    assert [alert.severity for alert in load_open_alerts(db_path)] == ["critical"]
+
+    engine.observe({"memory_usage": 100.0}, now=1001.0)
+    assert load_open_alerts(db_path) == []
+
+
+def test_severity_change_waits_for_batch(tmp_path):
+    db_path, engine = _engine(tmp_path)
+    engine.observe({"memory_usage": 250.0}, now=1000.0)
+    engine.observe({"memory_usage": 160.0}, now=1001.0)
+    assert [alert.severity for alert in load_open_alerts(db_path)] == ["critical"]
+
+    engine.flush()
+    assert [alert.severity for alert in load_open_alerts(db_path)] == ["warning"]
+
+
+def test_flush_interval_ignores_sample_timestamps(tmp_path):
+    db_path, engine = _engine(tmp_path)
+    skewed = time.time() + 86400.0
+    engine.observe({"memory_usage": 250.0}, now=skewed)
+    engine.observe({"memory_usage": 160.0}, now=skewed + 1.0)
+    assert [alert.severity for alert in load_open_alerts(db_path)] == ["critical"]
+
+
+def test_migration_leaves_one_open_alert_per_metric(tmp_path):
+    import sqlite3
+    import metrics_storage
+
+    db_path = str(tmp_path / "metrics.db")
+    migrations = metrics_storage.MIGRATIONS[PERFORMANCE_SCHEMA]
+    legacy = [migration for migration in migrations if migration[0] < 5]
+    metrics_storage.MIGRATIONS[PERFORMANCE_SCHEMA] = legacy
+    try:
+        initialize_database(db_path, PERFORMANCE_SCHEMA)
+    finally:
+        metrics_storage.MIGRATIONS[PERFORMANCE_SCHEMA] = migrations
+
+    # One unresolved row per breaching sample, as written before the alert engine
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executemany('''
+            INSERT INTO performance_alerts
+            (alert_id, timestamp, alert_type, severity, message, metric_name, current_value, threshold_value)
+            VALUES (?, ?, 'performance_threshold', 'critical', '', ?, 250.0, 200.0)
+        ''', [(f"memory_usage_{i}", 1000.0 + i, "memory_usage") for i in range(3)]
+             + [("ui_fps_0", 1000.0, "ui_fps")])
+    conn.close()
+
+    initialize_database(db_path, PERFORMANCE_SCHEMA)
+    assert sorted(alert.alert_id for alert in load_open_alerts(db_path)) == ["memory_usage_2", "ui_fps_0"]
@@ -0,0 +1,74 @@
+import shutil
+
+from pods_cache import PodsCache, cache_key
+
+
+def _install(ios, content):
+    """What `pod install` leaves behind, minus the network"""
+    pods = ios / "Pods"
+    (pods / "Target").mkdir(parents=True, exist_ok=True)
+    (pods / "Target" / "a.m").write_text(content)
+    (pods / "Manifest.lock").write_bytes((ios / "Podfile.lock").read_bytes())
+
+
+def test_restore_round_trip(tmp_path):
+    ios = tmp_path / "ios"
+    ios.mkdir()
+    (ios / "Podfile").write_text("platform :ios\n")
+    (ios / "Podfile.lock").write_text("PODS: [A]\n")
+    _install(ios, "ORIGINAL")
+    (ios / "Pods" / "Headers").symlink_to("Target")
+
+    cache = PodsCache(str(tmp_path / "cache"))
+    key = cache_key(ios, "1.15.2")
+    cache.snapshot(ios, key)
+
+    result = cache.restore(ios, key)
+    assert result.files == 2
+    assert (ios / "Pods" / "Target" / "a.m").read_text() == "ORIGINAL"
+    assert (ios / "Pods" / "Headers").is_symlink()
+
+
+def test_in_place_rewrite_after_restore_does_not_leak_into_cache(tmp_path):
+    ios = tmp_path / "ios"
+    ios.mkdir()
+    (ios / "Podfile").write_text("platform :ios\n")
+    (ios / "Podfile.lock").write_text("PODS: [A]\n")
+    _install(ios, "ORIGINAL")
+
+    cache = PodsCache(str(tmp_path / "cache"))
+    key = cache_key(ios, "1.15.2")
+    cache.snapshot(ios, key)
+    cache.restore(ios, key)
+
+    # pod install / Xcode rewriting a restored file in place
+    with open(ios / "Pods" / "Target" / "a.m", "w") as f:
+        f.write("MUTATED!")
+
+    # A fresh install recreates Pods/ with the original content
+    shutil.rmtree(ios / "Pods")
+    _install(ios, "ORIGINAL")
+    cache.snapshot(ios, key)
+    cache.restore(ios, key)
+    assert (ios / "Pods" / "Target" / "a.m").read_text() == "ORIGINAL"
+
+
+def test_corrupted_object_is_replaced_on_next_snapshot(tmp_path):
+    ios = tmp_path / "ios"
+    ios.mkdir()
+    (ios / "Podfile").write_text("platform :ios\n")
+    (ios / "Podfile.lock").write_text("PODS: [A]\n")
+    _install(ios, "ORIGINAL")
+
+    cache = PodsCache(str(tmp_path / "cache"))
+    key = cache_key(ios, "1.15.2")
+    manifest = cache.snapshot(ios, key)
+    digest, executable, *_ = manifest["files"]["Target/a.m"]
+    stored = cache._object_path(digest, executable)
+    stored.chmod(0o644)
+    stored.write_text("MUTATED!")
+
+    cache.snapshot(ios, key)
+    assert stored.read_text() == "ORIGINAL"
+    cache.restore(ios, key, deep_verify=True)
+    assert (ios / "Pods" / "Target" / "a.m").read_text() == "ORIGINAL"
@@ -0,0 +1,35 @@
+import pytest
+
+from xcode_deploy_bot import ChecklistCheck, XCodeDeployBot
+
+
+def _bot(monkeypatch, checks):
+    bot = XCodeDeployBot()
+    bot.knowledge_base["deployment_checklist"] = {"Signing": ["Bundle identifier is set"]}
+    monkeypatch.setattr(bot, "_checklist_checks", lambda: checks)
+    return bot
+
+
+def test_prerequisites_are_followed_transitively(monkeypatch):
+    calls = []
+
+    def check(name):
+        return lambda: calls.append(name) or True
+
+    bot = _bot(monkeypatch, {
+        "bundle_identifier": ChecklistCheck(check("bundle_identifier"), 5.0, depends_on=("cocoapods",)),
+        "cocoapods": ChecklistCheck(check("cocoapods"), 5.0, depends_on=("flutter_version",)),
+        "flutter_version": ChecklistCheck(check("flutter_version"), 5.0)
+    })
+    results = bot.run_checklist_checks()
+    assert [result.status for result in results] == ["passed"]
+    assert calls == ["flutter_version", "cocoapods", "bundle_identifier"]
+
+
+def test_dependency_cycle_fails_instead_of_spinning(monkeypatch):
+    bot = _bot(monkeypatch, {
+        "bundle_identifier": ChecklistCheck(lambda: True, 5.0, depends_on=("cocoapods",)),
+        "cocoapods": ChecklistCheck(lambda: True, 5.0, depends_on=("bundle_identifier",))
+    })
+    with pytest.raises(ValueError, match="cycle"):
+        bot.run_checklist_checks()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Toolchain Probe
+Disk-cached `--version` probes for flutter, pod and xcodebuild
+"""
+
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import threading
+import subprocess
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "chatsy", "toolchain_probes.json"
+)
+
+# Environment that changes what a tool reports without changing its binary
+TOOL_ENV_KEYS = {
+    "flutter": ("FLUTTER_ROOT", "FLUTTER_STORAGE_BASE_URL", "PUB_CACHE"),
+    "pod": ("GEM_HOME", "GEM_PATH", "RUBYOPT", "BUNDLE_GEMFILE"),
+    "xcodebuild": ("DEVELOPER_DIR",),
+    "xcrun": ("DEVELOPER_DIR",)
+}
+
+# Files whose mtime changes when a tool is upgraded in place. Relative paths
+# are resolved against the directory of the tool's real binary: `flutter
+# upgrade` leaves bin/flutter untouched but rewrites its version stamps.
+TOOL_FINGERPRINT_FILES = {
+    "flutter": ("../version", "cache/flutter.version.json", "internal/engine.version", "cache/engine.stamp"),
+    "xcodebuild": ("/var/db/xcode_select_link",),
+    "xcrun": ("/var/db/xcode_select_link",)
+}
+
+@dataclass
+class ProbeResult:
+    """Output of a probed command; attribute names mirror CompletedProcess"""
+    args: List[str]
+    binary: str
+    returncode: int
+    stdout: str
+    stderr: str
+    duration: float
+    probed_at: float
+    cached: bool = False
+
+
+class ToolchainProbe:
+    """Runs version commands once per toolchain state and remembers the output.
+
+    Entries are keyed by the resolved binary (real path, mtime, size), the
+    tool's fingerprint files and its relevant environment variables, so an
+    upgrade, a switch of Xcode or a different PATH resolution produces a new
+    key instead of a stale answer. Only successful probes are cached.
+    """
+
+    def __init__(self, cache_path: Optional[str] = None):
+        self.cache_path = cache_path or os.environ.get("CHATSY_TOOLCHAIN_CACHE") or DEFAULT_CACHE_PATH
+        self._entries: Optional[Dict[str, Dict]] = None
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    def _load(self) -> Dict[str, Dict]:
+        if self._entries is None:
+            try:
+                with open(self.cache_path, 'r') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self):
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._entries, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.cache_path)
+
+    def _fingerprint(self, binary: str, tool: str) -> List:
+        real = os.path.realpath(binary)
+        stat = os.stat(real)
+        parts = [real, stat.st_mtime_ns, stat.st_size]
+        for name in TOOL_FINGERPRINT_FILES.get(tool, ()):
+            path = name if os.path.isabs(name) else os.path.normpath(os.path.join(os.path.dirname(real), name))
+            try:
+                # lstat: xcode_select_link is a symlink whose target is the fingerprint
+                parts.append([path, os.lstat(path).st_mtime_ns, os.readlink(path) if os.path.islink(path) else None])
+            except OSError:
+                parts.append([path, None, None])
+        return parts
+
+    def cache_key(self, command: Sequence[str], env_keys: Optional[Sequence[str]] = None) -> str:
+        """Key for ``command`` in the current toolchain state; FileNotFoundError if not installed"""
+        binary = shutil.which(command[0])
+        if binary is None:
+            raise FileNotFoundError(f"{command[0]} not found on PATH")
+        tool = os.path.basename(command[0])
+        env_keys = env_keys if env_keys is not None else TOOL_ENV_KEYS.get(tool, ())
+        material = {
+            "command": list(command),
+            "binary": self._fingerprint(binary, tool),
+            "env": {key: os.environ.get(key) for key in sorted(env_keys)}
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()
+
+    def run(self, command: Sequence[str], refresh: bool = False, timeout: Optional[float] = None,
+            env_keys: Optional[Sequence[str]] = None) -> ProbeResult:
+        """Cached output of ``command``; ``refresh=True`` always re-runs it.
+
+        Raises FileNotFoundError when the tool is missing and
+        subprocess.TimeoutExpired when it outlives ``timeout``, like
+        subprocess.run.
+        """
+        key = self.cache_key(command, env_keys)
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Concurrent callers for the same tool wait for one subprocess
+        with key_lock:
+            if not refresh:
+                with self._lock:
+                    entry = self._load().get(key)
+                if entry is not None:
+                    return ProbeResult(**{**entry, "cached": True})
+
+            started = time.perf_counter()
+            completed = subprocess.run(list(command), capture_output=True, text=True, timeout=timeout)
+            result = ProbeResult(
+                args=list(command),
+                binary=shutil.which(command[0]) or command[0],
+                returncode=completed.returncode,
+                stdout=completed.stdout,
+                stderr=completed.stderr,
+                duration=time.perf_counter() - started,
+                probed_at=time.time()
+            )
+
+            if result.returncode == 0:
+                with self._lock:
+                    entries = self._load()
+                    entries[key] = {k: v for k, v in asdict(result).items() if k != "cached"}
+                    try:
+                        self._save()
+                    except OSError:
+                        pass  # an unwritable cache only costs the next run a subprocess
+            return result
+
+    def clear(self):
+        """Forget every cached probe"""
+        with self._lock:
+            self._entries = {}
+            if os.path.exists(self.cache_path):
+                os.remove(self.cache_path)
+
+    def flutter_version(self, refresh: bool = False, timeout: Optional[float] = None) -> str:
+        result = self.run(["flutter", "--version"], refresh=refresh, timeout=timeout)
+        match = re.search(r'Flutter (\d+\.\d+\.\d+)', result.stdout)
+        return match.group(1) if match else "unknown"
+
+    def cocoapods_version(self, refresh: bool = False, timeout: Optional[float] = None) -> str:
+        result = self.run(["pod", "--version"], refresh=refresh, timeout=timeout)
+        return result.stdout.strip() if result.returncode == 0 else "unknown"
+
+    def xcode_version(self, refresh: bool = False, timeout: Optional[float] = None) -> str:
+        result = self.run(["xcodebuild", "-version"], refresh=refresh, timeout=timeout)
+        match = re.search(r'Xcode (\d+(?:\.\d+)*)', result.stdout)
+        return match.group(1) if match else "unknown"
+
+
+_shared_probe: Optional[ToolchainProbe] = None
+_shared_lock = threading.Lock()
+
+
+def shared_probe() -> ToolchainProbe:
+    """Process-wide probe, so diagnostics, checklist and fixers share one cache"""
+    global _shared_probe
+    with _shared_lock:
+        if _shared_probe is None:
+            _shared_probe = ToolchainProbe()
+        return _shared_probe
+
+
+def main():
+    """Print toolchain versions, from cache when nothing changed"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Cached flutter / CocoaPods / Xcode version probe")
+    parser.add_argument("--refresh", action="store_true", help="Ignore the cache and re-run every probe")
+    parser.add_argument("--clear", action="store_true", help="Delete the probe cache")
+    args = parser.parse_args()
+
+    probe = shared_probe()
+    if args.clear:
+        probe.clear()
+        print(f"🗑️  Cleared {probe.cache_path}")
+        return
+
+    for name, command in (("Flutter", ["flutter", "--version"]), ("CocoaPods", ["pod", "--version"]),
+                          ("Xcode", ["xcodebuild", "-version"])):
+        try:
+            result = probe.run(command, refresh=args.refresh)
+        except FileNotFoundError:
+            print(f"❌ {name}: not installed")
+            continue
+        origin = "cached" if result.cached else f"probed in {result.duration:.2f}s"
+        first_line = result.stdout.strip().splitlines()[0] if result.stdout.strip() else "no output"
+        print(f"🔧 {name}: {first_line} ({origin})")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,15 +5,19 @@ AI Agent for systematic iOS deployment issue diagnosis and resolution
 """
 
 import json
-import re
 import subprocess
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 from datetime import datetime
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from typing import Callable, Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 
+from build_log_analyzer import BuildLogAnalyzer, LogAnalysis, LogMatch
+from toolchain_probe import shared_probe
+
 class IssueType(Enum):
     CODE_SIGNING = "code_signing"
     COCOAPODS = "cocoapods"
@@ -36,6 +40,26 @@ class DeploymentIssue:
     error_code: Optional[str]
     suggested_fixes: List[str]
     confidence_score: float
+    occurrence_count: int = 0
+    occurrences: List[LogMatch] = field(default_factory=list)
+
+@dataclass
+class ChecklistCheck:
+    """A deployment check shared by every checklist item that maps to it"""
+    function: Callable[..., bool]
+    timeout: float
+    depends_on: Tuple[str, ...] = ()
+    pass_timeout: bool = False  # function accepts timeout= to kill its subprocess
+
+@dataclass
+class ChecklistResult:
+    category: str
+    item: str
+    status: str  # passed, failed, error, timeout, skipped
+    wall_time: float
+    error: Optional[str] = None
+
+CHECKLIST_ICONS = {"passed": "✅", "failed": "❌", "error": "⚠️ ", "timeout": "⏱️ ", "skipped": "⏭️ "}
 
 @dataclass
 class BuildLog:
@@ -55,6 +79,8 @@ class XCodeDeployBot:
     def __init__(self):
         self.knowledge_base = self._load_knowledge_base()
         self.fix_strategies = self._initialize_fix_strategies()
+        self.log_analyzer = BuildLogAnalyzer(self.knowledge_base["error_patterns"])
+        self.toolchain = shared_probe()
         self.monitoring = BuildHealthMonitor()
         self.project_path = "/Users/alexjego/Desktop/CHATSY"
         
@@ -177,25 +203,42 @@ class XCodeDeployBot:
     def analyze_build_logs(self, log_content: str) -> List[DeploymentIssue]:
         """Analyze build logs and identify deployment issues"""
         print("🔍 Analyzing build logs for deployment issues...")
-        
+        return self._issues_from_analysis(self.log_analyzer.analyze_text(log_content))
+    
+    def analyze_build_log_file(self, path: str) -> List[DeploymentIssue]:
+        """Stream a build log file (.gz supported, "-" for stdin) without loading it into memory"""
+        print(f"🔍 Analyzing build log {path} for deployment issues...")
+        analysis = self.log_analyzer.analyze_file(path)
+        print(f"📄 Scanned {analysis.lines_scanned:,} lines in {analysis.elapsed_seconds:.2f}s")
+        return self._issues_from_analysis(analysis)
+    
+    def _issues_from_analysis(self, analysis: LogAnalysis) -> List[DeploymentIssue]:
+        """One issue per knowledge-base pattern found, with every occurrence counted"""
         issues = []
-        error_patterns = self.knowledge_base["error_patterns"]
-        
-        for pattern, pattern_info in error_patterns.items():
-            if re.search(pattern, log_content, re.IGNORECASE):
-                issue = DeploymentIssue(
-                    issue_type=pattern_info["issue_type"],
-                    severity=pattern_info["severity"],
-                    error_message=pattern_info["description"],
-                    error_code=pattern,
-                    suggested_fixes=pattern_info["solutions"],
-                    confidence_score=0.9
-                )
-                issues.append(issue)
-                print(f"⚠️  Found issue: {pattern_info['description']}")
+        
+        for pattern in analysis.matched_patterns():
+            issue = self.issue_for_pattern(pattern, analysis.counts[pattern], analysis.matches[pattern])
+            issues.append(issue)
+            print(f"⚠️  Found issue: {issue.error_message} "
+                  f"({issue.occurrence_count} occurrence(s), first at line {issue.occurrences[0].line_number})")
         
         return issues
     
+    def issue_for_pattern(self, pattern: str, occurrence_count: int = 0,
+                          occurrences: Optional[List[LogMatch]] = None) -> DeploymentIssue:
+        """Classified issue for a knowledge-base error pattern"""
+        pattern_info = self.knowledge_base["error_patterns"][pattern]
+        return DeploymentIssue(
+            issue_type=pattern_info["issue_type"],
+            severity=pattern_info["severity"],
+            error_message=pattern_info["description"],
+            error_code=pattern,
+            suggested_fixes=pattern_info["solutions"],
+            confidence_score=0.9,
+            occurrence_count=occurrence_count,
+            occurrences=occurrences if occurrences is not None else []
+        )
+    
     def systematic_fix(self, issues: List[DeploymentIssue]) -> Dict[str, Any]:
         """Apply systematic fixes based on identified issues"""
         print("🛠️  Applying systematic fixes...")
@@ -214,54 +257,164 @@ class XCodeDeployBot:
         
         return fix_results
     
-    def run_deployment_checklist(self) -> Dict[str, List[str]]:
+    def run_deployment_checklist(self, max_workers: Optional[int] = None) -> Dict[str, List[str]]:
         """Run comprehensive deployment readiness checklist"""
         print("📋 Running deployment readiness checklist...")
         
+        started = time.perf_counter()
+        results = self.run_checklist_checks(max_workers)
+        elapsed = time.perf_counter() - started
+        
         checklist_results = {}
-        checklist = self.knowledge_base["deployment_checklist"]
+        for result in results:
+            line = f"{CHECKLIST_ICONS[result.status]} {result.item} ({result.wall_time:.2f}s)"
+            if result.error:
+                line += f" ({result.error})"
+            checklist_results.setdefault(result.category, []).append(line)
         
-        for category, items in checklist.items():
-            print(f"✅ Checking {category}...")
-            category_results = []
-            
-            for item in items:
-                try:
-                    result = self._check_item(item, category)
-                    category_results.append(f"{'✅' if result else '❌'} {item}")
-                except Exception as e:
-                    category_results.append(f"⚠️  {item} (Error: {str(e)})")
-            
-            checklist_results[category] = category_results
+        for category in checklist_results:
+            print(f"✅ Checked {category}")
+        print(f"⏱️  Checklist finished in {elapsed:.2f}s")
         
         return checklist_results
     
-    def _check_item(self, item: str, category: str) -> bool:
-        """Check individual deployment item"""
+    def _checklist_checks(self) -> Dict[str, ChecklistCheck]:
+        """Checks behind the checklist items, with timeouts and prerequisites"""
+        return {
+            "flutter_version": ChecklistCheck(self._check_flutter_version, 60.0, pass_timeout=True),
+            "ios_deployment_target": ChecklistCheck(self._check_ios_deployment_target, 10.0),
+            "bundle_identifier": ChecklistCheck(self._check_bundle_identifier, 10.0),
+            "version_numbers": ChecklistCheck(self._check_version_numbers, 10.0),
+            "cocoapods": ChecklistCheck(self._check_cocoapods, 30.0, pass_timeout=True),
+            "developer_account": ChecklistCheck(self._check_developer_account, 30.0),
+            "distribution_certificate": ChecklistCheck(self._check_distribution_certificate, 30.0,
+                                                       depends_on=("developer_account",)),
+            "provisioning_profile": ChecklistCheck(self._check_provisioning_profile, 30.0,
+                                                   depends_on=("distribution_certificate",))
+        }
+    
+    def _check_key(self, item: str) -> Optional[str]:
+        """Check behind a checklist item; None for items we can't check automatically"""
         if "Flutter version" in item:
-            return self._check_flutter_version()
+            return "flutter_version"
         elif "iOS deployment target" in item:
-            return self._check_ios_deployment_target()
+            return "ios_deployment_target"
         elif "Bundle identifier" in item:
-            return self._check_bundle_identifier()
+            return "bundle_identifier"
         elif "Version and build number" in item:
-            return self._check_version_numbers()
+            return "version_numbers"
         elif "CocoaPods" in item:
-            return self._check_cocoapods()
+            return "cocoapods"
         elif "Apple Developer account" in item:
-            return self._check_developer_account()
+            return "developer_account"
         elif "Distribution certificate" in item:
-            return self._check_distribution_certificate()
+            return "distribution_certificate"
         elif "Provisioning profile" in item:
-            return self._check_provisioning_profile()
-        else:
-            return True  # Default to pass for items we can't check automatically
+            return "provisioning_profile"
+        return None
+    
+    def run_checklist_checks(self, max_workers: Optional[int] = None) -> List[ChecklistResult]:
+        """Run every distinct check concurrently; results come back in checklist order
+        
+        A check starts once its prerequisites have passed and is skipped if
+        any of them did not. A check that outlives its timeout is reported
+        as timed out without waiting for it; checks that shell out receive
+        the timeout so their subprocess is killed too.
+        """
+        checks = self._checklist_checks()
+        items = [
+            (category, item, self._check_key(item))
+            for category, category_items in self.knowledge_base["deployment_checklist"].items()
+            for item in category_items
+        ]
+        # Prerequisites of prerequisites too, however deep the chain goes
+        needed = set()
+        stack = [key for _, _, key in items if key]
+        while stack:
+            key = stack.pop()
+            if key in needed:
+                continue
+            if key not in checks:
+                raise ValueError(f"Unknown checklist check: {key}")
+            needed.add(key)
+            stack.extend(checks[key].depends_on)
+        
+        outcomes: Dict[str, Tuple[str, float, Optional[str]]] = {}
+        running: Dict[Future, Tuple[str, float]] = {}
+        pending = sorted(needed)
+        executor = ThreadPoolExecutor(max_workers=max_workers or max(1, len(needed)),
+                                      thread_name_prefix="checklist")
+        
+        def timed(check: ChecklistCheck) -> Tuple[bool, float]:
+            check_started = time.perf_counter()
+            passed = check.function(timeout=check.timeout) if check.pass_timeout else check.function()
+            return passed, time.perf_counter() - check_started
+        
+        try:
+            while pending or running:
+                started = len(pending)
+                for key in list(pending):
+                    depends_on = checks[key].depends_on
+                    if any(dep not in outcomes for dep in depends_on):
+                        continue
+                    pending.remove(key)
+                    blocked = [dep for dep in depends_on if outcomes[dep][0] != "passed"]
+                    if blocked:
+                        outcomes[key] = ("skipped", 0.0, f"requires {', '.join(blocked)}")
+                    else:
+                        running[executor.submit(timed, checks[key])] = (key, time.perf_counter())
+                if not running:
+                    if pending and len(pending) == started:
+                        raise ValueError(f"Checklist dependency cycle among: {', '.join(pending)}")
+                    continue
+                
+                now = time.perf_counter()
+                next_deadline = min(submitted + checks[key].timeout for key, submitted in running.values())
+                done, _ = wait(running, timeout=max(0.0, next_deadline - now), return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    key, submitted = running.pop(future)
+                    try:
+                        passed, wall_time = future.result()
+                        outcomes[key] = ("passed" if passed else "failed", wall_time, None)
+                    except subprocess.TimeoutExpired:
+                        outcomes[key] = ("timeout", time.perf_counter() - submitted,
+                                         f"timed out after {checks[key].timeout:.0f}s")
+                    except Exception as e:
+                        outcomes[key] = ("error", time.perf_counter() - submitted, f"Error: {str(e)}")
+                
+                now = time.perf_counter()
+                for future, (key, submitted) in list(running.items()):
+                    if now - submitted >= checks[key].timeout:
+                        future.cancel()
+                        del running[future]
+                        outcomes[key] = ("timeout", now - submitted, f"timed out after {checks[key].timeout:.0f}s")
+        finally:
+            # Don't wait for hung checks; their threads finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        results = []
+        for category, item, key in items:
+            if key is None:
+                # Default to pass for items we can't check automatically
+                results.append(ChecklistResult(category, item, "passed", 0.0))
+            else:
+                status, wall_time, error = outcomes[key]
+                results.append(ChecklistResult(category, item, status, wall_time, error))
+        return results
+    
+    def _check_item(self, item: str, category: str) -> bool:
+        """Check individual deployment item"""
+        key = self._check_key(item)
+        return self._checklist_checks()[key].function() if key else True
     
-    def _check_flutter_version(self) -> bool:
+    def _check_flutter_version(self, timeout: Optional[float] = None) -> bool:
         """Check Flutter version compatibility"""
         try:
-            result = subprocess.run(["flutter", "--version"], capture_output=True, text=True)
+            result = self.toolchain.run(["flutter", "--version"], timeout=timeout)
             return "3.24.5" in result.stdout or "3.25" in result.stdout
+        except subprocess.TimeoutExpired:
+            raise
         except:
             return False
     
@@ -301,11 +454,13 @@ class XCodeDeployBot:
         except:
             return False
     
-    def _check_cocoapods(self) -> bool:
+    def _check_cocoapods(self, timeout: Optional[float] = None) -> bool:
         """Check CocoaPods installation"""
         try:
-            result = subprocess.run(["pod", "--version"], capture_output=True, text=True)
+            result = self.toolchain.run(["pod", "--version"], timeout=timeout)
             return result.returncode == 0
+        except subprocess.TimeoutExpired:
+            raise
         except:
             return False
     